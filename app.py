@@ -2,8 +2,9 @@ import pandas as pd
 import streamlit as st
 from datetime import datetime, date
 import os
-from data_manager import DataManager
-from pdf_extractor import PDFExtractor
+from data_manager import DataManager, PARQUET_DISPONIVEL
+from esquema import COLUNAS_DATA, ESTADOS, FORMATO_DATA, PRIORIDADES, dias_ate, destipar, valor_para_texto
+from pdf_extractor import PDFExtractor, ImportacaoLote
 from dashboard import Dashboard
 
 st.set_page_config(
@@ -51,25 +52,21 @@ if 'dashboard' not in st.session_state:
 if 'pdf_extractor' not in st.session_state:
     st.session_state.pdf_extractor = PDFExtractor()
 
-def get_cor_prazo(data_str):
-    if not data_str or pd.isna(data_str):
-        return ""
-    try:
-        if isinstance(data_str, str):
-            data_siat = datetime.strptime(data_str, "%d/%m/%Y").date()
-        else:
-            data_siat = data_str
-        hoje = date.today()
-        dias_restantes = (data_siat - hoje).days
-        
-        if dias_restantes < 0:
-            return "vermelho"
-        elif dias_restantes <= 5:
-            return "amarelo"
-        else:
-            return "verde"
-    except:
+CURSOS_POR_PAGINA = 50
+
+def get_cor_prazo(dias_restantes):
+    if pd.isna(dias_restantes):
         return ""
+    if dias_restantes < 0:
+        return "vermelho"
+    elif dias_restantes <= 5:
+        return "amarelo"
+    else:
+        return "verde"
+
+def para_date(valor):
+    """Data da tabela (Timestamp ou NaT) no formato aceito pelo st.date_input"""
+    return valor.date() if pd.notna(valor) else None
 
 def formatar_data_para_excel(data):
     if pd.isna(data) or data is None:
@@ -84,9 +81,21 @@ def formatar_data_para_excel(data):
 
 st.title("📚 Controle de Indicações 2026")
 
+@st.fragment(run_every=2)
+def aviso_sincronizacao():
+    """Aviso enquanto a sincronização inicial roda; ao terminar, recarrega a página com os dados novos"""
+    desde = st.session_state.data_manager.dados_desatualizados_desde()
+    if desde:
+        st.caption(f"⏳ Os dados podem estar desatualizados desde {desde.strftime('%d/%m/%Y %H:%M')} — sincronizando com o GitHub...")
+    else:
+        st.rerun()
+
+if st.session_state.data_manager.dados_desatualizados_desde():
+    aviso_sincronizacao()
+
 menu = st.sidebar.radio(
     "Menu",
-    ["📊 Dashboard", "📋 Lista de Cursos", "➕ Novo Curso", "✏️ Editar Curso", "📄 Importar PDF"]
+    ["📊 Dashboard", "📋 Lista de Cursos", "➕ Novo Curso", "✏️ Editar Curso", "📄 Importar PDF", "🕘 Histórico"]
 )
 
 if menu == "📊 Dashboard":
@@ -117,76 +126,99 @@ if menu == "📊 Dashboard":
             st.metric("Ver Vagas Escalantes", count)
         
         st.subheader("Alertas de Prazos")
-        hoje = date.today()
         
-        df_vencendo = df[df['Fim indicação SIAT'].notna()].copy()
-        if not df_vencendo.empty:
-            df_vencendo['dias_restantes'] = df_vencendo['Fim indicação SIAT'].apply(
-                lambda x: (datetime.strptime(x, "%d/%m/%Y").date() - hoje).days 
-                if isinstance(x, str) else 0
-            )
-            
-            urgente = df_vencendo[df_vencendo['dias_restantes'] <= 5]
-            atrasado = df_vencendo[df_vencendo['dias_restantes'] < 0]
-            
-            if not atrasado.empty:
-                st.error(f"⚠️ {len(atrasado)} curso(s) com prazo ATRASADO!")
-                st.dataframe(atrasado[['Curso', 'Turma', 'Fim indicação SIAT', 'Estado']], use_container_width=True)
-            
-            if not urgente.empty:
-                st.warning(f"⚡ {len(urgente)} curso(s) com prazo em menos de 5 dias!")
-                st.dataframe(urgente[['Curso', 'Turma', 'Fim indicação SIAT', 'Estado']], use_container_width=True)
+        dias_restantes = dias_ate(df['Fim da indicação da SIAT'])
+        colunas_alerta = ['Curso', 'Turma', 'Fim da indicação da SIAT', 'Estado']
+        
+        urgente = df[dias_restantes <= 5]
+        atrasado = df[dias_restantes < 0]
+        
+        if not atrasado.empty:
+            st.error(f"⚠️ {len(atrasado)} curso(s) com prazo ATRASADO!")
+            st.dataframe(destipar(atrasado[colunas_alerta]), use_container_width=True)
+        
+        if not urgente.empty:
+            st.warning(f"⚡ {len(urgente)} curso(s) com prazo em menos de 5 dias!")
+            st.dataframe(destipar(urgente[colunas_alerta]), use_container_width=True)
     else:
         st.info("Nenhum curso cadastrado. Adicione cursos pelo menu 'Novo Curso' ou importe via PDF.")
 
 elif menu == "📋 Lista de Cursos":
     st.header("Lista de Cursos")
     
-    df = st.session_state.data_manager.carregar_dados()
+    data_manager = st.session_state.data_manager
+    _, total_cursos = data_manager.carregar_pagina(0, 0)
     
-    if not df.empty:
+    if total_cursos:
         col1, col2 = st.columns([3, 1])
         with col1:
-            filtro_estado = st.multiselect(
-                "Filtrar por Estado",
-                options=df['Estado'].unique() if 'Estado' in df.columns else [],
-                default=[]
-            )
+            filtro_estado = st.multiselect("Filtrar por Estado", options=ESTADOS, default=[])
         with col2:
-            filtro_prioridade = st.multiselect(
-                "Filtrar por Prioridade",
-                options=df['Prioridade'].unique() if 'Prioridade' in df.columns else [],
-                default=[]
-            )
+            filtro_prioridade = st.multiselect("Filtrar por Prioridade", options=PRIORIDADES, default=[])
+        
+        termo_busca = st.text_input(
+            "🔎 Buscar",
+            placeholder="ex.: logística estado:concluído sigad:12345"
+        )
+        
+        filtros = {'Estado': filtro_estado, 'Prioridade': filtro_prioridade}
+        pagina = st.number_input("Página", min_value=1, value=1, step=1)
+        inicio = (pagina - 1) * CURSOS_POR_PAGINA
+        
+        if termo_busca:
+            # A busca usa o índice invertido, montado sobre a tabela completa
+            df_filtrado = data_manager.carregar_dados(filtros=filtros)
+            ids_encontrados = data_manager.buscar_curso(termo_busca)['id']
+            df_filtrado = df_filtrado[df_filtrado['id'].isin(ids_encontrados)]
+            total = len(df_filtrado)
+            df_filtrado = df_filtrado.iloc[inicio:inicio + CURSOS_POR_PAGINA]
+        else:
+            # Só a página exibida é lida do armazenamento
+            df_filtrado, total = data_manager.carregar_pagina(inicio, CURSOS_POR_PAGINA, filtros)
+        df_filtrado = df_filtrado.drop(columns=['id'])
         
-        df_filtrado = df.copy()
-        if filtro_estado:
-            df_filtrado = df_filtrado[df_filtrado['Estado'].isin(filtro_estado)]
-        if filtro_prioridade:
-            df_filtrado = df_filtrado[df_filtrado['Prioridade'].isin(filtro_prioridade)]
+        total_paginas = max(1, -(-total // CURSOS_POR_PAGINA))
+        st.caption(f"{total} curso(s) encontrado(s) — página {pagina} de {total_paginas}")
         
-        def colorir_prazo(val):
-            cor = get_cor_prazo(val)
-            if cor == "vermelho":
-                return 'background-color: #FF6B6B; color: white'
-            elif cor == "amarelo":
-                return 'background-color: #FFD700'
-            elif cor == "verde":
-                return 'background-color: #90EE90'
-            return ''
+        estilos = {
+            "vermelho": 'background-color: #FF6B6B; color: white',
+            "amarelo": 'background-color: #FFD700',
+            "verde": 'background-color: #90EE90',
+            "": ''
+        }
+        
+        def colorir_prazo(coluna):
+            return [estilos[get_cor_prazo(dias)] for dias in dias_ate(coluna)]
         
         st.dataframe(
-            df_filtrado.style.applymap(colorir_prazo, subset=['Fim indicação SIAT']),
+            df_filtrado.style
+                .apply(colorir_prazo, subset=['Fim da indicação da SIAT'])
+                .format(lambda d: d.strftime(FORMATO_DATA), subset=COLUNAS_DATA, na_rep=""),
             use_container_width=True,
             hide_index=True
         )
         
-        st.download_button(
-            label="📥 Exportar para Excel",
-            data=st.session_state.data_manager.exportar_excel_bytes(),
-            file_name=f"cursos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        formatos_exportacao = {
+            "Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+            "CSV (.csv)": ("csv", "text/csv"),
+        }
+        if PARQUET_DISPONIVEL:
+            formatos_exportacao["Parquet (.parquet)"] = ("parquet", "application/vnd.apache.parquet")
+        if data_manager.erro_exportacao:
+            st.error(data_manager.erro_exportacao)
+            data_manager.erro_exportacao = None
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            formato_escolhido = st.selectbox("Formato", list(formatos_exportacao), label_visibility="collapsed")
+        extensao, mime = formatos_exportacao[formato_escolhido]
+        with col2:
+            # A exportação só é gerada quando o botão é clicado (e fica guardada por versão dos dados)
+            st.download_button(
+                label="📥 Exportar",
+                data=data_manager.exportador(extensao),
+                file_name=f"cursos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extensao}",
+                mime=mime
+            )
     else:
         st.info("Nenhum curso cadastrado.")
 
@@ -255,81 +287,89 @@ elif menu == "✏️ Editar Curso":
     df = st.session_state.data_manager.carregar_dados()
     
     if not df.empty:
+        # As opções carregam o id do curso, e não a posição na tabela
+        rotulos = {
+            linha['id']: f"{linha['Curso']} - {linha['Turma']} ({linha['Estado']})"
+            for linha in destipar(df[['id', 'Curso', 'Turma', 'Estado']]).to_dict('records')
+        }
         curso_selecionado = st.selectbox(
             "Selecione o curso para editar",
-            options=df.index,
-            format_func=lambda x: f"{df.loc[x, 'Curso']} - {df.loc[x, 'Turma']} ({df.loc[x, 'Estado']})"
+            options=list(rotulos),
+            format_func=lambda x: rotulos[x]
         )
         
+        curso_atual = None
         if curso_selecionado is not None:
-            curso_atual = df.loc[curso_selecionado]
+            # A versão vem junto com a linha: é a dela que a detecção de conflitos usa
+            versao_lida, curso_atual = st.session_state.data_manager.obter_curso_com_versao(curso_selecionado)
+            if curso_atual is None:
+                # Excluído por outra sessão depois que a lista foi montada
+                st.session_state.pop('edicao', None)
+                st.warning("⚠️ Este curso foi excluído por outra sessão. Selecione outro curso.")
+        
+        if curso_atual is not None:
+            # Campos de texto do formulário: vazios como "" e datas como dd/mm/aaaa
+            curso_texto = {col: valor_para_texto(valor) for col, valor in curso_atual.items()}
+            
+            # Guardar a versão e a linha vistas quando a edição começou, para que
+            # alterações feitas por outra sessão no meio do caminho sejam detectadas
+            edicao = st.session_state.get('edicao')
+            if not edicao or edicao['id'] != curso_selecionado:
+                edicao = {
+                    'id': curso_selecionado,
+                    'versao': versao_lida,
+                    'base': curso_atual
+                }
+                st.session_state.edicao = edicao
             
             with st.form("editar_curso"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    curso = st.text_input("Curso", value=curso_atual.get('Curso', ''))
-                    turma = st.text_input("Turma", value=curso_atual.get('Turma', ''))
-                    vagas = st.number_input("Vagas", min_value=0, step=1, value=int(curso_atual.get('Vagas', 0) or 0))
-                    autorizados = st.text_input("Autorizados pelas escalantes", value=curso_atual.get('Autorizados pelas escalantes', ''))
+                    curso = st.text_input("Curso", value=curso_texto.get('Curso', ''))
+                    turma = st.text_input("Turma", value=curso_texto.get('Turma', ''))
+                    vagas = st.number_input("Vagas", min_value=0, step=1, value=int(curso_texto.get('Vagas', 0) or 0))
+                    autorizados = st.text_input("Autorizados pelas escalantes", value=curso_texto.get('Autorizados pelas escalantes', ''))
                     
-                    prioridade_atual = curso_atual.get('Prioridade', '')
+                    prioridade_atual = curso_texto.get('Prioridade', '')
                     prioridade_index = 0
                     if prioridade_atual in ["Alta", "Média", "Baixa"]:
                         prioridade_index = ["Alta", "Média", "Baixa"].index(prioridade_atual) + 1
                     prioridade = st.selectbox("Prioridade", ["", "Alta", "Média", "Baixa"], 
                                             index=prioridade_index)
                     
-                    try:
-                        data_str = curso_atual.get('Recebimento do SIGAD com as vagas', '')
-                        if data_str and data_str != "":
-                            recebimento_sigad = datetime.strptime(data_str, "%d/%m/%Y").date()
-                        else:
-                            recebimento_sigad = None
-                    except:
-                        recebimento_sigad = None
-                    recebimento_sigad = st.date_input("Recebimento do SIGAD com as vagas", value=recebimento_sigad)
+                    recebimento_sigad = st.date_input(
+                        "Recebimento do SIGAD com as vagas",
+                        value=para_date(curso_atual.get('Recebimento do SIGAD com as vagas'))
+                    )
                     
-                    num_sigad = st.text_input("Número do SIGAD", value=curso_atual.get('Numero do SIGAD', ''))
+                    num_sigad = st.text_input("Número do SIGAD", value=curso_texto.get('Numero do SIGAD', ''))
                 
                 with col2:
-                    estado_atual = curso_atual.get('Estado', '')
+                    estado_atual = curso_texto.get('Estado', '')
                     estados_lista = ["", "solicitar voluntários", "fazer indicação", "Concluído", "ver vagas escalantes"]
                     estado_index = 0
                     if estado_atual in estados_lista:
                         estado_index = estados_lista.index(estado_atual)
                     estado = st.selectbox("Estado", estados_lista, index=estado_index)
                     
-                    data_conclusao_str = curso_atual.get('DATA DA CONCLUSÃO', '')
+                    data_conclusao_str = curso_texto.get('DATA DA CONCLUSÃO', '')
                     if estado == "Concluído" and (not data_conclusao_str or data_conclusao_str == ""):
                         data_conclusao_str = datetime.now().strftime("%d/%m/%Y")
                     
                     st.text_input("DATA DA CONCLUSÃO (auto)", value=data_conclusao_str, disabled=True)
                     
                     num_sigad_chefia = st.text_input("Número do SIGAD encaminhando pra chefia", 
-                                                    value=curso_atual.get('Numero do SIGAD  encaminhando pra chefia', ''))
-                    
-                    try:
-                        data_str = curso_atual.get('Prazo dado pela chefia', '')
-                        if data_str and data_str != "":
-                            prazo_chefia = datetime.strptime(data_str, "%d/%m/%Y").date()
-                        else:
-                            prazo_chefia = None
-                    except:
-                        prazo_chefia = None
-                    prazo_chefia = st.date_input("Prazo dado pela chefia", value=prazo_chefia)
+                                                    value=curso_texto.get('Numero do SIGAD  encaminhando pra chefia', ''))
                     
-                    try:
-                        data_str = curso_atual.get('Fim da indicação da SIAT', '')
-                        if data_str and data_str != "":
-                            fim_siat = datetime.strptime(data_str, "%d/%m/%Y").date()
-                        else:
-                            fim_siat = None
-                    except:
-                        fim_siat = None
-                    fim_siat = st.date_input("Fim da indicação da SIAT", value=fim_siat)
+                    prazo_chefia = st.date_input(
+                        "Prazo dado pela chefia", value=para_date(curso_atual.get('Prazo dado pela chefia'))
+                    )
+                    fim_siat = st.date_input(
+                        "Fim da indicação da SIAT", value=para_date(curso_atual.get('Fim da indicação da SIAT'))
+                    )
                     
-                    notas = st.text_area("Notas", value=str(curso_atual.get('Notas', '')))
+                    notas = st.text_area("Notas", value=str(curso_texto.get('Notas', '')))
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -359,14 +399,21 @@ elif menu == "✏️ Editar Curso":
                         'Notas': notas if notas else ""
                     }
                     
-                    sucesso, mensagem = st.session_state.data_manager.atualizar_curso(curso_selecionado, curso_atualizado)
+                    sucesso, mensagem = st.session_state.data_manager.atualizar_curso(
+                        curso_selecionado, curso_atualizado,
+                        versao_base=edicao['versao'], base=edicao['base']
+                    )
+                    st.session_state.pop('edicao', None)
                     if sucesso:
                         st.success(mensagem)
                     else:
                         st.error(mensagem)
                 
                 if excluir:
-                    sucesso, mensagem = st.session_state.data_manager.excluir_curso(curso_selecionado)
+                    sucesso, mensagem = st.session_state.data_manager.excluir_curso(
+                        curso_selecionado, versao_base=edicao['versao'], base=edicao['base']
+                    )
+                    st.session_state.pop('edicao', None)
                     if sucesso:
                         st.success(mensagem)
                         st.rerun()
@@ -391,11 +438,92 @@ elif menu == "📄 Importar PDF":
     - Turma: [identificação]
     """)
     
-    uploaded_file = st.file_uploader("Escolha o arquivo PDF", type=['pdf'])
+    modo_importacao = st.radio("Modo", ["Um arquivo", "Vários arquivos (lote)"], horizontal=True)
+    
+    uploaded_file = None
+    if modo_importacao == "Um arquivo":
+        uploaded_file = st.file_uploader("Escolha o arquivo PDF", type=['pdf'])
+    else:
+        @st.fragment(run_every=1)
+        def progresso_lote():
+            """Situação de cada arquivo do lote; ao terminar, recarrega a página para a revisão"""
+            lote = st.session_state.importacao_lote
+            terminados, total = lote.progresso()
+            st.progress(terminados / total, text=f"{terminados} de {total} arquivo(s) processado(s)")
+            st.dataframe(pd.DataFrame(lote.situacao()), use_container_width=True, hide_index=True)
+            if not lote.em_andamento():
+                st.rerun()
+        
+        arquivos_lote = st.file_uploader("Escolha os arquivos PDF", type=['pdf'], accept_multiple_files=True)
+        # Pastas do servidor só dentro de PDF_PASTA_LOTE; sem ela, apenas arquivos enviados
+        pasta_base = os.environ.get('PDF_PASTA_LOTE')
+        pasta_lote = None
+        if pasta_base:
+            pasta_lote = st.text_input(f"...ou uma subpasta de {pasta_base} com os PDFs", placeholder="subpasta")
+        
+        lote = st.session_state.get('importacao_lote')
+        em_andamento = lote is not None and lote.em_andamento()
+        if st.button("🔍 Extrair cursos de todos os arquivos", disabled=em_andamento or not (arquivos_lote or pasta_lote)):
+            try:
+                itens = [(arquivo.name, arquivo.getvalue()) for arquivo in arquivos_lote or []]
+                if pasta_lote:
+                    itens += ImportacaoLote.arquivos_da_pasta(pasta_lote, pasta_base)
+                lote = ImportacaoLote(itens, st.session_state.pdf_extractor).iniciar()
+                st.session_state.importacao_lote = lote
+            except OSError as e:
+                st.error(f"❌ Não foi possível ler a pasta: {str(e)}")
+        
+        if lote is not None and lote.em_andamento():
+            progresso_lote()
+        elif lote is not None:
+            situacao = pd.DataFrame(lote.situacao())
+            erros = (situacao['Estado'] == 'erro').sum()
+            st.caption(f"⏱️ {len(situacao)} arquivo(s) em {lote.duracao:.1f} s — {erros} com erro")
+            st.dataframe(situacao, use_container_width=True, hide_index=True)
+            
+            cursos_lote = lote.cursos()
+            if cursos_lote:
+                st.subheader(f"Revisão: {len(cursos_lote)} curso(s) extraído(s)")
+                df_lote = pd.DataFrame(cursos_lote)
+                df_lote.insert(0, 'Importar', True)
+                df_revisado = st.data_editor(
+                    df_lote,
+                    use_container_width=True,
+                    hide_index=True,
+                    disabled=['Arquivo'],
+                    key='revisao_lote'
+                )
+                
+                selecionados = df_revisado[df_revisado['Importar']].drop(columns=['Importar', 'Arquivo'])
+                if st.button(f"✅ Importar {len(selecionados)} curso(s) selecionado(s)", disabled=selecionados.empty):
+                    # Uma única gravação (e um único commit) para o lote inteiro
+                    sucesso, mensagem, resultados = st.session_state.data_manager.adicionar_cursos(
+                        selecionados.to_dict('records')
+                    )
+                    if sucesso:
+                        st.success(mensagem)
+                        del st.session_state.importacao_lote
+                    else:
+                        st.error(mensagem)
+                    
+                    rejeitados = [r for r in resultados if not r['sucesso']]
+                    if rejeitados:
+                        st.warning(f"⚠️ {len(rejeitados)} curso(s) não importado(s):")
+                        st.dataframe(pd.DataFrame(rejeitados), use_container_width=True, hide_index=True)
+            else:
+                st.warning("⚠️ Nenhum curso encontrado nos arquivos.")
     
     if uploaded_file is not None:
-        with st.spinner("Extraindo dados do PDF..."):
-            cursos_extraidos = st.session_state.pdf_extractor.extrair_cursos(uploaded_file)
+        progresso = st.progress(0.0, text="Extraindo dados do PDF...")
+        parciais = st.empty()
+        cursos_extraidos = []
+        for pagina, total, novos in st.session_state.pdf_extractor.iterar_cursos(uploaded_file):
+            cursos_extraidos.extend(novos)
+            progresso.progress(pagina / total, text=f"Página {pagina} de {total}: {len(cursos_extraidos)} curso(s) encontrado(s)")
+            if novos:
+                parciais.dataframe(pd.DataFrame(cursos_extraidos), use_container_width=True)
+        progresso.empty()
+        parciais.empty()
         
         if cursos_extraidos:
             st.success(f"✅ {len(cursos_extraidos)} curso(s) encontrado(s)!")
@@ -405,13 +533,16 @@ elif menu == "📄 Importar PDF":
             st.dataframe(df_extraido, use_container_width=True)
             
             if st.button("✅ Importar Todos os Cursos"):
-                sucessos = 0
-                for curso in cursos_extraidos:
-                    sucesso, _ = st.session_state.data_manager.adicionar_curso(curso)
-                    if sucesso:
-                        sucessos += 1
+                sucesso, mensagem, resultados = st.session_state.data_manager.adicionar_cursos(cursos_extraidos)
+                if sucesso:
+                    st.success(mensagem)
+                else:
+                    st.error(mensagem)
                 
-                st.success(f"✅ {sucessos} de {len(cursos_extraidos)} cursos importados com sucesso!")
+                rejeitados = [r for r in resultados if not r['sucesso']]
+                if rejeitados:
+                    st.warning(f"⚠️ {len(rejeitados)} curso(s) não importado(s):")
+                    st.dataframe(pd.DataFrame(rejeitados), use_container_width=True, hide_index=True)
         else:
             st.warning("⚠️ Nenhum curso encontrado no PDF. Verifique se o formato está correto.")
             
@@ -425,8 +556,79 @@ elif menu == "📄 Importar PDF":
             ```
             """)
 
+elif menu == "🕘 Histórico":
+    st.header("Histórico de Alterações")
+    
+    data_manager = st.session_state.data_manager
+    df = data_manager.carregar_dados()
+    
+    st.subheader("Alterações de um curso")
+    if not df.empty:
+        rotulos = {
+            linha['id']: f"{linha['Curso']} - {linha['Turma']}"
+            for linha in destipar(df[['id', 'Curso', 'Turma']]).to_dict('records')
+        }
+        curso_selecionado = st.selectbox("Curso", options=list(rotulos), format_func=lambda x: rotulos[x])
+        eventos = data_manager.auditoria_curso(curso_selecionado)
+        if eventos:
+            linhas = []
+            for evento in eventos:
+                if evento['operacao'] == 'atualizar':
+                    detalhes = "; ".join(
+                        f"{campo}: '{antes}' → '{depois}'" for campo, (antes, depois) in evento['campos'].items()
+                    )
+                else:
+                    detalhes = ""
+                linhas.append({
+                    'Data': evento['data'].strftime("%d/%m/%Y %H:%M:%S"),
+                    'Operação': evento['operacao'],
+                    'Detalhes': detalhes,
+                    'Mensagem': evento['mensagem']
+                })
+            st.dataframe(pd.DataFrame(linhas), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma alteração registrada para este curso desde o início do histórico.")
+    else:
+        st.info("Nenhum curso cadastrado.")
+    
+    st.subheader("Restaurar um estado anterior")
+    col1, col2 = st.columns(2)
+    with col1:
+        dia = st.date_input("Data", value=date.today())
+    with col2:
+        hora = st.time_input("Hora", value=datetime.now().time().replace(second=0, microsecond=0))
+    momento = datetime.combine(dia, hora)
+    
+    estado = data_manager.estado_em(momento)
+    if estado is None:
+        st.warning("Não há histórico local para essa data.")
+    else:
+        st.caption(f"{len(estado)} curso(s) em {momento.strftime('%d/%m/%Y %H:%M')}")
+        st.dataframe(destipar(estado.drop(columns=['id'])), use_container_width=True, hide_index=True)
+        if st.button("⏪ Restaurar este estado"):
+            sucesso, mensagem = data_manager.restaurar_estado(momento)
+            if sucesso:
+                st.success(mensagem)
+            else:
+                st.error(mensagem)
+
 st.sidebar.markdown("---")
 
+@st.fragment(run_every=5)
+def mostrar_fila_github():
+    """Situação da fila de envio ao GitHub, atualizada sozinha a cada poucos segundos"""
+    status = st.session_state.data_manager.status_envio_github()
+    if not status:
+        return
+    if status['enviando']:
+        st.caption("⏫ Enviando alterações ao GitHub...")
+    elif status['pendentes']:
+        st.caption(f"⏳ {status['pendentes']} alteração(ões) aguardando envio ao GitHub")
+    if status['falhas']:
+        st.caption(f"⚠️ Falha no último envio, nova tentativa em breve: {status['ultimo_resultado']}")
+    elif status['ultimo_envio']:
+        st.caption(f"☁️ Último envio: {status['ultimo_envio'].strftime('%d/%m/%Y %H:%M:%S')}")
+
 # Status do GitHub
 try:
     autenticado, mensagem_status = st.session_state.data_manager.verificar_status_github()
@@ -434,11 +636,26 @@ try:
     if autenticado:
         st.sidebar.success("✅ GitHub conectado")
         st.sidebar.caption(f"💾 {mensagem_status}")
+        with st.sidebar:
+            mostrar_fila_github()
+        
+        metricas = st.session_state.data_manager.metricas_github()
+        if metricas:
+            with st.sidebar.expander("📈 Uso da API do GitHub"):
+                if metricas['limite']:
+                    st.caption(f"Cota: {metricas['restantes']} de {metricas['limite']} "
+                               f"(renova às {metricas['reinicio'].strftime('%H:%M')})")
+                st.caption("Chamadas: " + ", ".join(f"{nome} {total}" for nome, total in metricas['chamadas'].items()))
+                economizadas = {motivo: total for motivo, total in metricas['economizadas'].items() if total}
+                if economizadas:
+                    st.caption("Evitadas: " + ", ".join(f"{motivo} {total}" for motivo, total in economizadas.items()))
+                st.caption(f"Limites atingidos: {metricas['limites_atingidos']} | "
+                           f"tempo esperando a cota: {metricas['tempo_espera']:.1f} s")
         
         # Botão de sincronização manual
         if st.sidebar.button("🔄 Sincronizar do GitHub"):
             with st.spinner("Sincronizando..."):
-                sucesso, mensagem = st.session_state.data_manager.github_manager.sincronizar_para_local()
+                sucesso, mensagem = st.session_state.data_manager.sincronizar_github()
                 if sucesso:
                     st.sidebar.success(mensagem)
                     st.rerun()
@@ -0,0 +1,696 @@
+import os
+import re
+import json
+import sqlite3
+import zipfile
+import threading
+from contextlib import contextmanager, nullcontext
+import pandas as pd
+from openpyxl import load_workbook
+from controle_concorrencia import substituicao_atomica
+from esquema import COLUNAS_DATA
+
+
+def _valor_simples(valor):
+    """Converte NaN/escalares numpy em tipos nativos (None, int, float, str)"""
+    if valor is None:
+        return None
+    try:
+        if pd.isna(valor):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return valor
+
+
+class ArmazenamentoBase:
+    """Interface comum dos motores de armazenamento da tabela de cursos"""
+
+    # Motores que gravam linha a linha não precisam da tabela atual para escrever
+    escrita_incremental = False
+    # Motores que aplicam filtros por conta própria (sem filtrar no pandas)
+    suporta_filtros = False
+    # Coluna com o identificador estável de cada curso
+    coluna_id = 'id'
+
+    def __init__(self, colunas, trava=None):
+        self.colunas = colunas
+        # Trava entre processos usada por tarefas internas (ex.: compactação)
+        self.trava = trava or nullcontext()
+
+    def assinatura(self):
+        """Identifica o estado atual dos dados em disco (usado pelo cache)"""
+        raise NotImplementedError
+
+    def inicializar(self):
+        raise NotImplementedError
+
+    def carregar(self, filtros=None):
+        raise NotImplementedError
+
+    def salvar_tudo(self, df):
+        raise NotImplementedError
+
+    def carregar_pagina(self, offset, limite, filtros=None):
+        """Retorna (linhas [offset, offset + limite) da tabela filtrada, total de linhas filtradas)"""
+        df = self.carregar(filtros)
+        return df.iloc[offset:offset + limite].reset_index(drop=True), len(df)
+
+    def obter(self, id_curso):
+        """Dados de um curso como dicionário, ou None se o id não existir"""
+        df = self.carregar()
+        posicao = self._posicao_do_id(df, id_curso)
+        return None if posicao is None else df.loc[posicao].to_dict()
+
+    def adicionar(self, linha, df_atual=None):
+        df = df_atual if df_atual is not None else self.carregar()
+        df = pd.concat([df, pd.DataFrame([linha])], ignore_index=True)
+        self.salvar_tudo(df)
+
+    def adicionar_varios(self, df_novos, df_atual=None):
+        """Acrescenta todas as linhas de `df_novos` em uma única gravação"""
+        df = df_atual if df_atual is not None else self.carregar()
+        df = pd.concat([df, df_novos], ignore_index=True)
+        self.salvar_tudo(df)
+
+    def _posicao_do_id(self, df, id_curso):
+        encontrados = df.index[df[self.coluna_id] == id_curso]
+        return encontrados[0] if len(encontrados) else None
+
+    def atualizar(self, id_curso, linha, df_atual=None):
+        df = df_atual if df_atual is not None else self.carregar()
+        posicao = self._posicao_do_id(df, id_curso)
+        if posicao is None:
+            return False
+        for col, valor in linha.items():
+            # Colunas lidas só com números/vazios chegam como float
+            if col in df.columns and df[col].dtype != object:
+                df[col] = df[col].astype(object)
+            df.at[posicao, col] = valor
+        self.salvar_tudo(df)
+        return True
+
+    def excluir(self, id_curso, df_atual=None):
+        """Remove o curso e retorna seus dados, ou None se não existir"""
+        df = df_atual if df_atual is not None else self.carregar()
+        posicao = self._posicao_do_id(df, id_curso)
+        if posicao is None:
+            return None
+        linha = df.loc[posicao].to_dict()
+        df = df.drop(posicao).reset_index(drop=True)
+        self.salvar_tudo(df)
+        return linha
+
+    def importar_xlsx(self, caminho):
+        """Substitui os dados pelo conteúdo de um arquivo Excel"""
+        pass
+
+    def exportar_xlsx(self, caminho):
+        """Garante que o arquivo Excel em `caminho` reflita os dados atuais"""
+        pass
+
+    def filtrar(self, df, filtros):
+        """Aplica filtros {coluna: [valores]} em um DataFrame já carregado"""
+        for col, valores in (filtros or {}).items():
+            if valores and col in df.columns:
+                df = df[df[col].isin(valores)]
+        return df
+
+    def _linha_passa(self, linha, filtros):
+        """Mesmo critério de `filtrar`, para uma linha (dicionário)"""
+        return all(
+            linha.get(col) in valores
+            for col, valores in (filtros or {}).items()
+            if valores and col in self.colunas
+        )
+
+    def _completar_colunas(self, df):
+        for col in self.colunas:
+            if col not in df.columns:
+                df[col] = ""
+        return df
+
+
+class ArmazenamentoXlsx(ArmazenamentoBase):
+    """Tabela inteira em um único arquivo Excel, reescrito a cada alteração"""
+
+    def __init__(self, colunas, arquivo="data/cursos.xlsx", trava=None):
+        super().__init__(colunas, trava)
+        self.arquivo = arquivo
+
+    def assinatura(self):
+        try:
+            info = os.stat(self.arquivo)
+            return (info.st_mtime_ns, info.st_size)
+        except OSError:
+            return None
+
+    def inicializar(self):
+        if not os.path.exists(self.arquivo):
+            self.salvar_tudo(pd.DataFrame(columns=self.colunas))
+
+    def carregar(self, filtros=None):
+        if not os.path.exists(self.arquivo):
+            return pd.DataFrame(columns=self.colunas)
+        df = self._completar_colunas(pd.read_excel(self.arquivo, engine='openpyxl'))
+        return self.filtrar(df, filtros)
+
+    def salvar_tudo(self, df):
+        with substituicao_atomica(self.arquivo) as temporario:
+            df.to_excel(temporario, index=False, engine='openpyxl')
+
+    def _pagina_vazia(self):
+        return pd.DataFrame(columns=self.colunas), 0
+
+    def _montar_pagina(self, cabecalho, linhas):
+        pagina = pd.DataFrame(linhas, columns=cabecalho)
+        return self._completar_colunas(pagina)[self.colunas]
+
+    def carregar_pagina(self, offset, limite, filtros=None):
+        # Leitura em modo read-only: as linhas são percorridas sem montar a tabela inteira
+        if not os.path.exists(self.arquivo):
+            return self._pagina_vazia()
+        wb = load_workbook(self.arquivo, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            linhas = ws.iter_rows(values_only=True)
+            cabecalho = list(next(linhas, None) or [])
+            if not cabecalho:
+                return self._pagina_vazia()
+            
+            filtros = {col: v for col, v in (filtros or {}).items() if v and col in cabecalho}
+            if not filtros and ws.max_row:
+                # Sem filtro, basta ler as linhas da página
+                total = ws.max_row - 1
+                pagina = ws.iter_rows(min_row=offset + 2, max_row=offset + 1 + limite, values_only=True)
+                return self._montar_pagina(cabecalho, list(pagina)), total
+            
+            selecionadas = []
+            total = 0
+            for valores in linhas:
+                if not self._linha_passa(dict(zip(cabecalho, valores)), filtros):
+                    continue
+                if offset <= total < offset + limite:
+                    selecionadas.append(valores)
+                total += 1
+            return self._montar_pagina(cabecalho, selecionadas), total
+        finally:
+            wb.close()
+
+    def obter(self, id_curso):
+        if not os.path.exists(self.arquivo):
+            return None
+        wb = load_workbook(self.arquivo, read_only=True, data_only=True)
+        try:
+            linhas = wb.worksheets[0].iter_rows(values_only=True)
+            cabecalho = list(next(linhas, None) or [])
+            if self.coluna_id not in cabecalho:
+                return None
+            posicao_id = cabecalho.index(self.coluna_id)
+            for valores in linhas:
+                if valores[posicao_id] == id_curso:
+                    return self._montar_pagina(cabecalho, [valores]).iloc[0].to_dict()
+            return None
+        finally:
+            wb.close()
+
+
+class ArmazenamentoXlsxJournal(ArmazenamentoXlsx):
+    """Excel como snapshot mais um journal append-only de operações por linha
+
+    Cada escrita acrescenta uma linha JSON ao journal (com fsync), em tempo
+    constante. As leituras aplicam o journal sobre o último snapshot, e a
+    compactação grava um novo Excel quando o journal passa do limite de
+    tamanho ou quando o app fica ocioso.
+    """
+
+    escrita_incremental = True
+
+    def __init__(self, colunas, arquivo="data/cursos.xlsx", trava=None, limite_journal=1024 * 1024, segundos_ocioso=30):
+        super().__init__(colunas, arquivo, trava)
+        self.arquivo_journal = os.path.splitext(arquivo)[0] + ".journal.jsonl"
+        self.limite_journal = limite_journal
+        self.segundos_ocioso = segundos_ocioso
+        self._trava = threading.RLock()
+        self._timer_ocioso = None
+        # Estado materializado (snapshot + journal já aplicado), indexado por id
+        self._registros = None
+        self._assinatura_snapshot = None
+        self._offset_journal = 0
+        self._seq_snapshot = 0
+        self._seq = 0
+
+    def assinatura(self):
+        snapshot = super().assinatura()
+        if snapshot is None:
+            return None
+        try:
+            info = os.stat(self.arquivo_journal)
+            return snapshot + (info.st_mtime_ns, info.st_size)
+        except OSError:
+            return snapshot
+
+    def _ler_seq_snapshot(self):
+        # A sequência do último registro incorporado fica nas propriedades do
+        # Excel, gravada junto com o snapshot (a troca do arquivo é atômica)
+        try:
+            with zipfile.ZipFile(self.arquivo) as arquivo_zip:
+                core = arquivo_zip.read('docProps/core.xml').decode('utf-8')
+            encontrado = re.search(r'journal-seq=(\d+)', core)
+            return int(encontrado.group(1)) if encontrado else 0
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return 0
+
+    def _gravar_snapshot(self, df, seq):
+        with substituicao_atomica(self.arquivo) as temporario:
+            with pd.ExcelWriter(temporario, engine='openpyxl') as writer:
+                df.to_excel(writer, index=False)
+                writer.book.properties.description = f"journal-seq={seq}"
+
+    def _ler_journal(self):
+        """Lê as entradas completas adicionadas ao journal desde a última leitura"""
+        try:
+            with open(self.arquivo_journal, 'rb') as f:
+                f.seek(self._offset_journal)
+                conteudo = f.read()
+        except FileNotFoundError:
+            return []
+        
+        # Uma linha sem '\n' final é uma escrita em andamento (ou interrompida)
+        fim = conteudo.rfind(b"\n") + 1
+        self._offset_journal += fim
+        entradas = []
+        for linha in conteudo[:fim].splitlines():
+            try:
+                entradas.append(json.loads(linha))
+            except ValueError:
+                continue
+        return entradas
+
+    def _atualizar_estado(self):
+        assinatura_snapshot = super().assinatura()
+        try:
+            tamanho_journal = os.path.getsize(self.arquivo_journal)
+        except OSError:
+            tamanho_journal = 0
+        
+        if (self._registros is None or assinatura_snapshot != self._assinatura_snapshot
+                or tamanho_journal < self._offset_journal):
+            self._registros = self._indexar(super().carregar().to_dict('records'))
+            self._assinatura_snapshot = assinatura_snapshot
+            self._seq_snapshot = self._ler_seq_snapshot()
+            self._seq = self._seq_snapshot
+            self._offset_journal = 0
+        
+        for entrada in self._ler_journal():
+            if entrada.get('seq', 0) > self._seq:
+                self._aplicar(entrada)
+                self._seq = entrada['seq']
+
+    def _indexar(self, registros):
+        # Linhas antigas sem id recebem uma chave provisória até o DataManager gravar os ids
+        indexados = {}
+        for registro in registros:
+            id_curso = registro.get(self.coluna_id)
+            chave = id_curso if isinstance(id_curso, str) and id_curso else object()
+            indexados[chave] = registro
+        return indexados
+
+    def _aplicar(self, entrada):
+        operacao = entrada['op']
+        if operacao == 'adicionar':
+            self._registros[entrada['linha'][self.coluna_id]] = dict(entrada['linha'])
+        elif operacao == 'adicionar_varios':
+            for linha in entrada['linhas']:
+                self._registros[linha[self.coluna_id]] = dict(linha)
+        elif operacao == 'atualizar':
+            self._registros[entrada['id']].update(entrada['linha'])
+        elif operacao == 'excluir':
+            return self._registros.pop(entrada['id'])
+
+    def _anexar(self, entrada):
+        entrada['seq'] = self._seq + 1
+        dados = (json.dumps(entrada, ensure_ascii=False) + "\n").encode('utf-8')
+        os.makedirs(os.path.dirname(self.arquivo_journal) or ".", exist_ok=True)
+        with open(self.arquivo_journal, 'ab') as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset_journal += len(dados)
+        self._seq = entrada['seq']
+        resultado = self._aplicar(entrada)
+        self._agendar_compactacao()
+        return resultado
+
+    def _agendar_compactacao(self):
+        if self._timer_ocioso:
+            self._timer_ocioso.cancel()
+        
+        if self._offset_journal >= self.limite_journal:
+            threading.Thread(target=self._compactar_em_segundo_plano, daemon=True).start()
+        elif self.segundos_ocioso:
+            self._timer_ocioso = threading.Timer(self.segundos_ocioso, self._compactar_em_segundo_plano)
+            self._timer_ocioso.daemon = True
+            self._timer_ocioso.start()
+
+    def _compactar_em_segundo_plano(self):
+        try:
+            self.compactar()
+        except Exception as e:
+            print(f"Erro ao compactar journal: {str(e)}")
+
+    def _linha_json(self, linha):
+        return {k: _valor_simples(v) for k, v in linha.items()}
+
+    def carregar(self, filtros=None):
+        with self._trava:
+            if not os.path.exists(self.arquivo):
+                return pd.DataFrame(columns=self.colunas)
+            self._atualizar_estado()
+            df = self._completar_colunas(pd.DataFrame(list(self._registros.values()), columns=self.colunas))
+        return self.filtrar(df, filtros)
+
+    def carregar_pagina(self, offset, limite, filtros=None):
+        # O estado já fica materializado em memória: só a página vira DataFrame
+        with self._trava:
+            if not os.path.exists(self.arquivo):
+                return self._pagina_vazia()
+            self._atualizar_estado()
+            registros = [r for r in self._registros.values() if self._linha_passa(r, filtros)]
+        pagina = pd.DataFrame(registros[offset:offset + limite], columns=self.colunas)
+        return self._completar_colunas(pagina), len(registros)
+
+    def obter(self, id_curso):
+        with self._trava:
+            if not os.path.exists(self.arquivo):
+                return None
+            self._atualizar_estado()
+            registro = self._registros.get(id_curso)
+            return {col: registro.get(col) for col in self.colunas} if registro else None
+
+    def salvar_tudo(self, df):
+        with self.trava, self._trava:
+            self._gravar_snapshot(df, self._seq)
+            if os.path.exists(self.arquivo_journal):
+                os.remove(self.arquivo_journal)
+            self._registros = self._indexar(self._completar_colunas(df.copy())[self.colunas].to_dict('records'))
+            self._assinatura_snapshot = ArmazenamentoXlsx.assinatura(self)
+            self._seq_snapshot = self._seq
+            self._offset_journal = 0
+
+    def compactar(self):
+        """Incorpora o journal em um novo snapshot Excel e o esvazia"""
+        # A trava entre processos impede que outro processo anexe durante a troca
+        with self.trava, self._trava:
+            if not os.path.exists(self.arquivo):
+                return
+            self._atualizar_estado()
+            if self._offset_journal == 0:
+                return
+            self.salvar_tudo(pd.DataFrame(list(self._registros.values()), columns=self.colunas))
+
+    def adicionar(self, linha, df_atual=None):
+        with self._trava:
+            self._atualizar_estado()
+            self._anexar({'op': 'adicionar', 'linha': self._linha_json(linha)})
+
+    def adicionar_varios(self, df_novos, df_atual=None):
+        linhas = [self._linha_json(linha) for linha in df_novos.to_dict('records')]
+        with self._trava:
+            self._atualizar_estado()
+            self._anexar({'op': 'adicionar_varios', 'linhas': linhas})
+
+    def atualizar(self, id_curso, linha, df_atual=None):
+        with self._trava:
+            self._atualizar_estado()
+            if id_curso not in self._registros:
+                return False
+            self._anexar({'op': 'atualizar', 'id': id_curso, 'linha': self._linha_json(linha)})
+            return True
+
+    def excluir(self, id_curso, df_atual=None):
+        with self._trava:
+            self._atualizar_estado()
+            if id_curso not in self._registros:
+                return None
+            return self._anexar({'op': 'excluir', 'id': id_curso})
+
+    def importar_xlsx(self, caminho):
+        with self._trava:
+            if os.path.abspath(caminho) == os.path.abspath(self.arquivo):
+                # O Excel foi substituído (ex.: sincronização): o journal local não vale mais
+                if os.path.exists(self.arquivo_journal):
+                    os.remove(self.arquivo_journal)
+                self._registros = None
+            elif os.path.exists(caminho):
+                self.salvar_tudo(self._completar_colunas(pd.read_excel(caminho, engine='openpyxl')))
+
+    def exportar_xlsx(self, caminho):
+        with self._trava:
+            self.compactar()
+            if os.path.abspath(caminho) != os.path.abspath(self.arquivo):
+                with substituicao_atomica(caminho) as temporario:
+                    self.carregar().to_excel(temporario, index=False, engine='openpyxl')
+
+
+class ArmazenamentoSQLite(ArmazenamentoBase):
+    """Tabela em SQLite com índices nas colunas usadas em filtros e prazos
+
+    As datas, que chegam e saem como dd/mm/aaaa, ficam no banco como aaaa-mm-dd:
+    assim a ordem do texto (e dos índices de prazo) é a ordem cronológica.
+    """
+
+    escrita_incremental = True
+    suporta_filtros = True
+
+    colunas_indexadas = [
+        'Estado', 'Prioridade', 'Numero do SIGAD',
+        'Prazo dado pela chefia', 'Fim da indicação da SIAT'
+    ]
+    colunas_data = set(COLUNAS_DATA)
+    _data_br = re.compile(r'(\d{2})/(\d{2})/(\d{4})$')
+    _data_iso = re.compile(r'(\d{4})-(\d{2})-(\d{2})$')
+
+    def __init__(self, colunas, arquivo="data/cursos.db", trava=None):
+        super().__init__(colunas, trava)
+        self.arquivo = arquivo
+
+    def _conectar(self):
+        # Uma conexão por operação: o Streamlit executa cada sessão em uma thread
+        return sqlite3.connect(self.arquivo)
+
+    @contextmanager
+    def _transacao(self):
+        conn = self._conectar()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _q(nome):
+        return '"' + nome.replace('"', '""') + '"'
+
+    _valor = staticmethod(_valor_simples)
+
+    def _para_banco(self, coluna, valor):
+        """Valor como gravado no banco: datas dd/mm/aaaa viram aaaa-mm-dd"""
+        valor = self._valor(valor)
+        if coluna in self.colunas_data and isinstance(valor, str):
+            data = self._data_br.match(valor.strip())
+            if data:
+                return f"{data[3]}-{data[2]}-{data[1]}"
+        return valor
+
+    @classmethod
+    def _do_banco(cls, valor):
+        """Data aaaa-mm-dd lida do banco de volta a dd/mm/aaaa (outros valores como estão)"""
+        if isinstance(valor, str):
+            data = cls._data_iso.match(valor)
+            if data:
+                return f"{data[3]}/{data[2]}/{data[1]}"
+        return valor
+
+    def _df_do_banco(self, df):
+        # Valor a valor: o dtype das colunas de texto varia (object no pandas 2, str no 3)
+        for col in self.colunas_data.intersection(df.columns):
+            df[col] = df[col].map(self._do_banco)
+        return df
+
+    def _linha_do_banco(self, valores):
+        linha = dict(zip(self.colunas, valores))
+        for col in self.colunas_data.intersection(linha):
+            linha[col] = self._do_banco(linha[col])
+        return linha
+
+    def assinatura(self):
+        try:
+            info = os.stat(self.arquivo)
+        except OSError:
+            return None
+        # Em modo WAL as escritas ficam no arquivo -wal até o checkpoint
+        try:
+            wal = os.stat(self.arquivo + "-wal")
+            return (info.st_mtime_ns, info.st_size, wal.st_mtime_ns, wal.st_size)
+        except OSError:
+            return (info.st_mtime_ns, info.st_size)
+
+    def inicializar(self):
+        os.makedirs(os.path.dirname(self.arquivo) or ".", exist_ok=True)
+        colunas_sql = ", ".join(self._q(c) for c in self.colunas)
+        conn = self._conectar()
+        try:
+            # WAL: leitores não bloqueiam enquanto outra sessão grava
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        with self._transacao() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS cursos ({colunas_sql})")
+            # Bancos criados antes de novas colunas (ex.: id) recebem as que faltam
+            existentes = {linha[1] for linha in conn.execute("PRAGMA table_info(cursos)")}
+            for col in self.colunas:
+                if col not in existentes:
+                    conn.execute(f"ALTER TABLE cursos ADD COLUMN {self._q(col)}")
+            # Bancos com datas em dd/mm/aaaa passam para aaaa-mm-dd
+            for col in self.colunas_data.intersection(self.colunas):
+                q = self._q(col)
+                conn.execute(
+                    f"UPDATE cursos SET {q} = substr({q}, 7, 4) || '-' || substr({q}, 4, 2) || '-' || substr({q}, 1, 2) "
+                    f"WHERE {q} GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'"
+                )
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_cursos_id ON cursos ({self._q(self.coluna_id)})")
+            for i, col in enumerate(self.colunas_indexadas):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_cursos_{i} ON cursos ({self._q(col)})")
+
+    def _where(self, filtros):
+        clausulas = []
+        parametros = []
+        for col, valores in (filtros or {}).items():
+            if valores and col in self.colunas:
+                marcadores = ", ".join("?" for _ in valores)
+                clausulas.append(f"{self._q(col)} IN ({marcadores})")
+                parametros.extend(self._para_banco(col, v) for v in valores)
+        if not clausulas:
+            return "", []
+        return " WHERE " + " AND ".join(clausulas), parametros
+
+    def carregar(self, filtros=None):
+        colunas_sql = ", ".join(self._q(c) for c in self.colunas)
+        where, parametros = self._where(filtros)
+        conn = self._conectar()
+        try:
+            return self._df_do_banco(pd.read_sql_query(
+                f"SELECT {colunas_sql} FROM cursos{where} ORDER BY rowid", conn, params=parametros
+            ))
+        finally:
+            conn.close()
+
+    def carregar_pagina(self, offset, limite, filtros=None):
+        colunas_sql = ", ".join(self._q(c) for c in self.colunas)
+        where, parametros = self._where(filtros)
+        conn = self._conectar()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM cursos{where}", parametros).fetchone()[0]
+            pagina = pd.read_sql_query(
+                f"SELECT {colunas_sql} FROM cursos{where} ORDER BY rowid LIMIT ? OFFSET ?",
+                conn, params=parametros + [limite, offset]
+            )
+        finally:
+            conn.close()
+        return self._df_do_banco(pagina), total
+
+    def obter(self, id_curso):
+        colunas_sql = ", ".join(self._q(c) for c in self.colunas)
+        conn = self._conectar()
+        try:
+            valores = conn.execute(
+                f"SELECT {colunas_sql} FROM cursos WHERE {self._q(self.coluna_id)} = ?", (id_curso,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return self._linha_do_banco(valores) if valores else None
+
+    def salvar_tudo(self, df):
+        df = self._completar_colunas(df.copy())
+        # Ids vazios viram NULL para não violar o índice único (o DataManager os gera depois)
+        ids = df[self.coluna_id].astype(object)
+        df[self.coluna_id] = ids.where(ids.notna() & (ids.astype(str).str.strip() != ""), None)
+        colunas_sql = ", ".join(self._q(c) for c in self.colunas)
+        marcadores = ", ".join("?" for _ in self.colunas)
+        linhas = [
+            tuple(self._para_banco(c, v) for c, v in zip(self.colunas, registro))
+            for registro in df[self.colunas].itertuples(index=False, name=None)
+        ]
+        with self._transacao() as conn:
+            conn.execute("DELETE FROM cursos")
+            conn.executemany(f"INSERT INTO cursos ({colunas_sql}) VALUES ({marcadores})", linhas)
+
+    def adicionar(self, linha, df_atual=None):
+        colunas = [c for c in self.colunas if c in linha]
+        colunas_sql = ", ".join(self._q(c) for c in colunas)
+        marcadores = ", ".join("?" for _ in colunas)
+        with self._transacao() as conn:
+            conn.execute(
+                f"INSERT INTO cursos ({colunas_sql}) VALUES ({marcadores})",
+                [self._para_banco(c, linha[c]) for c in colunas]
+            )
+
+    def adicionar_varios(self, df_novos, df_atual=None):
+        colunas = [c for c in self.colunas if c in df_novos.columns]
+        colunas_sql = ", ".join(self._q(c) for c in colunas)
+        marcadores = ", ".join("?" for _ in colunas)
+        linhas = [
+            tuple(self._para_banco(c, v) for c, v in zip(colunas, registro))
+            for registro in df_novos[colunas].itertuples(index=False, name=None)
+        ]
+        with self._transacao() as conn:
+            conn.executemany(f"INSERT INTO cursos ({colunas_sql}) VALUES ({marcadores})", linhas)
+
+    def atualizar(self, id_curso, linha, df_atual=None):
+        colunas = [c for c in self.colunas if c in linha and c != self.coluna_id]
+        atribuicoes = ", ".join(f"{self._q(c)} = ?" for c in colunas)
+        with self._transacao() as conn:
+            cursor = conn.execute(
+                f"UPDATE cursos SET {atribuicoes} WHERE {self._q(self.coluna_id)} = ?",
+                [self._para_banco(c, linha[c]) for c in colunas] + [id_curso]
+            )
+            return cursor.rowcount > 0
+
+    def excluir(self, id_curso, df_atual=None):
+        colunas_sql = ", ".join(self._q(c) for c in self.colunas)
+        condicao = f"{self._q(self.coluna_id)} = ?"
+        with self._transacao() as conn:
+            valores = conn.execute(f"SELECT {colunas_sql} FROM cursos WHERE {condicao}", (id_curso,)).fetchone()
+            if valores is None:
+                return None
+            conn.execute(f"DELETE FROM cursos WHERE {condicao}", (id_curso,))
+        return self._linha_do_banco(valores)
+
+    def importar_xlsx(self, caminho):
+        if os.path.exists(caminho):
+            df = self._completar_colunas(pd.read_excel(caminho, engine='openpyxl'))
+            self.salvar_tudo(df)
+
+    def exportar_xlsx(self, caminho):
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with substituicao_atomica(caminho) as temporario:
+            self.carregar().to_excel(temporario, index=False, engine='openpyxl')
+
+
+MOTORES = {
+    'xlsx': ArmazenamentoXlsx,
+    'journal': ArmazenamentoXlsxJournal,
+    'sqlite': ArmazenamentoSQLite,
+}
+
+
+def criar_armazenamento(motor, colunas, arquivo_xlsx="data/cursos.xlsx", trava=None):
+    """Instancia o motor pelo nome ('xlsx', 'journal' ou 'sqlite')"""
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de armazenamento desconhecido: {motor}")
+    if motor in ('xlsx', 'journal'):
+        return MOTORES[motor](colunas, arquivo_xlsx, trava)
+    return ArmazenamentoSQLite(colunas, os.path.splitext(arquivo_xlsx)[0] + ".db", trava)
@@ -0,0 +1,98 @@
+"""Mede a latência de salvar e sincronizar com o GitHub usando o servidor local
+
+    python benchmark_github.py --salvamentos 50 --latencia 0.05 --conflitos 0.1
+
+Sobe o servidor_github_local.py numa thread, aponta o GitHubManager para ele
+(GITHUB_API_URL) e mostra os percentis de cada operação e quantas
+requisições à API cada uma fez.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_github_local import iniciar_em_segundo_plano
+
+
+def percentis(tempos):
+    ordenados = sorted(tempos)
+
+    def p(q):
+        return ordenados[min(len(ordenados) - 1, int(round(q * (len(ordenados) - 1))))] * 1000
+
+    return f"p50 {p(0.5):7.1f} ms | p90 {p(0.9):7.1f} ms | p99 {p(0.99):7.1f} ms | máx {ordenados[-1] * 1000:7.1f} ms"
+
+
+def medir(nome, operacao, vezes, estado, falhas_ok=False):
+    antes = sum(estado.contagem.values())
+    tempos, falhas = [], 0
+    for i in range(vezes):
+        inicio = time.perf_counter()
+        sucesso, _ = operacao(i)
+        tempos.append(time.perf_counter() - inicio)
+        falhas += not sucesso
+    requisicoes = (sum(estado.contagem.values()) - antes) / vezes
+    print(f"{nome:<28} {percentis(tempos)} | {requisicoes:4.1f} req/op | falhas {falhas}")
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salvamentos", type=int, default=30)
+    parser.add_argument("--sincronizacoes", type=int, default=30)
+    parser.add_argument("--tamanho", type=int, default=200, help="KB do arquivo enviado")
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos por requisição")
+    parser.add_argument("--variacao", type=float, default=0.01)
+    parser.add_argument("--conflitos", type=float, default=0.0, help="probabilidade de conflito por PUT")
+    parser.add_argument("--limite", type=int, default=None, help="requisições por janela (limite de taxa)")
+    parser.add_argument("--janela", type=float, default=5.0)
+    args = parser.parse_args()
+
+    _, estado, url = iniciar_em_segundo_plano(
+        latencia=args.latencia, variacao=args.variacao, taxa_conflito=args.conflitos,
+        limite_requisicoes=args.limite, janela=args.janela, semente=42
+    )
+    os.environ.update(GITHUB_API_URL=url, GITHUB_TOKEN="token-local", GITHUB_REPO="local/cursos")
+    os.chdir(tempfile.mkdtemp(prefix="benchmark_github_"))
+
+    from github_manager import GitHubManager
+    gh = GitHubManager()
+    if not gh.authenticated:
+        sys.exit("Não foi possível conectar ao servidor local")
+
+    conteudo = os.urandom(args.tamanho * 1024)
+    print(f"Servidor {url} | latência {args.latencia * 1000:.0f} ms | arquivo {args.tamanho} KB\n")
+
+    medir("salvar (commit_excel)",
+          lambda i: gh.commit_excel(conteudo + str(i).encode(), f"benchmark {i}"),
+          args.salvamentos, estado)
+    medir("sincronizar sem mudança",
+          lambda i: gh.sincronizar_para_local(),
+          args.sincronizacoes, estado)
+
+    def sincronizar_com_mudanca(i):
+        estado.gravar(gh.arquivo_path, conteudo + b"externo%d" % i, "Gravação externa", "outro-cliente")
+        return gh.sincronizar_para_local()
+
+    medir("sincronizar com mudança", sincronizar_com_mudanca, args.sincronizacoes, estado)
+    medir("status (sem cache)",
+          lambda i: (gh._atualizar_status()[0], ""),
+          max(1, args.sincronizacoes // 3), estado)
+
+    metricas = gh.metricas_api()
+    print("\nAgendador de requisições:")
+    print(f"  chamadas     {metricas['chamadas']}")
+    print(f"  evitadas     {metricas['economizadas']}")
+    print(f"  limites atingidos {metricas['limites_atingidos']} | tempo esperando {metricas['tempo_espera']:.2f} s"
+          f" | cota {metricas['restantes']}/{metricas['limite']}")
+
+    print("\nRequisições por endpoint:")
+    for chave, total in sorted(estado.contagem.items()):
+        print(f"  {chave:<22} {total}")
+
+
+if __name__ == "__main__":
+    main()
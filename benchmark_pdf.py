@@ -0,0 +1,195 @@
+"""Mede a vazão e a precisão do PDFExtractor em PDFs sintéticos e compara com uma base salva
+
+    python benchmark_pdf.py --paginas 20,200 --layouts texto,tabela --ruido 0.3 --salvar base_pdf.json
+    python benchmark_pdf.py --paginas 20,200 --layouts texto,tabela --ruido 0.3 --comparar base_pdf.json
+
+Para cada cenário, gera o PDF com corpus_pdf.py e mede `extrair_cursos` e
+`extrair_texto_bruto` num processo novo (sem cache), com a mediana das repetições:
+páginas/s, cursos/s, pico de memória (RSS) e, para os cursos, a fração dos cursos
+esperados encontrados e de campos corretos. Com --comparar, aponta quedas de vazão
+acima da tolerância ou de precisão e termina com código 1.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import multiprocessing
+from io import BytesIO
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de memória
+    resource = None
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from corpus_pdf import gerar_pdf
+from pdf_extractor import PDFExtractor
+
+CAMPOS = ['Curso', 'Turma', 'Vagas', 'Recebimento do SIGAD com as vagas', 'Numero do SIGAD']
+OPERACOES = ['extrair_cursos', 'extrair_texto_bruto']
+
+
+def _rss_maximo():
+    """Maior RSS já atingido por este processo e pelos filhos encerrados, em MB"""
+    if resource is None:
+        return None
+    maximo = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                 resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return maximo / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _medir(pdf_bytes, operacao, repeticoes, processos):
+    """Roda num processo novo: (tempos, resultado da primeira execução, RSS antes, pico)"""
+    os.environ.pop('PDF_CACHE_DIR', None)
+    extrator = PDFExtractor(processos=processos)
+    rss_antes = _rss_maximo()
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        PDFExtractor.limpar_cache()
+        inicio = time.perf_counter()
+        saida = getattr(extrator, operacao)(BytesIO(pdf_bytes))
+        tempos.append(time.perf_counter() - inicio)
+        if resultado is None:
+            resultado = saida if operacao == 'extrair_cursos' else len(saida)
+    PDFExtractor.encerrar_pools()
+    return tempos, resultado, rss_antes, _rss_maximo()
+
+
+def medir_em_processo_novo(pdf_bytes, operacao, repeticoes, processos):
+    # Um processo por medição: o pico de RSS não herda o das medições anteriores
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_medir, pdf_bytes, operacao, repeticoes, processos).result()
+
+
+def _normalizar(valor):
+    return str(valor).strip()
+
+
+def precisao(esperados, extraidos):
+    """Fração dos cursos esperados encontrados (pelo nome) e dos campos corretos"""
+    por_nome = {}
+    for curso in extraidos:
+        por_nome.setdefault(_normalizar(curso.get('Curso', '')), curso)
+    acertos = dict.fromkeys(CAMPOS, 0)
+    encontrados = 0
+    for esperado in esperados:
+        achado = por_nome.get(_normalizar(esperado['Curso']))
+        if achado is None:
+            continue
+        encontrados += 1
+        for campo in CAMPOS:
+            acertos[campo] += _normalizar(achado.get(campo, '')) == _normalizar(esperado[campo])
+    total = max(1, len(esperados))
+    return {
+        'cursos_encontrados': encontrados / total,
+        'campos_corretos': sum(acertos.values()) / (total * len(CAMPOS)),
+        'por_campo': {campo: acertos[campo] / total for campo in CAMPOS},
+        'cursos_a_mais': len(extraidos) - encontrados,
+    }
+
+
+def executar_cenario(layout, paginas, cursos_por_pagina, ruido, semente, repeticoes, processos):
+    pdf, esperados = gerar_pdf(paginas, cursos_por_pagina, layout, ruido, semente)
+    resultados = {}
+    for operacao in OPERACOES:
+        tempos, resultado, rss_antes, rss_pico = medir_em_processo_novo(pdf, operacao, repeticoes, processos)
+        mediana = statistics.median(tempos)
+        metricas = {
+            'segundos': mediana,
+            'paginas_s': paginas / mediana,
+            'rss_pico_mb': rss_pico,
+            'rss_extracao_mb': None if rss_pico is None else rss_pico - rss_antes,
+        }
+        if operacao == 'extrair_cursos':
+            metricas['cursos_s'] = len(resultado) / mediana
+            metricas.update(precisao(esperados, resultado))
+        else:
+            metricas['caracteres'] = resultado
+        resultados[f"{layout}-{paginas}p-{cursos_por_pagina}c-r{ruido:g}-{operacao}"] = metricas
+    return resultados
+
+
+def _mb(valor):
+    return "   n/d" if valor is None else f"{valor:6.0f}"
+
+
+def mostrar(chave, m):
+    linha = (f"{chave:<44} {m['segundos'] * 1000:8.0f} ms | {m['paginas_s']:7.1f} pág/s"
+             f" | pico {_mb(m['rss_pico_mb'])} MB (+{_mb(m['rss_extracao_mb']).strip()})")
+    if 'cursos_s' in m:
+        linha += (f" | {m['cursos_s']:7.1f} cursos/s | encontrados {m['cursos_encontrados']:6.1%}"
+                  f" | campos {m['campos_corretos']:6.1%} | a mais {m['cursos_a_mais']}")
+    print(linha)
+
+
+def comparar(atual, base, tolerancia):
+    """Lista as regressões de `atual` em relação a `base` (mesmos cenários)"""
+    regressoes = []
+    for chave, m in atual.items():
+        anterior = base.get(chave)
+        if anterior is None:
+            continue
+        variacao = m['paginas_s'] / anterior['paginas_s'] - 1
+        print(f"{chave:<44} vazão {variacao:+7.1%}", end="")
+        if variacao < -tolerancia:
+            regressoes.append(f"{chave}: vazão {variacao:+.1%}")
+        if anterior.get('rss_extracao_mb') is not None and m.get('rss_extracao_mb') is not None:
+            print(f" | memória {m['rss_extracao_mb'] - anterior['rss_extracao_mb']:+6.0f} MB", end="")
+        if 'campos_corretos' in anterior:
+            diferenca = m['campos_corretos'] - anterior['campos_corretos']
+            print(f" | campos {diferenca * 100:+5.1f} p.p.", end="")
+            if diferenca < -1e-9:
+                regressoes.append(f"{chave}: campos corretos {diferenca * 100:+.1f} p.p.")
+        print()
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", default="20,100", help="tamanhos dos PDFs, separados por vírgula")
+    parser.add_argument("--cursos-por-pagina", type=int, default=10)
+    parser.add_argument("--layouts", default="texto,tabela")
+    parser.add_argument("--ruido", type=float, default=0.3)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--processos", type=int, default=1, help="PDF_PROCESSOS do extrator medido")
+    parser.add_argument("--salvar", help="grava os resultados como base neste arquivo JSON")
+    parser.add_argument("--comparar", help="compara com a base gravada neste arquivo JSON")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="queda de vazão aceita (fração)")
+    args = parser.parse_args()
+
+    resultados = {}
+    for layout in args.layouts.split(","):
+        for paginas in [int(p) for p in args.paginas.split(",")]:
+            cenario = executar_cenario(layout, paginas, args.cursos_por_pagina, args.ruido,
+                                       args.semente, args.repeticoes, args.processos)
+            for chave, metricas in cenario.items():
+                mostrar(chave, metricas)
+            resultados.update(cenario)
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump({'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                       'python': sys.version.split()[0], 'processos': args.processos,
+                       'cenarios': resultados}, f, ensure_ascii=False, indent=2)
+        print(f"\nBase gravada em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        print(f"\nComparação com {args.comparar} ({base.get('gerado_em', '?')}):")
+        regressoes = comparar(resultados, base['cenarios'], args.tolerancia)
+        if regressoes:
+            print("\nRegressões:\n  " + "\n  ".join(regressoes))
+            sys.exit(1)
+        print("\nSem regressões.")
+
+
+if __name__ == "__main__":
+    main()
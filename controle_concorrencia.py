@@ -0,0 +1,136 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def substituicao_atomica(caminho):
+    """Entrega um caminho temporário e, se tudo der certo, o move sobre `caminho`
+
+    A troca com os.replace é atômica: quem lê o arquivo vê sempre a versão
+    antiga completa ou a nova completa, nunca um arquivo pela metade.
+    """
+    pasta = os.path.dirname(caminho) or "."
+    os.makedirs(pasta, exist_ok=True)
+    base, extensao = os.path.splitext(caminho)
+    temporario = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp{extensao}"
+    try:
+        yield temporario
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def gravar_atomico(caminho, dados):
+    """Grava bytes em `caminho` via arquivo temporário + rename"""
+    with substituicao_atomica(caminho) as temporario:
+        with open(temporario, 'wb') as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class _EstadoTrava:
+    def __init__(self):
+        self.trava_local = threading.RLock()
+        self.por_thread = threading.local()
+
+
+class TravaArquivo:
+    """Trava exclusiva entre processos e threads baseada em um arquivo .lock
+
+    É reentrante na mesma thread: o DataManager segura a trava durante o
+    ciclo leitura-modificação-escrita e os motores podem pedi-la de novo.
+    Leitores não usam a trava.
+    """
+
+    _estados = {}
+    _guarda = threading.Lock()
+
+    def __init__(self, caminho):
+        self.caminho = os.path.abspath(caminho)
+        with TravaArquivo._guarda:
+            self._estado = TravaArquivo._estados.setdefault(self.caminho, _EstadoTrava())
+
+    def __enter__(self):
+        self._estado.trava_local.acquire()
+        por_thread = self._estado.por_thread
+        profundidade = getattr(por_thread, 'profundidade', 0)
+        if profundidade == 0:
+            try:
+                por_thread.arquivo = self._travar()
+            except BaseException:
+                self._estado.trava_local.release()
+                raise
+        por_thread.profundidade = profundidade + 1
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        por_thread = self._estado.por_thread
+        por_thread.profundidade -= 1
+        try:
+            if por_thread.profundidade == 0:
+                self._destravar(por_thread.arquivo)
+                por_thread.arquivo = None
+        finally:
+            self._estado.trava_local.release()
+
+    def _travar(self):
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        arquivo = open(self.caminho, 'a+b')
+        try:
+            if fcntl:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+            else:
+                arquivo.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK desiste após ~10s; continuar tentando
+                        continue
+        except BaseException:
+            arquivo.close()
+            raise
+        return arquivo
+
+    def _destravar(self, arquivo):
+        try:
+            if fcntl:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            arquivo.close()
+
+
+class VersaoDados:
+    """Contador monotônico da versão dos dados, gravado ao lado da planilha
+
+    A leitura não usa trava; o incremento deve ser feito com a TravaArquivo
+    segura, no mesmo ciclo da escrita dos dados.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def ler(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def incrementar(self):
+        nova = self.ler() + 1
+        gravar_atomico(self.caminho, str(nova).encode('utf-8'))
+        return nova
@@ -0,0 +1,196 @@
+"""PDFs sintéticos de cursos, determinísticos, para medir e conferir o PDFExtractor
+
+    python corpus_pdf.py saida.pdf --paginas 50 --cursos-por-pagina 8 --layout tabela --ruido 0.3
+
+Grava o PDF e, ao lado, um .json com os cursos esperados (colunas do DataManager).
+O PDF é montado à mão (texto em Helvetica e linhas de grade), sem dependências além
+da biblioteca padrão. A mesma semente gera sempre os mesmos bytes.
+"""
+import json
+import zlib
+import random
+import argparse
+
+PALAVRAS = ("objetivo capacitar militares servidores gestão processos logísticos planejamento "
+            "orçamento aquisições contratos normas procedimentos avaliação frequência mínima "
+            "carga horária presencial módulos prática conteúdo programático").split()
+TEMAS = ["Logística", "Gestão de Contratos", "Planejamento Orçamentário", "Licitações",
+         "Auditoria", "Segurança da Informação", "Gestão de Pessoas", "Almoxarifado"]
+
+# Rótulos do layout em texto: o primeiro é o do formato documentado; os outros entram com o ruído
+ROTULOS = {
+    'Curso': ["Curso: ", "CURSO - ", "Curso ", "Nome do Curso: "],
+    'Data': ["Data: ", "Data de Início: ", "Início: ", "DATA "],
+    'Turma': ["Turma: ", "TURMA/ANO: ", "Turma - "],
+    'Vagas': ["Vagas: ", "Quantidade de Vagas: ", "Número de Vagas - "],
+    'SIGAD': ["SIGAD: ", "Número do SIGAD: ", "Processo SIGAD "],
+}
+# Cabeçalhos do layout em tabela, na ordem das colunas
+CABECALHOS = [
+    ["Curso", "Nome do Curso"],
+    ["Turma", "Turma/Ano"],
+    ["Vagas", "Nº de Vagas", "Quantidade de Vagas"],
+    ["Data", "Data de Início", "Início"],
+    ["SIGAD", "Nº SIGAD", "Número do SIGAD"],
+]
+LARGURAS = [170, 70, 100, 80, 100]
+
+
+def gerar_cursos(aleatorio, quantidade, inicio=0):
+    cursos = []
+    for i in range(inicio, inicio + quantidade):
+        cursos.append({
+            'Curso': f"{aleatorio.choice(TEMAS)} {i + 1}",
+            'Turma': f"T{aleatorio.randint(1, 9)}/2026",
+            'Vagas': aleatorio.randint(1, 60),
+            'Recebimento do SIGAD com as vagas': f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2026",
+            'Numero do SIGAD': f"{aleatorio.randint(10000, 99999)}/2026",
+        })
+    return cursos
+
+
+def _escapar(texto):
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _ops_texto(linhas, topo=800, base=40):
+    # Entrelinha ajustada para a página comportar todas as linhas
+    entrelinha = min(12.0, (topo - base) / max(1, len(linhas)))
+    fonte = min(10.0, entrelinha * 0.8)
+    ops = [f"BT /F1 {fonte:.2f} Tf 40 {topo} Td {entrelinha:.2f} TL"]
+    ops += [f"({_escapar(linha)}) Tj T*" for linha in linhas]
+    ops.append("ET")
+    return ops
+
+
+def _ops_tabela(linhas, topo=780, base=60, x0=30):
+    altura = min(18.0, (topo - base) / max(1, len(linhas)))
+    fonte = min(8.0, altura * 0.6)
+    largura_total = sum(LARGURAS)
+    ops = ["0.5 w"]
+    for i in range(len(linhas) + 1):
+        y = topo - i * altura
+        ops.append(f"{x0} {y:.2f} m {x0 + largura_total} {y:.2f} l S")
+    x = x0
+    for largura in LARGURAS + [0]:
+        ops.append(f"{x} {topo} m {x} {topo - len(linhas) * altura:.2f} l S")
+        x += largura
+    for i, linha in enumerate(linhas):
+        x = x0
+        for largura, celula in zip(LARGURAS, linha):
+            ops.append(f"BT /F1 {fonte:.2f} Tf {x + 2} {topo - (i + 1) * altura + altura * 0.3:.2f} Td "
+                       f"({_escapar(celula)}) Tj ET")
+            x += largura
+    return ops
+
+
+def _paginas_texto(aleatorio, cursos, por_pagina, ruido):
+    paginas = []
+    total_paginas = -(-len(cursos) // por_pagina)
+    for numero in range(total_paginas):
+        linhas = []
+        if aleatorio.random() < ruido:
+            linhas += [f"CATÁLOGO DE CURSOS 2026 - Página {numero + 1} de {total_paginas}", ""]
+        for curso in cursos[numero * por_pagina:(numero + 1) * por_pagina]:
+            def rotulo(campo):
+                opcoes = ROTULOS[campo]
+                return aleatorio.choice(opcoes[1:]) if aleatorio.random() < ruido else opcoes[0]
+
+            linhas += [
+                rotulo('Curso') + curso['Curso'],
+                rotulo('Data') + curso['Recebimento do SIGAD com as vagas'],
+                rotulo('Turma') + curso['Turma'],
+                rotulo('Vagas') + str(curso['Vagas']),
+                rotulo('SIGAD') + curso['Numero do SIGAD'],
+            ]
+            if aleatorio.random() < ruido:
+                linhas.append(" ".join(aleatorio.choice(PALAVRAS) for _ in range(10)))
+            linhas += ["", aleatorio.choice(["=====", "-----", ""]) if aleatorio.random() < ruido else "=====", ""]
+        paginas.append(_ops_texto(linhas))
+    return paginas
+
+
+def _paginas_tabela(aleatorio, cursos, por_pagina, ruido):
+    paginas = []
+    for inicio in range(0, len(cursos), por_pagina):
+        cabecalho = [aleatorio.choice(opcoes) if aleatorio.random() < ruido else opcoes[0] for opcoes in CABECALHOS]
+        linhas = [cabecalho]
+        for curso in cursos[inicio:inicio + por_pagina]:
+            vagas = str(curso['Vagas'])
+            if aleatorio.random() < ruido:
+                vagas += " vagas"
+            linhas.append([curso['Curso'], curso['Turma'], vagas,
+                           curso['Recebimento do SIGAD com as vagas'], curso['Numero do SIGAD']])
+        ops = _ops_tabela(linhas)
+        if aleatorio.random() < ruido:
+            ops += _ops_texto([" ".join(aleatorio.choice(PALAVRAS) for _ in range(12))], topo=40, base=30)
+        paginas.append(ops)
+    return paginas
+
+
+def escrever_pdf(paginas):
+    """Bytes de um PDF com uma página por lista de operadores de conteúdo"""
+    objetos = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    filhos = []
+    for ops in paginas:
+        conteudo = zlib.compress("\n".join(ops).encode('cp1252'))
+        objetos.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+        objetos.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objetos))
+        filhos.append(len(objetos))
+    objetos[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objetos[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % filho for filho in filhos), len(filhos)
+    )
+
+    saida = bytearray(b"%PDF-1.4\n")
+    posicoes = []
+    for numero, objeto in enumerate(objetos, 1):
+        posicoes.append(len(saida))
+        saida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    saida += b"".join(b"%010d 00000 n \n" % posicao for posicao in posicoes)
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(saida)
+
+
+def gerar_pdf(paginas=10, cursos_por_pagina=8, layout="texto", ruido=0.0, semente=0):
+    """(bytes do PDF, cursos esperados) para os parâmetros dados
+
+    `layout` é "texto" (rótulos e separadores) ou "tabela" (um curso por linha, com
+    grade). `ruido` (0 a 1) é a chance de rótulos e cabeçalhos alternativos, de
+    cabeçalhos de página, de texto corrido entre os cursos e de separadores diferentes.
+    """
+    aleatorio = random.Random(f"{semente}-{layout}-{paginas}-{cursos_por_pagina}-{ruido}")
+    cursos = gerar_cursos(aleatorio, paginas * cursos_por_pagina)
+    if layout == "texto":
+        conteudo = _paginas_texto(aleatorio, cursos, cursos_por_pagina, ruido)
+    elif layout == "tabela":
+        conteudo = _paginas_tabela(aleatorio, cursos, cursos_por_pagina, ruido)
+    else:
+        raise ValueError(f"Layout desconhecido: {layout}")
+    return escrever_pdf(conteudo), cursos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("saida", help="arquivo .pdf a gravar")
+    parser.add_argument("--paginas", type=int, default=10)
+    parser.add_argument("--cursos-por-pagina", type=int, default=8)
+    parser.add_argument("--layout", choices=["texto", "tabela"], default="texto")
+    parser.add_argument("--ruido", type=float, default=0.0)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    pdf, cursos = gerar_pdf(args.paginas, args.cursos_por_pagina, args.layout, args.ruido, args.semente)
+    with open(args.saida, 'wb') as f:
+        f.write(pdf)
+    esperados = args.saida.rsplit('.', 1)[0] + '.json'
+    with open(esperados, 'w', encoding='utf-8') as f:
+        json.dump(cursos, f, ensure_ascii=False, indent=2)
+    print(f"{args.saida}: {args.paginas} página(s), {len(cursos)} curso(s), {len(pdf) / 1024:.0f} KB ({esperados})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, date
+from esquema import dias_ate
 
 class Dashboard:
     def __init__(self):
@@ -36,6 +36,8 @@ class Dashboard:
             if 'Estado' in df.columns:
                 contagem = df['Estado'].value_counts().reset_index()
                 contagem.columns = ['Estado', 'Quantidade']
+                # Coluna categórica: value_counts inclui as categorias sem cursos
+                contagem = contagem[contagem['Quantidade'] > 0]
                 
                 cores = {
                     'solicitar voluntários': '#FF6B6B',
@@ -62,6 +64,7 @@ class Dashboard:
             if 'Prioridade' in df.columns:
                 contagem = df['Prioridade'].value_counts().reset_index()
                 contagem.columns = ['Prioridade', 'Quantidade']
+                contagem = contagem[contagem['Quantidade'] > 0]
                 
                 cores_prioridade = {
                     'Alta': '#FF6B6B',
@@ -83,65 +86,40 @@ class Dashboard:
     
     def _grafico_prazos_proximos(self, df):
         try:
-            if 'Fim indicação da SIAT' in df.columns:
-                df_prazos = df[df['Fim indicação da SIAT'].notna()].copy()
+            if 'Fim da indicação da SIAT' in df.columns:
+                # A coluna já é datetime64: os dias restantes saem numa única operação
+                dias_restantes = dias_ate(df['Fim da indicação da SIAT']).dropna()
                 
-                if not df_prazos.empty:
-                    hoje = date.today()
+                if not dias_restantes.empty:
+                    ordem = ["Atrasado", "0-5 dias", "6-15 dias", "16-30 dias", "+30 dias"]
+                    categoria = pd.cut(
+                        dias_restantes,
+                        bins=[-float('inf'), -1, 5, 15, 30, float('inf')],
+                        labels=ordem
+                    )
                     
-                    def calcular_dias(data_str):
-                        try:
-                            if isinstance(data_str, str):
-                                data = datetime.strptime(data_str, "%d/%m/%Y").date()
-                            else:
-                                data = data_str
-                            return (data - hoje).days
-                        except:
-                            return None
+                    contagem = categoria.value_counts(sort=False).reset_index()
+                    contagem.columns = ['Prazo', 'Quantidade']
+                    contagem = contagem[contagem['Quantidade'] > 0]
                     
-                    df_prazos['dias_restantes'] = df_prazos['Fim indicação da SIAT'].apply(calcular_dias)
-                    df_prazos = df_prazos[df_prazos['dias_restantes'].notna()]
+                    cores_prazo = {
+                        'Atrasado': '#FF0000',
+                        '0-5 dias': '#FFD700',
+                        '6-15 dias': '#FFA500',
+                        '16-30 dias': '#90EE90',
+                        '+30 dias': '#008000'
+                    }
                     
-                    if not df_prazos.empty:
-                        def categorizar_prazo(dias):
-                            if dias < 0:
-                                return "Atrasado"
-                            elif dias <= 5:
-                                return "0-5 dias"
-                            elif dias <= 15:
-                                return "6-15 dias"
-                            elif dias <= 30:
-                                return "16-30 dias"
-                            else:
-                                return "+30 dias"
-                        
-                        df_prazos['categoria'] = df_prazos['dias_restantes'].apply(categorizar_prazo)
-                        
-                        contagem = df_prazos['categoria'].value_counts().reset_index()
-                        contagem.columns = ['Prazo', 'Quantidade']
-                        
-                        ordem = ["Atrasado", "0-5 dias", "6-15 dias", "16-30 dias", "+30 dias"]
-                        contagem['Prazo'] = pd.Categorical(contagem['Prazo'], categories=ordem, ordered=True)
-                        contagem = contagem.sort_values('Prazo')
-                        
-                        cores_prazo = {
-                            'Atrasado': '#FF0000',
-                            '0-5 dias': '#FFD700',
-                            '6-15 dias': '#FFA500',
-                            '16-30 dias': '#90EE90',
-                            '+30 dias': '#008000'
-                        }
-                        
-                        fig = px.bar(
-                            contagem,
-                            x='Prazo',
-                            y='Quantidade',
-                            color='Prazo',
-                            color_discrete_map=cores_prazo,
-                            title='Prazos de Indicação SIAT'
-                        )
-                        fig.update_layout(showlegend=False)
-                        st.plotly_chart(fig, use_container_width=True)
+                    fig = px.bar(
+                        contagem,
+                        x='Prazo',
+                        y='Quantidade',
+                        color='Prazo',
+                        color_discrete_map=cores_prazo,
+                        title='Prazos de Indicação SIAT'
+                    )
+                    fig.update_layout(showlegend=False)
+                    st.plotly_chart(fig, use_container_width=True)
         except Exception as e:
             st.error(f"Erro ao gerar gráfico de prazos: {str(e)}")
     
@@ -172,32 +150,15 @@ class Dashboard:
             resumo['total_cursos'] = len(df)
             
             if 'Estado' in df.columns:
-                resumo['por_estado'] = df['Estado'].value_counts().to_dict()
+                resumo['por_estado'] = df['Estado'].value_counts()[lambda c: c > 0].to_dict()
             
             if 'Prioridade' in df.columns:
-                resumo['por_prioridade'] = df['Prioridade'].value_counts().to_dict()
+                resumo['por_prioridade'] = df['Prioridade'].value_counts()[lambda c: c > 0].to_dict()
             
-            if 'Fim indicação da SIAT' in df.columns:
-                hoje = date.today()
-                atrasados = 0
-                urgentes = 0
-                
-                for data_str in df['Fim indicação da SIAT'].dropna():
-                    try:
-                        if isinstance(data_str, str):
-                            data = datetime.strptime(data_str, "%d/%m/%Y").date()
-                        else:
-                            data = data_str
-                        dias = (data - hoje).days
-                        if dias < 0:
-                            atrasados += 1
-                        elif dias <= 5:
-                            urgentes += 1
-                    except:
-                        pass
-                
-                resumo['prazos_atrasados'] = atrasados
-                resumo['prazos_urgentes'] = urgentes
+            if 'Fim da indicação da SIAT' in df.columns:
+                dias = dias_ate(df['Fim da indicação da SIAT'])
+                resumo['prazos_atrasados'] = int((dias < 0).sum())
+                resumo['prazos_urgentes'] = int(((dias >= 0) & (dias <= 5)).sum())
             
             return resumo
         except Exception as e:
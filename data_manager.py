@@ -1,24 +1,57 @@
 import pandas as pd
 import os
+import threading
+import uuid
+from importlib.util import find_spec
 from datetime import datetime
 from io import BytesIO
+from openpyxl import Workbook
 from github_manager import GitHubManager
+from armazenamento import criar_armazenamento
+from controle_concorrencia import TravaArquivo, VersaoDados
+from indice_busca import IndiceInvertido
+from historico import HistoricoAlteracoes
+from esquema import COLUNAS, COLUNAS_DATA, tipar, destipar, valor_para_texto
 
-# Configurar pandas para não usar PyArrow
+# O app não depende do PyArrow: o texto usa StringDtype("python") (esquema.TIPO_TEXTO)
 pd.set_option('compute.use_numba', False)
 
+# Parquet depende de um motor opcional (pyarrow ou fastparquet); sem ele o formato não é oferecido
+PARQUET_DISPONIVEL = any(find_spec(motor) for motor in ('pyarrow', 'fastparquet'))
+
 class DataManager:
-    def __init__(self, usar_github=False):
+    # Sincronização de inicialização em andamento, por arquivo local (compartilhada pelas sessões)
+    _sincronizacoes = {}
+    _guarda_sincronizacao = threading.Lock()
+    
+    def __init__(self, usar_github=False, motor=None):
         self.arquivo_local = "data/cursos.xlsx"
-        self.colunas = [
-            'Curso', 'Turma', 'Vagas', 'Autorizados pelas escalantes', 'Prioridade',
-            'Recebimento do SIGAD com as vagas', 'Numero do SIGAD', 'Estado',
-            'DATA DA CONCLUSÃO', 'Numero do SIGAD  encaminhando pra chefia',
-            'Prazo dado pela chefia', 'Fim da indicação da SIAT', 'Notas'
-        ]
+        # Colunas e tipos definidos em esquema.py
+        self.colunas = list(COLUNAS)
+        
+        # Identificador imutável atribuído na inclusão de cada curso
+        self.coluna_id = 'id'
+        
+        # Motor de armazenamento: 'xlsx' (padrão), 'journal' ou 'sqlite'. O Excel
+        # continua sendo o formato usado na exportação e na sincronização com o GitHub.
+        motor = motor or os.environ.get('STORAGE_ENGINE', 'xlsx')
+        
+        # Várias sessões (e processos) gravam os mesmos arquivos: a trava protege
+        # o ciclo leitura-modificação-escrita e a versão detecta edições concorrentes
+        base_arquivo = os.path.splitext(self.arquivo_local)[0]
+        self.trava = TravaArquivo(base_arquivo + ".lock")
+        self.versao = VersaoDados(base_arquivo + ".versao")
+        
+        self.storage = criar_armazenamento(
+            motor, [self.coluna_id] + self.colunas, self.arquivo_local, self.trava
+        )
+        
+        # Histórico local de alterações (deltas por linha + checkpoints), independente do GitHub
+        self.historico = HistoricoAlteracoes(
+            os.path.join(os.path.dirname(self.arquivo_local), "historico"), self.coluna_id
+        )
         
         # Verificar se deve usar GitHub (apenas se GITHUB_TOKEN estiver configurado)
-        import os
         token = os.environ.get('GITHUB_TOKEN') or os.environ.get(' StreamlitSecrets ', {}).get('GITHUB_TOKEN', '')
         if not token and usar_github:
             usar_github = False
@@ -26,46 +59,285 @@ class DataManager:
         self.github_manager = GitHubManager() if usar_github else None
         self.ultima_mensagem = ""
         
-        # Sincronizar do GitHub ao iniciar (apenas se autenticado)
+        # Cache do DataFrame carregado, chaveado pela assinatura do armazenamento
+        # (mtime/tamanho), pela versão dos dados e por um contador de escritas
+        # feitas por esta instância
+        self._cache_df = None
+        self._cache_chave = None
+        self._versao_cache = None
+        self._versao_escrita = 0
+        # Índice id -> posição da linha no DataFrame em cache
+        self._indice_ids = {}
+        # Índice invertido para buscar_curso e a versão dos dados que ele reflete
+        self._indice_busca = None
+        self._indice_versao = None
+        # Exportações já geradas: formato -> (chave do cache, bytes)
+        self._cache_exportacao = {}
+        # Erro da última exportação, gerada fora do script; a página o mostra com st.error
+        self.erro_exportacao = None
+        
+        with self.trava:
+            armazenamento_existia = self.storage.assinatura() is not None
+            self.storage.inicializar()
+        
+        # Sincronizar do GitHub ao iniciar (apenas se autenticado). Havendo dados
+        # locais, eles são servidos já e a sincronização roda em segundo plano
+        self._sincronizacao = None
+        baixado_do_github = False
         if self.github_manager and self.github_manager.authenticated:
-            sucesso, mensagem = self.github_manager.sincronizar_para_local()
-            self.ultima_mensagem = mensagem
+            if armazenamento_existia:
+                self.sincronizar_em_segundo_plano()
+            else:
+                sucesso, mensagem = self.sincronizar_github()
+                self.ultima_mensagem = mensagem
+                baixado_do_github = sucesso and self.github_manager.remoto_alterado
+        if not armazenamento_existia and not baixado_do_github:
+            # Primeira execução com um motor novo e nada vindo do GitHub (sem GitHub,
+            # arquivo ainda inexistente lá ou falha): migrar dados do Excel local
+            with self.trava:
+                self.storage.importar_xlsx(self.arquivo_local)
+                self.versao.incrementar()
         
-        self._criar_arquivo_se_nao_existir()
+        if not self.historico.tem_checkpoint():
+            # O histórico começa com um checkpoint da tabela atual
+            with self.trava:
+                self.historico.registrar_tabela(destipar(self._tabela_em_cache()), "Início do histórico")
+    
+    def invalidar_cache(self):
+        """Descarta o DataFrame em cache e avança a versão de escrita"""
+        self._versao_escrita += 1
+        self._cache_df = None
+        self._cache_chave = None
+        self._versao_cache = None
+        self._indice_ids = {}
+    
+    def versao_dados(self):
+        """Versão atual dos dados (aumenta a cada escrita de qualquer sessão)"""
+        return self.versao.ler()
     
-    def _criar_arquivo_se_nao_existir(self):
-        if not os.path.exists(self.arquivo_local):
-            os.makedirs("data", exist_ok=True)
-            df = pd.DataFrame(columns=self.colunas)
-            df.to_excel(self.arquivo_local, index=False, engine='openpyxl')
+    @staticmethod
+    def _novo_id():
+        return uuid.uuid4().hex[:12]
     
-    def carregar_dados(self):
+    def _atribuir_ids_faltantes(self, df):
+        """Gera ids para linhas sem id (tabelas anteriores aos ids); retorna se houve alteração"""
+        ids = df[self.coluna_id]
+        faltando = ids.isna() | (ids.astype(str).str.strip() == "")
+        if faltando.any():
+            df[self.coluna_id] = ids.astype(object)
+            df.loc[faltando, self.coluna_id] = [self._novo_id() for _ in range(int(faltando.sum()))]
+        df[self.coluna_id] = df[self.coluna_id].astype(str)
+        return bool(faltando.any())
+    
+    def _tabela_vazia(self):
+        return tipar(pd.DataFrame(columns=[self.coluna_id] + self.colunas))
+    
+    def _tabela_em_cache(self):
+        """DataFrame em cache (sem cópia), já com os tipos do esquema, recarregado se o armazenamento mudou"""
+        assinatura = self.storage.assinatura()
+        if assinatura is None:
+            return self._tabela_vazia()
+        
+        versao = self.versao.ler()
+        chave = (assinatura, versao, self._versao_escrita)
+        if self._cache_df is None or self._cache_chave != chave:
+            df = self.storage.carregar()
+            if self._atribuir_ids_faltantes(df):
+                # Gravar os ids gerados para que todas as sessões vejam os mesmos
+                with self.trava:
+                    self.storage.salvar_tudo(df)
+                    versao = self.versao.incrementar()
+                    self.historico.registrar_tabela(df, "Ids atribuídos")
+                chave = (self.storage.assinatura(), versao, self._versao_escrita)
+            # Converter os tipos uma única vez por carga (datas, inteiros, categorias)
+            df = tipar(df)
+            self._cache_df = df
+            self._cache_chave = chave
+            self._versao_cache = versao
+            self._indice_ids = {id_curso: pos for pos, id_curso in enumerate(df[self.coluna_id])}
+        return self._cache_df
+    
+    def carregar_dados(self, filtros=None):
+        """Retorna a tabela de cursos, opcionalmente filtrada por {coluna: [valores]}"""
         try:
-            if os.path.exists(self.arquivo_local):
-                df = pd.read_excel(self.arquivo_local, engine='openpyxl')
-                # Garantir que todas as colunas existam
-                for col in self.colunas:
-                    if col not in df.columns:
-                        df[col] = ""
-                return df
-            else:
-                return pd.DataFrame(columns=self.colunas)
+            # Motores indexados resolvem o filtro sem carregar a tabela inteira
+            if filtros and self.storage.suporta_filtros:
+                return tipar(self.storage.carregar(filtros))
+            
+            df = self._tabela_em_cache()
+            if filtros:
+                return self.storage.filtrar(df, filtros).copy()
+            
+            # Cópia para que o chamador possa modificar sem afetar o cache
+            return df.copy()
         except Exception as e:
             print(f"Erro ao carregar dados: {str(e)}")
-            return pd.DataFrame(columns=self.colunas)
+            return self._tabela_vazia()
+    
+    def _cache_atualizado(self):
+        """Se o DataFrame em cache ainda reflete o armazenamento (sem carregar nada)"""
+        return (
+            self._cache_df is not None
+            and self._cache_chave == (self.storage.assinatura(), self.versao.ler(), self._versao_escrita)
+        )
+    
+    def _sem_id(self, df):
+        ids = df[self.coluna_id]
+        return bool((ids.isna() | (ids.astype(str).str.strip() == "")).any())
+    
+    def carregar_pagina(self, offset=0, limite=50, filtros=None):
+        """Retorna (até `limite` cursos a partir de `offset`, total de cursos com os filtros)
+        
+        Se o cache estiver em dia a página sai dele; senão o motor lê só as
+        linhas pedidas, sem carregar a tabela inteira.
+        """
+        try:
+            if not self._cache_atualizado():
+                pagina, total = self.storage.carregar_pagina(offset, limite, filtros)
+                # Linhas ainda sem id passam pela carga completa, que grava os ids
+                if not self._sem_id(pagina):
+                    return tipar(pagina), total
+            
+            df = self._tabela_em_cache()
+            if filtros:
+                df = self.storage.filtrar(df, filtros)
+            return df.iloc[offset:offset + limite].copy(), len(df)
+        except Exception as e:
+            print(f"Erro ao carregar página: {str(e)}")
+            return self._tabela_vazia(), 0
+    
+    def _indice_de_busca(self):
+        """Índice invertido da versão atual, reconstruído só quando outra sessão gravou"""
+        df = self._tabela_em_cache()
+        if self._indice_busca is None or self._indice_versao != self._versao_cache:
+            self._indice_busca = IndiceInvertido(self.colunas).construir(df, self.coluna_id)
+            self._indice_versao = self._versao_cache
+        return self._indice_busca
+    
+    def _atualizar_indice(self, versao_nova, adicionados=(), atualizados=(), removidos=()):
+        """Aplica uma escrita desta instância ao índice de busca, sem reconstruí-lo
+        
+        Só vale se o índice refletia a versão imediatamente anterior à escrita;
+        caso contrário ele é descartado e reconstruído na próxima busca.
+        """
+        if self._indice_busca is None:
+            return
+        if self._indice_versao != versao_nova - 1:
+            self._indice_busca = None
+            return
+        for linha in adicionados:
+            self._indice_busca.adicionar(linha[self.coluna_id], linha)
+        for id_curso, anterior, linha in atualizados:
+            self._indice_busca.atualizar(id_curso, anterior, linha)
+        for id_curso, anterior in removidos:
+            self._indice_busca.remover(id_curso, anterior)
+        self._indice_versao = versao_nova
+    
+    def obter_curso(self, id_curso):
+        """Retorna os dados do curso como dicionário, ou None se o id não existir"""
+        return self.obter_curso_com_versao(id_curso)[1]
+    
+    def obter_curso_com_versao(self, id_curso):
+        """(versão dos dados de onde a linha saiu, curso como dicionário ou None)
+        
+        É a base de uma edição: a versão é a do cache (ou do motor) que forneceu a
+        linha, e não uma lida depois, para que a detecção de conflitos a compare
+        com a linha certa.
+        """
+        if not self._cache_atualizado():
+            # Sem cache em dia, buscar só a linha do curso no motor. A versão é lida
+            # antes: uma escrita no meio deixa a versão mais antiga que a linha, e a
+            # edição passa pela mesclagem em vez de sobrescrever a outra sessão
+            versao = self.versao.ler()
+            linha = self.storage.obter(id_curso)
+            if linha is None:
+                return versao, None
+            return versao, tipar(pd.DataFrame([linha], columns=[self.coluna_id] + self.colunas)).iloc[0].to_dict()
+        
+        versao = self._versao_cache
+        posicao = self._indice_ids.get(id_curso)
+        if posicao is None:
+            return versao, None
+        return versao, self._cache_df.iloc[posicao].to_dict()
+    
+    def _baixar_do_github(self):
+        """Traz os dados do GitHub para o armazenamento local e avança a versão"""
+        # Enviar antes as alterações locais ainda na fila, para não sobrescrevê-las
+        self.github_manager.fila.esvaziar(timeout=60)
+        with self.trava:
+            sucesso, mensagem = self.github_manager.sincronizar_para_local()
+            if sucesso and self.github_manager.remoto_alterado:
+                self.storage.importar_xlsx(self.arquivo_local)
+                self.versao.incrementar()
+                self.historico.registrar_tabela(self.storage.carregar(), mensagem)
+        return sucesso, mensagem
+    
+    def sincronizar_github(self):
+        """Baixa o arquivo do GitHub para a pasta local e invalida o cache"""
+        if not self.github_manager:
+            return False, "GitHub não habilitado"
+        
+        sucesso, mensagem = self._baixar_do_github()
+        self.invalidar_cache()
+        return sucesso, mensagem
+    
+    def sincronizar_em_segundo_plano(self):
+        """Sincroniza numa thread enquanto os dados locais continuam sendo servidos
+        
+        A thread não mexe no cache desta instância: ao terminar, a versão dos dados
+        avança e a próxima leitura troca o DataFrame em cache de uma vez. Sessões
+        que abrem durante a sincronização acompanham a mesma thread.
+        """
+        with DataManager._guarda_sincronizacao:
+            atual = DataManager._sincronizacoes.get(self.arquivo_local)
+            if atual is None or not atual['thread'].is_alive():
+                try:
+                    desde = datetime.fromtimestamp(os.path.getmtime(self.versao.caminho))
+                except OSError:
+                    desde = datetime.now()
+                atual = {'desde': desde, 'resultado': None}
+                atual['thread'] = threading.Thread(target=self._sincronizar_fundo, args=(atual,), daemon=True)
+                DataManager._sincronizacoes[self.arquivo_local] = atual
+                atual['thread'].start()
+        self._sincronizacao = atual
+    
+    def _sincronizar_fundo(self, sincronizacao):
+        try:
+            sincronizacao['resultado'] = self._baixar_do_github()
+        except Exception as e:
+            sincronizacao['resultado'] = (False, f"Erro na sincronização: {str(e)}")
+        self.ultima_mensagem = sincronizacao['resultado'][1]
+    
+    def dados_desatualizados_desde(self):
+        """Horário dos dados locais enquanto a sincronização inicial não termina; senão None"""
+        if self._sincronizacao and self._sincronizacao['thread'].is_alive():
+            return self._sincronizacao['desde']
+        return None
     
     def _salvar_dados(self, df, mensagem_commit=None):
         try:
-            os.makedirs("data", exist_ok=True)
-            df.to_excel(self.arquivo_local, index=False, engine='openpyxl')
+            with self.trava:
+                self.storage.salvar_tudo(df)
+                self.versao.incrementar()
+                self.historico.registrar_tabela(df, mensagem_commit or "")
+            return self._registrar_escrita(mensagem_commit)
+        except Exception as e:
+            print(f"Erro ao salvar: {str(e)}")
+            return False
+    
+    def _registrar_escrita(self, mensagem_commit=None):
+        """Invalida o cache após uma escrita e faz o commit no GitHub, se configurado"""
+        try:
+            self.invalidar_cache()
             
-            # Commit no GitHub se estiver configurado
+            # Commit no GitHub se estiver configurado: só a gravação local é síncrona,
+            # o envio fica na fila de fundo, que agrupa salvamentos próximos
             if self.github_manager and self.github_manager.authenticated:
-                # Ler o arquivo e converter para bytes
-                with open(self.arquivo_local, 'rb') as f:
-                    file_bytes = f.read()
-                
-                sucesso, mensagem = self.github_manager.commit_excel(file_bytes, mensagem_commit)
+                if self.github_manager.formato == 'fragmentos':
+                    gerar = self._tabela_para_github
+                else:
+                    gerar = self._excel_para_github
+                sucesso, mensagem = self.github_manager.enfileirar_commit(gerar, mensagem_commit)
                 self.ultima_mensagem = mensagem
                 return sucesso
             
@@ -74,27 +346,97 @@ class DataManager:
             print(f"Erro ao salvar: {str(e)}")
             return False
     
+    def _excel_para_github(self):
+        """Gera o Excel a partir do motor atual (chamado pela fila de commits, na hora do envio)"""
+        with self.trava:
+            self.storage.exportar_xlsx(self.arquivo_local)
+            with open(self.arquivo_local, 'rb') as f:
+                return f.read()
+    
+    def _tabela_para_github(self):
+        """Tabela gravada (texto, com ids) para o formato em fragmentos"""
+        with self.trava:
+            return self.storage.carregar()
+    
+    def status_envio_github(self):
+        """Situação da fila de commits: pendentes, enviando, último envio e resultado"""
+        if not self.github_manager or not self.github_manager.authenticated:
+            return None
+        return self.github_manager.status_fila()
+    
+    def metricas_github(self):
+        """Uso da API do GitHub neste processo (chamadas, economias e espera pela cota)"""
+        if not self.github_manager or not self.github_manager.authenticated:
+            return None
+        return self.github_manager.metricas_api()
+    
+    def _normalizar_curso(self, curso_dict):
+        # Garantir que só campos válidos sejam gravados
+        curso_dict = {k: v for k, v in curso_dict.items() if k in self.colunas}
+        
+        # Preencher campos ausentes e gravar datas como texto dd/mm/aaaa
+        return {col: valor_para_texto(curso_dict.get(col, "")) for col in self.colunas}
+    
+    @staticmethod
+    def _valor_comparavel(valor):
+        """Normaliza um valor para comparação ("" == NaN == None, 3 == 3.0 == "3", data == "dd/mm/aaaa")"""
+        return str(valor_para_texto(valor)).strip()
+    
+    def _mesclar(self, base, nosso, deles):
+        """Mescla campo a campo uma edição feita sobre `base` com a versão atual `deles`
+        
+        Retorna (dados mesclados, lista de campos em conflito).
+        """
+        mesclado = {}
+        conflitos = []
+        for col in self.colunas:
+            b = self._valor_comparavel(base.get(col))
+            n = self._valor_comparavel(nosso.get(col))
+            d = self._valor_comparavel(deles.get(col))
+            if n == b:
+                mesclado[col] = valor_para_texto(deles.get(col))
+            elif d == b or d == n:
+                mesclado[col] = nosso.get(col)
+            else:
+                conflitos.append(col)
+        return mesclado, conflitos
+    
+    def _campos_alterados(self, antes, depois):
+        return [
+            col for col in self.colunas
+            if self._valor_comparavel(antes.get(col)) != self._valor_comparavel(depois.get(col))
+        ]
+    
+    def _base_da_edicao(self, id_curso, versao_base, base):
+        """Versão e linha sobre as quais a edição foi feita (padrão: o que está em cache)"""
+        if versao_base is None:
+            if self._cache_df is None:
+                self._tabela_em_cache()
+            versao_base = self._versao_cache
+            if base is None:
+                posicao = self._indice_ids.get(id_curso)
+                base = self._cache_df.iloc[posicao].to_dict() if posicao is not None else None
+        return versao_base, base
+    
+    def _tabela_para_motor(self):
+        """Tabela em cache, no formato gravado, para motores que operam sobre o DataFrame inteiro; None para os indexados"""
+        if self.storage.escrita_incremental:
+            return None
+        return destipar(self._tabela_em_cache())
+    
     def adicionar_curso(self, curso_dict):
         try:
-            df = self.carregar_dados()
-            
-            # Garantir que só campos válidos sejam adicionados
-            curso_dict = {k: v for k, v in curso_dict.items() if k in self.colunas}
-            
-            # Preencher campos ausentes
-            for col in self.colunas:
-                if col not in curso_dict:
-                    curso_dict[col] = ""
-            
-            # Criar DataFrame com uma linha
-            novo_df = pd.DataFrame([curso_dict])
-            
-            # Concatenar
-            df = pd.concat([df, novo_df], ignore_index=True)
+            curso_dict = self._normalizar_curso(curso_dict)
+            curso_dict[self.coluna_id] = self._novo_id()
+            # Inclusões nunca conflitam: basta gravar sobre a versão mais recente
+            mensagem = f"Adicionado curso: {curso_dict.get('Curso', 'Novo curso')}"
+            with self.trava:
+                self.storage.adicionar(curso_dict, self._tabela_para_motor())
+                self._atualizar_indice(self.versao.incrementar(), adicionados=[curso_dict])
+                self.historico.registrar_adicoes([curso_dict], mensagem)
             
             # Salvar com commit
-            mensagem = f"Adicionado curso: {curso_dict.get('Curso', 'Novo curso')}"
-            sucesso = self._salvar_dados(df, mensagem)
+            sucesso = self._registrar_escrita(mensagem)
             
             if sucesso:
                 msg = "✅ Curso cadastrado com sucesso!"
@@ -106,28 +448,109 @@ class DataManager:
         except Exception as e:
             return False, f"❌ Erro ao adicionar curso: {str(e)}"
     
-    def atualizar_curso(self, index, curso_dict):
+    def adicionar_cursos(self, cursos):
+        """Adiciona vários cursos com uma única gravação e um único commit
+        
+        Retorna (sucesso, mensagem, resultados), com um resultado por item da
+        lista recebida: {'indice': i, 'sucesso': bool, 'mensagem': str}.
+        """
+        resultados = [{'indice': i, 'sucesso': False, 'mensagem': ''} for i in range(len(cursos))]
         try:
-            df = self.carregar_dados()
+            indices = []
+            for i, curso in enumerate(cursos):
+                if isinstance(curso, dict):
+                    indices.append(i)
+                else:
+                    resultados[i]['mensagem'] = "Registro inválido"
+            
+            # Normalizar a lista inteira de uma vez: só colunas válidas, vazios como ""
+            df = pd.DataFrame([cursos[i] for i in indices], index=indices).reindex(columns=self.colunas)
+            df = df.astype(object).where(df.notna(), "")
+            for col in COLUNAS_DATA:
+                df[col] = df[col].map(valor_para_texto)
+            
+            vazio = df.astype(str).apply(lambda coluna: coluna.str.strip() == "").all(axis=1)
+            vagas_texto = df['Vagas'].astype(str).str.strip()
+            vagas = pd.to_numeric(vagas_texto, errors='coerce')
+            vagas_invalidas = (vagas_texto != "") & (vagas.isna() | (vagas < 0) | (vagas % 1 != 0))
+            
+            for i in df.index[vazio]:
+                resultados[i]['mensagem'] = "Registro vazio"
+            for i in df.index[vagas_invalidas & ~vazio]:
+                resultados[i]['mensagem'] = f"Vagas inválidas: {df.at[i, 'Vagas']}"
+            
+            aceitos = ~vazio & ~vagas_invalidas
+            df = df[aceitos]
+            df['Vagas'] = vagas[aceitos].astype(object).where(vagas_texto[aceitos] != "", "")
+            df.loc[df['Vagas'] != "", 'Vagas'] = df.loc[df['Vagas'] != "", 'Vagas'].astype(int)
+            
+            if df.empty:
+                return False, "❌ Nenhum curso válido para importar.", resultados
             
-            if index < 0 or index >= len(df):
-                return False, "❌ Curso não encontrado."
+            df.insert(0, self.coluna_id, [self._novo_id() for _ in range(len(df))])
             
-            # Garantir que só campos válidos sejam atualizados
-            curso_dict = {k: v for k, v in curso_dict.items() if k in self.colunas}
+            mensagem = f"Importados {len(df)} cursos"
+            with self.trava:
+                self.storage.adicionar_varios(df.reset_index(drop=True), self._tabela_para_motor())
+                adicionados = df.to_dict('records')
+                self._atualizar_indice(self.versao.incrementar(), adicionados=adicionados)
+                self.historico.registrar_adicoes(adicionados, mensagem)
             
-            # Preencher campos ausentes
-            for col in self.colunas:
-                if col not in curso_dict:
-                    curso_dict[col] = ""
+            # Salvar com um único commit
+            sucesso = self._registrar_escrita(mensagem)
+            
+            for i in df.index:
+                resultados[i]['sucesso'] = True
+                resultados[i]['mensagem'] = "Importado"
+                resultados[i]['id'] = df.at[i, self.coluna_id]
+            
+            if sucesso:
+                msg = f"✅ {len(df)} de {len(cursos)} cursos importados com sucesso!"
+                if self.ultima_mensagem:
+                    msg += f" ({self.ultima_mensagem})"
+                return True, msg, resultados
+            else:
+                return False, "❌ Cursos gravados localmente, mas houve erro ao salvar.", resultados
+        except Exception as e:
+            return False, f"❌ Erro ao importar cursos: {str(e)}", resultados
+    
+    def atualizar_curso(self, id_curso, curso_dict, versao_base=None, base=None):
+        """Atualiza o curso `id_curso`
+        
+        `versao_base` e `base` são a versão dos dados e a linha exibidas quando a
+        edição começou (padrão: o que está em cache). Se outra sessão gravou
+        depois disso, as alterações são mescladas campo a campo; a atualização
+        falha apenas se o mesmo campo foi alterado dos dois lados.
+        """
+        try:
+            # O id é imutável: _normalizar_curso descarta qualquer 'id' recebido
+            curso_dict = self._normalizar_curso(curso_dict)
+            versao_base, base = self._base_da_edicao(id_curso, versao_base, base)
             
-            # Atualizar cada coluna
-            for col, valor in curso_dict.items():
-                df.at[index, col] = valor
+            with self.trava:
+                self._tabela_em_cache()
+                atual = self.obter_curso(id_curso)
+                if atual is None:
+                    return False, "❌ Curso não encontrado (pode ter sido excluído em outra sessão)."
+                
+                if self._versao_cache != versao_base:
+                    if base is None:
+                        return False, "❌ Os dados foram alterados em outra sessão. Recarregue e tente novamente."
+                    curso_dict, conflitos = self._mesclar(base, curso_dict, atual)
+                    if conflitos:
+                        return False, (
+                            "❌ Conflito: outra sessão alterou os campos "
+                            f"{', '.join(conflitos)}. Recarregue e tente novamente."
+                        )
+                
+                if not self.storage.atualizar(id_curso, curso_dict, self._tabela_para_motor()):
+                    return False, "❌ Curso não encontrado."
+                mensagem = f"Atualizado curso: {curso_dict.get('Curso', 'Curso')}"
+                self._atualizar_indice(self.versao.incrementar(), atualizados=[(id_curso, atual, curso_dict)])
+                self.historico.registrar_atualizacao(id_curso, atual, curso_dict, mensagem)
             
             # Salvar com commit
-            mensagem = f"Atualizado curso: {curso_dict.get('Curso', 'Curso')}"
-            sucesso = self._salvar_dados(df, mensagem)
+            sucesso = self._registrar_escrita(mensagem)
             
             if sucesso:
                 msg = "✅ Curso atualizado com sucesso!"
@@ -139,22 +562,31 @@ class DataManager:
         except Exception as e:
             return False, f"❌ Erro ao atualizar curso: {str(e)}"
     
-    def excluir_curso(self, index):
+    def excluir_curso(self, id_curso, versao_base=None, base=None):
+        """Exclui o curso `id_curso`; falha se outra sessão o alterou desde `versao_base`"""
         try:
-            df = self.carregar_dados()
-            
-            if index < 0 or index >= len(df):
-                return False, "❌ Curso não encontrado."
+            versao_base, base = self._base_da_edicao(id_curso, versao_base, base)
             
-            # Guardar nome do curso para a mensagem
-            nome_curso = df.at[index, 'Curso'] if 'Curso' in df.columns else 'Curso'
-            
-            # Remover linha
-            df = df.drop(index).reset_index(drop=True)
+            with self.trava:
+                self._tabela_em_cache()
+                atual = self.obter_curso(id_curso)
+                if atual is None:
+                    return False, "❌ Curso não encontrado (pode ter sido excluído em outra sessão)."
+                
+                if self._versao_cache != versao_base:
+                    if base is None or self._campos_alterados(base, atual):
+                        return False, "❌ O curso foi alterado em outra sessão. Recarregue antes de excluir."
+                
+                linha = self.storage.excluir(id_curso, self._tabela_para_motor())
+                if linha is None:
+                    return False, "❌ Curso não encontrado."
+                # Guardar nome do curso para a mensagem
+                mensagem = f"Excluído curso: {linha.get('Curso', 'Curso')}"
+                self._atualizar_indice(self.versao.incrementar(), removidos=[(id_curso, atual)])
+                self.historico.registrar_exclusao(id_curso, atual, mensagem)
             
             # Salvar com commit
-            mensagem = f"Excluído curso: {nome_curso}"
-            sucesso = self._salvar_dados(df, mensagem)
+            sucesso = self._registrar_escrita(mensagem)
             
             if sucesso:
                 msg = "✅ Curso excluído com sucesso!"
@@ -166,39 +598,123 @@ class DataManager:
         except Exception as e:
             return False, f"❌ Erro ao excluir curso: {str(e)}"
     
-    def exportar_excel_bytes(self):
+    def estado_em(self, momento):
+        """Tabela como estava em `momento` (datetime, date ou texto), a partir do histórico local
+        
+        Retorna None se `momento` for anterior ao início do histórico.
+        """
+        df = self.historico.estado_em(momento)
+        if df is None:
+            return None
+        return tipar(df.reindex(columns=[self.coluna_id] + self.colunas))
+    
+    def auditoria_curso(self, id_curso):
+        """Inclusão, alterações (campo: [antes, depois]) e exclusão de um curso, em ordem"""
+        return self.historico.auditoria(id_curso)
+    
+    def restaurar_estado(self, momento):
+        """Volta a tabela ao estado de `momento`, reconstruído sem acessar a rede"""
         try:
-            df = self.carregar_dados()
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Cursos')
-            output.seek(0)
-            return output.getvalue()
+            df = self.historico.estado_em(momento)
+            if df is None:
+                return False, "❌ Não há histórico local para essa data."
+            
+            df = df.reindex(columns=[self.coluna_id] + self.colunas)
+            mensagem = f"Restaurado estado de {pd.Timestamp(momento).strftime('%d/%m/%Y %H:%M')}"
+            if self._salvar_dados(df, mensagem):
+                msg = f"✅ {mensagem} ({len(df)} cursos)."
+                if self.ultima_mensagem:
+                    msg += f" ({self.ultima_mensagem})"
+                return True, msg
+            return False, "❌ Erro ao restaurar os dados."
         except Exception as e:
-            print(f"Erro ao exportar: {str(e)}")
-            return b""
+            return False, f"❌ Erro ao restaurar: {str(e)}"
+    
+    def exportador(self, formato='xlsx'):
+        """Função sem argumentos que gera a exportação, para o `data` do st.download_button
+        
+        Nada é carregado nem gerado até o clique. O Streamlit a executa em outra
+        thread, por isso ela não recarrega o cache da instância: usa o DataFrame
+        em cache se estiver em dia e, senão, lê a tabela direto do motor.
+        """
+        def gerar():
+            try:
+                return self.exportar_bytes(formato)
+            except Exception as e:
+                # Propagar: o download falha em vez de entregar um arquivo vazio
+                self.erro_exportacao = f"❌ Erro ao exportar ({formato}): {str(e)}"
+                raise
+        
+        return gerar
+    
+    def exportar_bytes(self, formato='xlsx'):
+        """Tabela exportada em 'xlsx', 'csv' ou 'parquet', gerada uma vez por versão dos dados"""
+        chave = (self.storage.assinatura(), self.versao.ler())
+        guardado = self._cache_exportacao.get(formato)
+        if guardado and guardado[0] == chave:
+            return guardado[1]
+        
+        # Ler a chave antes do DataFrame: _tabela_em_cache troca o DataFrame antes
+        # da chave, e o DataFrame em cache nunca é alterado no lugar
+        chave_cache = self._cache_chave
+        df = self._cache_df
+        if df is None or chave_cache is None or chave_cache[:2] != chave:
+            df = tipar(self.storage.carregar().reindex(columns=[self.coluna_id] + self.colunas))
+        
+        if formato == 'xlsx':
+            dados = self._gerar_xlsx(df)
+        elif formato == 'csv':
+            dados = destipar(df).to_csv(index=False).encode('utf-8-sig')
+        elif formato == 'parquet':
+            # Parquet preserva os tipos do esquema (datas, inteiros, categorias)
+            output = BytesIO()
+            df.to_parquet(output, index=False)
+            dados = output.getvalue()
+        else:
+            raise ValueError(f"Formato de exportação desconhecido: {formato}")
+        
+        self._cache_exportacao[formato] = (chave, dados)
+        return dados
+    
+    @staticmethod
+    def _gerar_xlsx(df, linhas_por_bloco=5000):
+        """Planilha em modo write-only: as linhas vão direto para o arquivo, em blocos"""
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Cursos')
+        ws.append(list(df.columns))
+        for inicio in range(0, len(df), linhas_por_bloco):
+            bloco = destipar(df.iloc[inicio:inicio + linhas_por_bloco])
+            for linha in bloco.itertuples(index=False, name=None):
+                ws.append([None if valor == "" else valor for valor in linha])
+        output = BytesIO()
+        wb.save(output)
+        return output.getvalue()
+    
+    def exportar_excel_bytes(self):
+        return self.exportar_bytes('xlsx')
     
     def buscar_curso(self, termo):
+        """Busca por termos (E lógico, por prefixo, sem acentos), ex.: `estado:concluido sigad:12345`"""
         try:
-            df = self.carregar_dados()
+            df = self._tabela_em_cache()
             if termo:
-                # Buscar em todas as colunas
-                mask = df.astype(str).apply(lambda x: x.str.contains(termo, case=False, na=False))
-                return df[mask.any(axis=1)]
-            return df
+                ids = self._indice_de_busca().buscar(termo)
+                posicoes = sorted(self._indice_ids[i] for i in ids if i in self._indice_ids)
+                return df.iloc[posicoes].copy()
+            return df.copy()
         except Exception as e:
             print(f"Erro ao buscar: {str(e)}")
-            return pd.DataFrame(columns=self.colunas)
+            return self._tabela_vazia()
     
     def verificar_status_github(self):
         """Retorna status da conexão com GitHub"""
         if not self.github_manager:
             return False, "GitHub não habilitado"
         
-        autenticado, mensagem = self.github_manager.verificar_autenticacao()
+        # Guardado com TTL e atualizado em segundo plano: não bloqueia cada rerun
+        autenticado, mensagem, ultimo_commit = self.github_manager.status_conexao()
         
         if autenticado:
-            ultimo_commit = self.github_manager.obter_ultimo_commit()
             if ultimo_commit:
                 mensagem += f" | Última atualização: {ultimo_commit['data'].strftime('%d/%m/%Y %H:%M')}"
         
@@ -0,0 +1,136 @@
+from datetime import date
+import pandas as pd
+
+# Armazenamento "python" explícito: o padrão do pandas passa a ser PyArrow quando ele está
+# instalado, e os tipos não devem depender do ambiente
+TIPO_TEXTO = pd.StringDtype("python")
+
+FORMATO_DATA = "%d/%m/%Y"
+
+ESTADOS = ["solicitar voluntários", "fazer indicação", "Concluído", "ver vagas escalantes"]
+PRIORIDADES = ["Alta", "Média", "Baixa"]
+
+COLUNAS = [
+    'Curso', 'Turma', 'Vagas', 'Autorizados pelas escalantes', 'Prioridade',
+    'Recebimento do SIGAD com as vagas', 'Numero do SIGAD', 'Estado',
+    'DATA DA CONCLUSÃO', 'Numero do SIGAD  encaminhando pra chefia',
+    'Prazo dado pela chefia', 'Fim da indicação da SIAT', 'Notas'
+]
+
+# Tipo de cada coluna na memória. No Excel e no journal as datas continuam gravadas
+# como texto dd/mm/aaaa (o SQLite guarda aaaa-mm-dd, mas lê e grava dd/mm/aaaa);
+# a conversão acontece só na carga e na exportação.
+ESQUEMA = {
+    'id': 'texto',
+    'Curso': 'texto',
+    'Turma': 'texto',
+    'Vagas': 'inteiro',
+    'Autorizados pelas escalantes': 'texto',
+    'Prioridade': 'categoria',
+    'Recebimento do SIGAD com as vagas': 'data',
+    'Numero do SIGAD': 'texto',
+    'Estado': 'categoria',
+    'DATA DA CONCLUSÃO': 'data',
+    'Numero do SIGAD  encaminhando pra chefia': 'texto',
+    'Prazo dado pela chefia': 'data',
+    'Fim da indicação da SIAT': 'data',
+    'Notas': 'texto',
+}
+
+CATEGORIAS = {'Estado': ESTADOS, 'Prioridade': PRIORIDADES}
+COLUNAS_DATA = [col for col, tipo in ESQUEMA.items() if tipo == 'data']
+
+
+def _vazio(valor):
+    if valor is None:
+        return True
+    try:
+        return bool(pd.isna(valor))
+    except (TypeError, ValueError):
+        return False
+
+
+def _converter_datas(serie):
+    eh_texto = serie.map(lambda v: isinstance(v, str)).astype(bool)
+    texto = serie.astype(object).where(eh_texto, "").astype(str).str.strip()
+    datas = pd.to_datetime(texto, format=FORMATO_DATA, errors='coerce')
+
+    # Textos em outro formato (ISO ou dia primeiro) e células já gravadas como data no Excel
+    restantes = datas.isna() & (texto != "")
+    if restantes.any():
+        iso = pd.to_datetime(texto[restantes], format='ISO8601', errors='coerce')
+        datas[restantes] = iso.fillna(
+            pd.to_datetime(texto[restantes], dayfirst=True, errors='coerce', format='mixed')
+        )
+    nao_texto = ~eh_texto & serie.notna()
+    if nao_texto.any():
+        datas[nao_texto] = pd.to_datetime(serie[nao_texto], errors='coerce')
+    return datas.astype('datetime64[ns]')
+
+
+def _converter_inteiros(serie):
+    numeros = pd.to_numeric(serie.replace("", None), errors='coerce')
+    return numeros.where(numeros % 1 == 0).astype('Int64')
+
+
+def _converter_categoria(serie, conhecidas):
+    valores = serie.astype(object).where(serie.notna(), "").astype(str).str.strip()
+    valores = valores.mask(valores == "")
+    # Valores fora da lista conhecida viram categorias extras, para não perder dados
+    extras = sorted(set(valores.dropna().astype(str)) - set(conhecidas))
+    return valores.astype(pd.CategoricalDtype(list(conhecidas) + extras))
+
+
+def _converter_texto(serie):
+    if pd.api.types.infer_dtype(serie, skipna=True) not in ('string', 'empty'):
+        # Números e datas digitados em colunas de texto: mesma forma da gravação
+        serie = serie.map(valor_para_texto, na_action='ignore')
+    texto = serie.astype(TIPO_TEXTO)
+    return texto.mask(texto == "")
+
+
+def tipar(df):
+    """Converte a tabela lida do armazenamento para os tipos do ESQUEMA"""
+    df = df.copy()
+    for col, tipo in ESQUEMA.items():
+        if col not in df.columns:
+            continue
+        if tipo == 'data':
+            df[col] = _converter_datas(df[col])
+        elif tipo == 'inteiro':
+            df[col] = _converter_inteiros(df[col])
+        elif tipo == 'categoria':
+            df[col] = _converter_categoria(df[col], CATEGORIAS[col])
+        else:
+            df[col] = _converter_texto(df[col])
+    return df
+
+
+def valor_para_texto(valor):
+    """Forma gravada de um valor: datas como dd/mm/aaaa, vazios como "" """
+    if _vazio(valor):
+        return ""
+    if isinstance(valor, (pd.Timestamp, date)):
+        return valor.strftime(FORMATO_DATA)
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return valor
+
+
+def destipar(df):
+    """Reverte `tipar` para exportação e gravação (datas em texto, vazios como "")"""
+    df = df.copy()
+    for col in df.columns:
+        tipo = ESQUEMA.get(col)
+        if tipo == 'data':
+            df[col] = df[col].dt.strftime(FORMATO_DATA).astype(object).where(df[col].notna(), "")
+        elif tipo is not None:
+            df[col] = df[col].astype(object).where(df[col].notna(), "")
+    return df
+
+
+def dias_ate(datas):
+    """Dias de hoje até cada data (negativo = atrasado; NaN onde não há data)"""
+    return (datas - pd.Timestamp(date.today())).dt.days
@@ -1,50 +1,474 @@
+import io
 import os
+import re
+import json
+import time
+import atexit
+import heapq
 import base64
-from datetime import datetime
+import random
+import hashlib
+import itertools
+import threading
+import urllib.parse
+from datetime import datetime, timezone
 from github import Github
 from github import Auth
+from github import GithubException
+from github import InputGitTreeElement
+import pandas as pd
 import streamlit as st
+from controle_concorrencia import gravar_atomico
+from esquema import valor_para_texto
+
+# Classes de prioridade das chamadas à API (menor = passa primeiro)
+ESCRITA, SINCRONIZACAO, STATUS = 0, 1, 2
+NOMES_PRIORIDADE = {ESCRITA: 'escrita', SINCRONIZACAO: 'sincronização', STATUS: 'status'}
+
+
+class LimiteGitHubAtingido(Exception):
+    """Limite de taxa da API com espera longa demais para aguardar na chamada"""
+
+    def __init__(self, ate):
+        self.ate = ate
+        super().__init__(f"limite da API do GitHub atingido até {datetime.fromtimestamp(ate).strftime('%H:%M')}")
+
+
+class AgendadorRequisicoes:
+    """Ponto único das chamadas à API do GitHub: cota, prioridades e espera com jitter
+
+    Acompanha os cabeçalhos X-RateLimit-* de cada resposta. Escritas podem usar
+    a cota até o fim; sincronizações deixam uma reserva e verificações de status
+    uma reserva maior. Com a cota esgotada, ou depois de um 403/429 de limite
+    (primário ou secundário), todas as chamadas esperam o reinício, o
+    Retry-After ou um backoff exponencial com jitter, e as de maior prioridade
+    passam primeiro. Um agendador por token, compartilhado pelas sessões.
+    """
+
+    _agendadores = {}
+    _guarda = threading.Lock()
+
+    @classmethod
+    def para(cls, chave):
+        with cls._guarda:
+            if chave not in cls._agendadores:
+                cls._agendadores[chave] = cls()
+            return cls._agendadores[chave]
+
+    def __init__(self, reservas=None, intervalo_escritas=1.0, max_tentativas=4, espera_maxima=60.0):
+        # Fração da cota que cada prioridade deixa para as mais importantes
+        self.reservas = reservas or {ESCRITA: 0.0, SINCRONIZACAO: 0.02, STATUS: 0.10}
+        # O GitHub pede ao menos 1 s entre requisições que alteram dados
+        self.intervalo_escritas = intervalo_escritas
+        self.max_tentativas = max_tentativas
+        self.espera_maxima = espera_maxima
+        self._condicao = threading.Condition()
+        self._fila = []
+        self._ordem = itertools.count()
+        self._pausa_ate = 0.0
+        self._ultima_escrita = 0.0
+        self.restantes = None
+        self.limite = None
+        self.reinicio = 0.0
+        self.chamadas = {nome: 0 for nome in NOMES_PRIORIDADE.values()}
+        self.economizadas = {}
+        self.limites_atingidos = 0
+        self.tempo_espera = 0.0
+
+    def economizou(self, motivo, quantidade=1):
+        """Registra chamadas evitadas por cache (SHA/ETag, status guardado etc.)"""
+        with self._condicao:
+            self.economizadas[motivo] = self.economizadas.get(motivo, 0) + quantidade
+
+    def metricas(self):
+        with self._condicao:
+            return {
+                'chamadas': dict(self.chamadas),
+                'economizadas': dict(self.economizadas),
+                'limites_atingidos': self.limites_atingidos,
+                'tempo_espera': self.tempo_espera,
+                'restantes': self.restantes,
+                'limite': self.limite,
+                'reinicio': datetime.fromtimestamp(self.reinicio) if self.reinicio else None,
+            }
+
+    def _espera_necessaria(self, prioridade):
+        """Segundos até a prioridade poder chamar a API (0 = já pode)"""
+        agora = time.time()
+        espera = self._pausa_ate - agora
+        if prioridade == ESCRITA:
+            espera = max(espera, self._ultima_escrita + self.intervalo_escritas - agora)
+        if self.restantes is not None and self.limite and agora < self.reinicio:
+            if self.restantes <= self.reservas[prioridade] * self.limite:
+                espera = max(espera, self.reinicio - agora)
+        return max(0.0, espera)
+
+    def _aguardar_vez(self, prioridade):
+        entrada = (prioridade, next(self._ordem))
+        with self._condicao:
+            heapq.heappush(self._fila, entrada)
+            inicio = time.monotonic()
+            try:
+                while True:
+                    espera = self._espera_necessaria(prioridade)
+                    # Só passa se nenhuma chamada de prioridade maior (ou mais antiga) puder ir antes
+                    na_frente = any(outra < entrada and self._espera_necessaria(outra[0]) == 0 for outra in self._fila)
+                    if espera == 0 and not na_frente:
+                        break
+                    if espera > self.espera_maxima:
+                        raise LimiteGitHubAtingido(time.time() + espera)
+                    self._condicao.wait(espera or 0.05)
+            finally:
+                self._fila.remove(entrada)
+                heapq.heapify(self._fila)
+                self.tempo_espera += time.monotonic() - inicio
+                self._condicao.notify_all()
+            if prioridade == ESCRITA:
+                self._ultima_escrita = time.time()
+
+    def _atualizar_cota(self, github):
+        restantes, limite = github.requester.rate_limiting
+        with self._condicao:
+            if limite > 0:
+                self.restantes, self.limite = restantes, limite
+                self.reinicio = float(github.requester.rate_limiting_resettime)
+            self._condicao.notify_all()
+
+    def _espera_por_limite(self, erro, tentativa):
+        """Segundos a esperar se o erro for de limite de taxa; None se for outro erro"""
+        cabecalhos = {k.lower(): v for k, v in (erro.headers or {}).items()}
+        mensagem = str(erro.data).lower()
+        if erro.status != 429 and not (erro.status == 403 and (
+                'rate limit' in mensagem or 'retry-after' in cabecalhos
+                or cabecalhos.get('x-ratelimit-remaining') == '0')):
+            return None
+        if 'retry-after' in cabecalhos:
+            espera = float(cabecalhos['retry-after'])
+        elif cabecalhos.get('x-ratelimit-remaining') == '0' and 'x-ratelimit-reset' in cabecalhos:
+            espera = float(cabecalhos['x-ratelimit-reset']) - time.time()
+        else:
+            # Limite secundário sem indicação de prazo: backoff exponencial
+            espera = 2.0 ** (tentativa + 1)
+        return max(0.0, espera) + random.uniform(0, 1 + espera * 0.1)
+
+    def executar(self, prioridade, chamada, github):
+        """Executa `chamada()` na vez da prioridade; repete após limites de taxa"""
+        for tentativa in range(self.max_tentativas):
+            self._aguardar_vez(prioridade)
+            with self._condicao:
+                self.chamadas[NOMES_PRIORIDADE[prioridade]] += 1
+            try:
+                resultado = chamada()
+            except GithubException as e:
+                self._atualizar_cota(github)
+                espera = self._espera_por_limite(e, tentativa)
+                if espera is None:
+                    raise
+                with self._condicao:
+                    self.limites_atingidos += 1
+                    self._pausa_ate = max(self._pausa_ate, time.time() + espera)
+                    self._condicao.notify_all()
+                if tentativa == self.max_tentativas - 1 or espera > self.espera_maxima:
+                    raise LimiteGitHubAtingido(time.time() + espera)
+                continue
+            self._atualizar_cota(github)
+            return resultado
+
+
+class FilaCommits:
+    """Envia commits ao GitHub em uma thread de fundo, agrupando salvamentos próximos
+
+    `enfileirar` retorna na hora. O envio espera `espera` segundos sem novos
+    pedidos e faz um único commit com a versão mais recente do arquivo e uma
+    mensagem que resume todas as alterações. Em caso de falha as alterações
+    voltam para a fila e o envio é repetido com espera crescente.
+    """
+
+    _filas = {}
+    _guarda = threading.Lock()
+
+    @classmethod
+    def para(cls, chave, enviar):
+        """Fila única por repositório/arquivo, compartilhada pelas sessões do processo"""
+        with cls._guarda:
+            if chave not in cls._filas:
+                cls._filas[chave] = cls(enviar)
+            return cls._filas[chave]
+
+    def __init__(self, enviar, espera=3.0, espera_maxima_falha=300.0):
+        # enviar(bytes, mensagem) -> (sucesso, mensagem), ex.: GitHubManager.commit_excel
+        self._enviar = enviar
+        self.espera = espera
+        self.espera_maxima_falha = espera_maxima_falha
+        self._condicao = threading.Condition()
+        self._mensagens = []
+        self._gerar_bytes = None
+        self._enviar_em = 0.0
+        self._thread = None
+        self._falhas = 0
+        self.enviando = False
+        self.ultimo_envio = None
+        self.ultimo_resultado = ""
+        self.commits_agrupados = 0
+        atexit.register(self.esvaziar, 30)
+
+    def enfileirar(self, gerar_bytes, mensagem):
+        """Agenda um commit; `gerar_bytes` é chamado só na hora do envio"""
+        with self._condicao:
+            self._mensagens.append(mensagem or "Atualização automática")
+            self._gerar_bytes = gerar_bytes
+            if not self._falhas:
+                self._enviar_em = time.monotonic() + self.espera
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, daemon=True)
+                self._thread.start()
+            self._condicao.notify_all()
+
+    def status(self):
+        with self._condicao:
+            return {
+                'pendentes': len(self._mensagens),
+                'enviando': self.enviando,
+                'ultimo_envio': self.ultimo_envio,
+                'ultimo_resultado': self.ultimo_resultado,
+                'falhas': self._falhas,
+            }
+
+    def esvaziar(self, timeout=None):
+        """Envia o que estiver pendente agora e espera terminar; retorna se a fila ficou vazia"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._condicao:
+            self._enviar_em = 0.0
+            self._condicao.notify_all()
+            while self._mensagens or self.enviando:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicao.wait(restante)
+            return True
+
+    @staticmethod
+    def _mensagem_combinada(mensagens):
+        if len(mensagens) == 1:
+            return mensagens[0]
+        return "\n".join([f"{len(mensagens)} alterações", ""] + [f"- {m}" for m in mensagens])
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while not self._mensagens:
+                    self._condicao.wait()
+                # Esperar a rajada de salvamentos terminar
+                while time.monotonic() < self._enviar_em:
+                    self._condicao.wait(self._enviar_em - time.monotonic())
+                mensagens, gerar_bytes = self._mensagens, self._gerar_bytes
+                self._mensagens = []
+                self.enviando = True
+
+            try:
+                sucesso, resultado = self._enviar(gerar_bytes(), self._mensagem_combinada(mensagens))
+            except Exception as e:
+                sucesso, resultado = False, f"❌ Erro ao salvar no GitHub: {str(e)}"
+
+            with self._condicao:
+                self.enviando = False
+                self.ultimo_resultado = resultado
+                if sucesso:
+                    self._falhas = 0
+                    self.ultimo_envio = datetime.now()
+                    self.commits_agrupados += len(mensagens) - 1
+                else:
+                    # Devolver as alterações à fila (antes das novas) e tentar de novo mais tarde
+                    self._mensagens = mensagens + self._mensagens
+                    self._falhas += 1
+                    espera = min(self.espera_maxima_falha, self.espera * 2 ** self._falhas)
+                    self._enviar_em = time.monotonic() + espera
+                self._condicao.notify_all()
+
+
+def _configuracao(nome, padrao=''):
+    """Variável de ambiente ou secret do Streamlit; sem secrets.toml, o valor padrão"""
+    valor = os.environ.get(nome)
+    if valor:
+        return valor
+    try:
+        return st.secrets.get(nome, padrao)
+    except Exception:
+        return padrao
+
 
 class GitHubManager:
+    # Último SHA/ETag conhecidos do arquivo remoto, compartilhados pelas sessões do processo
+    _remotos = {}
+    _trava_status = threading.Lock()
+    
     def __init__(self):
-        self.token = os.environ.get('GITHUB_TOKEN') or st.secrets.get('GITHUB_TOKEN', '')
-        self.repo_name = os.environ.get('GITHUB_REPO') or st.secrets.get('GITHUB_REPO', 'camargommc2021-star/controledeindica-es')
+        self.token = _configuracao('GITHUB_TOKEN')
+        self.repo_name = _configuracao('GITHUB_REPO', 'camargommc2021-star/controledeindica-es')
+        # Outra URL da API (GitHub Enterprise ou o servidor_github_local.py)
+        self.api_url = _configuracao('GITHUB_API_URL', 'https://api.github.com')
         self.arquivo_path = "data/cursos.xlsx"
+        # 'xlsx' (padrão): o Excel inteiro a cada envio; 'fragmentos': cursos em arquivos
+        # JSON Lines agrupados pelo início do id, enviando só os que mudaram
+        self.formato = _configuracao('GITHUB_FORMATO', 'xlsx')
+        self.pasta_fragmentos = "data/cursos"
+        self.digitos_fragmento = int(os.environ.get('GITHUB_FRAGMENTO_DIGITOS', 1))
+        # Cópia local dos fragmentos: a sincronização só baixa os que têm outro SHA
+        self.espelho_fragmentos = "data/.fragmentos"
+        # Segundos em que o status da barra lateral é reaproveitado sem chamar a API
+        self.ttl_status = float(os.environ.get('GITHUB_STATUS_TTL', 60))
         
         if self.token:
             try:
                 auth = Auth.Token(self.token)
-                self.github = Github(auth=auth)
-                self.repo = self.github.get_repo(self.repo_name)
+                # Sem retry/intervalos próprios do PyGithub: o AgendadorRequisicoes cuida disso
+                self.github = Github(auth=auth, base_url=self.api_url, retry=None,
+                                     seconds_between_requests=None, seconds_between_writes=None)
+                # lazy: nenhuma requisição ao criar a sessão; o repositório é lido no primeiro uso
+                self.repo = self.github.get_repo(self.repo_name, lazy=True)
                 self.authenticated = True
             except Exception as e:
                 print(f"Erro ao conectar ao GitHub: {e}")
                 self.authenticated = False
         else:
             self.authenticated = False
+        
+        chave = (self.repo_name, self.arquivo_path)
+        self._remoto = GitHubManager._remotos.setdefault(chave, {'sha': None, 'etag': None})
+        self.remoto_alterado = False
+        self.fila = FilaCommits.para(chave, self.enviar)
+        self.agendador = AgendadorRequisicoes.para((self.api_url, self.token))
+    
+    def _api(self, prioridade, chamada):
+        """Toda chamada à API passa pelo agendador (cota, prioridade e limites de taxa)"""
+        return self.agendador.executar(prioridade, chamada, self.github)
+    
+    def metricas_api(self):
+        """Chamadas feitas por prioridade, evitadas por cache e tempo esperando a cota"""
+        metricas = self.agendador.metricas()
+        metricas['economizadas'] = dict(metricas['economizadas'], **{'commits agrupados pela fila': self.fila.commits_agrupados})
+        return metricas
+    
+    def _ramo(self):
+        if 'ramo' not in self._remoto:
+            self._remoto['ramo'] = self._api(SINCRONIZACAO, lambda: self.repo.default_branch)
+        return self._remoto['ramo']
+    
+    def enfileirar_commit(self, gerar_bytes, message=None):
+        """Agenda o commit em segundo plano e retorna imediatamente"""
+        if not self.authenticated:
+            return False, "Token do GitHub não configurado"
+        self.fila.enfileirar(gerar_bytes, message)
+        return True, "⏳ Envio ao GitHub agendado"
+    
+    def enviar(self, dados, message=None):
+        """Commit no formato configurado: bytes do Excel ou a tabela (DataFrame) em fragmentos"""
+        if self.formato == 'fragmentos':
+            return self.commit_fragmentos(dados, message)
+        return self.commit_excel(dados, message)
+    
+    def status_fila(self):
+        return self.fila.status()
+    
+    def status_conexao(self):
+        """(autenticado, mensagem, ultimo_commit) guardados por `ttl_status` segundos
+        
+        Vencido o prazo, devolve o valor guardado e atualiza em segundo plano;
+        só a primeira consulta do processo espera pelas chamadas à API.
+        """
+        with GitHubManager._trava_status:
+            guardado = self._remoto.get('status')
+            if guardado is not None:
+                vencido = time.monotonic() - guardado['instante'] > self.ttl_status
+                if vencido and not self._remoto.get('atualizando_status'):
+                    self._remoto['atualizando_status'] = True
+                    threading.Thread(target=self._atualizar_status, daemon=True).start()
+                self.agendador.economizou('status em cache', 2)
+                return guardado['valor']
+        return self._atualizar_status()
+    
+    def _atualizar_status(self):
+        try:
+            try:
+                autenticado, mensagem = self.verificar_autenticacao()
+                ultimo_commit = self.obter_ultimo_commit() if autenticado else None
+                valor = (autenticado, mensagem, ultimo_commit)
+            except LimiteGitHubAtingido as e:
+                # Cota reservada para salvamentos: manter o último status conhecido
+                guardado = self._remoto.get('status')
+                valor = guardado['valor'] if guardado else (True, f"⏳ {e}", None)
+            with GitHubManager._trava_status:
+                self._remoto['status'] = {'instante': time.monotonic(), 'valor': valor}
+            return valor
+        finally:
+            with GitHubManager._trava_status:
+                self._remoto['atualizando_status'] = False
+    
+    def _status_apos_commit(self, message):
+        """Mostra na hora o commit feito por este processo e força nova consulta à API"""
+        with GitHubManager._trava_status:
+            guardado = self._remoto.get('status')
+            if guardado is None:
+                return
+            autenticado, mensagem, ultimo_commit = guardado['valor']
+            ultimo_commit = {
+                'data': datetime.now(timezone.utc),
+                'mensagem': message,
+                'autor': (ultimo_commit or {}).get('autor', ''),
+            }
+            self._remoto['status'] = {'instante': float('-inf'), 'valor': (autenticado, mensagem, ultimo_commit)}
     
     def verificar_autenticacao(self):
         if not self.authenticated:
             return False, "Token do GitHub não configurado. Configure a variável GITHUB_TOKEN."
         try:
-            user = self.github.get_user()
-            user.login
-            return True, f"Autenticado como: {user.login}"
+            login = self._api(STATUS, lambda: self.github.get_user().login)
+            return True, f"Autenticado como: {login}"
+        except LimiteGitHubAtingido:
+            raise
         except Exception as e:
             return False, f"Erro de autenticação: {str(e)}"
     
+    def _buscar_conteudo(self, condicional=False, prioridade=SINCRONIZACAO):
+        """GET em contents/ guardando SHA e ETag; retorna (status, bytes ou None)
+        
+        Com `condicional`, envia If-None-Match com o último ETag: o GitHub
+        responde 304 sem corpo (e sem gastar cota) se o arquivo não mudou.
+        """
+        url = f"{self.repo.url}/contents/{urllib.parse.quote(self.arquivo_path)}"
+        cabecalhos = {"If-None-Match": self._remoto['etag']} if condicional and self._remoto['etag'] else None
+        
+        def buscar():
+            status, resposta, corpo = self.github.requester.requestJson("GET", url, headers=cabecalhos)
+            # requestJson não levanta exceção em 4xx: levantá-la aqui, dentro do agendador,
+            # faz 403/429 de limite passarem pela espera e entrarem nas métricas
+            if status >= 400 and status != 404:
+                raise GithubException(status, corpo, resposta)
+            return status, resposta, corpo
+        
+        status, resposta, corpo = self._api(prioridade, buscar)
+        if status == 304:
+            self.agendador.economizou('download evitado (304)')
+            return status, None
+        if status == 404:
+            self._remoto.update(sha=None, etag=None)
+            return status, None
+        
+        dados = json.loads(corpo)
+        self._remoto.update(sha=dados['sha'], etag=resposta.get('etag'))
+        return status, base64.b64decode(dados['content'])
+    
     def obter_arquivo_excel(self):
         """Busca o arquivo Excel do repositório GitHub"""
         if not self.authenticated:
             return None, "Não autenticado"
         
         try:
-            contents = self.repo.get_contents(self.arquivo_path)
-            content_bytes = base64.b64decode(contents.content)
+            status, content_bytes = self._buscar_conteudo()
+            if status == 404:
+                return None, "Arquivo não encontrado no GitHub (será criado automaticamente)"
             return content_bytes, None
         except Exception as e:
-            if "404" in str(e):
-                return None, "Arquivo não encontrado no GitHub (será criado automaticamente)"
             return None, f"Erro ao obter arquivo: {str(e)}"
     
     def commit_excel(self, file_bytes, message=None):
@@ -56,40 +480,206 @@ class GitHubManager:
             if not message:
                 message = f"Atualização automática - {datetime.now().strftime('%d/%m/%Y %H:%M')}"
             
-            try:
-                contents = self.repo.get_contents(self.arquivo_path)
-                self.repo.update_file(
-                    path=self.arquivo_path,
-                    message=message,
-                    content=file_bytes,
-                    sha=contents.sha
-                )
+            # SHA do último envio/download; só é buscado na primeira gravação
+            if self._remoto['sha'] is None:
+                self._buscar_conteudo(prioridade=ESCRITA)
+            else:
+                self.agendador.economizou('SHA reaproveitado')
+            
+            for tentativa in range(2):
+                sha = self._remoto['sha']
+                try:
+                    if sha:
+                        resultado = self._api(ESCRITA, lambda: self.repo.update_file(
+                            path=self.arquivo_path,
+                            message=message,
+                            content=file_bytes,
+                            sha=sha
+                        ))
+                    else:
+                        resultado = self._api(ESCRITA, lambda: self.repo.create_file(
+                            path=self.arquivo_path,
+                            message=message,
+                            content=file_bytes
+                        ))
+                    break
+                except GithubException as e:
+                    # SHA desatualizado (outra instância gravou) ou arquivo criado/apagado
+                    # por fora: buscar o SHA atual uma vez e repetir
+                    if tentativa or e.status not in (404, 409, 422):
+                        raise
+                    self._buscar_conteudo(prioridade=ESCRITA)
+            
+            # O SHA devolvido pela gravação serve para a próxima; o ETag antigo deixa de valer
+            self._remoto.update(sha=resultado['content'].sha, etag=None)
+            self._status_apos_commit(message)
+            if sha:
                 return True, f"✅ Dados salvos no GitHub ({datetime.now().strftime('%H:%M')})"
-            except:
-                self.repo.create_file(
-                    path=self.arquivo_path,
-                    message=message,
-                    content=file_bytes
-                )
-                return True, f"✅ Arquivo criado no GitHub ({datetime.now().strftime('%H:%M')})"
+            return True, f"✅ Arquivo criado no GitHub ({datetime.now().strftime('%H:%M')})"
                 
+        except LimiteGitHubAtingido as e:
+            return False, f"⏳ Limite da API do GitHub atingido; novo envio após {datetime.fromtimestamp(e.ate).strftime('%H:%M')}"
         except Exception as e:
             return False, f"❌ Erro ao salvar no GitHub: {str(e)}"
     
+    # --- formato em fragmentos (Git Data API) ---------------------------------
+    
+    @staticmethod
+    def _sha_blob(dados):
+        """SHA que o git dá a um arquivo com esse conteúdo"""
+        return hashlib.sha1(b"blob %d\0" % len(dados) + dados).hexdigest()
+    
+    def _fragmentar(self, df):
+        """{caminho no repositório: texto} com uma linha JSON por curso, em ordem de id"""
+        colunas = list(df.columns)
+        fragmentos = {}
+        for registro in sorted(df.to_dict('records'), key=lambda r: str(r.get('id') or '')):
+            prefixo = re.sub(r'[^0-9a-z]', '_', str(registro.get('id') or '_')[:self.digitos_fragmento].lower())
+            linha = json.dumps({col: valor_para_texto(registro[col]) for col in colunas}, ensure_ascii=False)
+            fragmentos.setdefault(f"{self.pasta_fragmentos}/{prefixo}.jsonl", []).append(linha)
+        return {caminho: "\n".join(linhas) + "\n" for caminho, linhas in fragmentos.items()}
+    
+    def _carregar_arvore_remota(self, ref=None, prioridade=SINCRONIZACAO):
+        """Lê o head do branch, o commit e a árvore: SHA de cada fragmento no GitHub"""
+        ramo = self._ramo()
+        ref = ref or self._api(prioridade, lambda: self.repo.get_git_ref(f"heads/{ramo}"))
+        commit = self._api(prioridade, lambda: self.repo.get_git_commit(ref.object.sha))
+        arvore = self._api(prioridade, lambda: self.repo.get_git_tree(commit.tree.sha, recursive=True))
+        prefixo = self.pasta_fragmentos + "/"
+        fragmentos = {e.path: e.sha for e in arvore.tree if e.type == 'blob' and e.path.startswith(prefixo)}
+        self._remoto.update(ref=ref, commit=commit, arvore=arvore, fragmentos=fragmentos)
+    
+    def _atualizar_espelho(self, fragmentos):
+        os.makedirs(self.espelho_fragmentos, exist_ok=True)
+        nomes = {os.path.basename(caminho) for caminho in fragmentos}
+        for caminho, texto in fragmentos.items():
+            gravar_atomico(os.path.join(self.espelho_fragmentos, os.path.basename(caminho)), texto.encode('utf-8'))
+        for nome in os.listdir(self.espelho_fragmentos):
+            if nome.endswith(".jsonl") and nome not in nomes:
+                os.remove(os.path.join(self.espelho_fragmentos, nome))
+    
+    def commit_fragmentos(self, df, message=None):
+        """Envia só os fragmentos alterados num único commit (árvore + commit + ref)"""
+        if not self.authenticated:
+            return False, "Token do GitHub não configurado"
+        
+        try:
+            if not message:
+                message = f"Atualização automática - {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+            
+            fragmentos = self._fragmentar(df)
+            shas = {caminho: self._sha_blob(texto.encode('utf-8')) for caminho, texto in fragmentos.items()}
+            if self._remoto.get('commit') is None:
+                self._carregar_arvore_remota(prioridade=ESCRITA)
+            
+            for tentativa in range(2):
+                remotos = self._remoto['fragmentos']
+                elementos = [
+                    InputGitTreeElement(caminho, '100644', 'blob', content=fragmentos[caminho])
+                    for caminho in sorted(fragmentos) if remotos.get(caminho) != shas[caminho]
+                ] + [
+                    InputGitTreeElement(caminho, '100644', 'blob', sha=None)
+                    for caminho in sorted(set(remotos) - set(fragmentos))
+                ]
+                if not elementos:
+                    return True, "✅ GitHub já está atualizado"
+                try:
+                    arvore = self._api(ESCRITA, lambda: self.repo.create_git_tree(elementos, base_tree=self._remoto['arvore']))
+                    commit = self._api(ESCRITA, lambda: self.repo.create_git_commit(message, arvore, [self._remoto['commit']]))
+                    self._api(ESCRITA, lambda: self._remoto['ref'].edit(commit.sha))
+                    break
+                except GithubException as e:
+                    # O branch andou (outra instância gravou): reler head e árvore uma vez
+                    if tentativa or e.status not in (409, 422):
+                        raise
+                    self._carregar_arvore_remota(prioridade=ESCRITA)
+            
+            self._remoto.update(commit=commit, arvore=arvore, fragmentos=shas)
+            self._atualizar_espelho(fragmentos)
+            self._status_apos_commit(message)
+            return True, f"✅ Dados salvos no GitHub ({len(elementos)} de {len(fragmentos)} fragmentos, {datetime.now().strftime('%H:%M')})"
+        
+        except LimiteGitHubAtingido as e:
+            return False, f"⏳ Limite da API do GitHub atingido; novo envio após {datetime.fromtimestamp(e.ate).strftime('%H:%M')}"
+        except Exception as e:
+            return False, f"❌ Erro ao salvar no GitHub: {str(e)}"
+    
+    def _sincronizar_fragmentos(self):
+        """Baixa só os fragmentos com SHA diferente do espelho local e remonta o Excel"""
+        ramo = self._ramo()
+        ref = self._api(SINCRONIZACAO, lambda: self.repo.get_git_ref(f"heads/{ramo}"))
+        ultimo = self._remoto.get('commit')
+        if ultimo is not None and ultimo.sha == ref.object.sha and os.path.exists(self.arquivo_path):
+            self.agendador.economizou('sincronização sem mudanças (head igual)')
+            return True, "✅ Dados locais já estão iguais aos do GitHub"
+        
+        self._carregar_arvore_remota(ref)
+        remotos = self._remoto['fragmentos']
+        if not remotos:
+            return True, "ℹ️ Usando dados locais (fragmentos ainda não existem no GitHub)"
+        
+        os.makedirs(self.espelho_fragmentos, exist_ok=True)
+        baixados = 0
+        for caminho, sha in remotos.items():
+            local = os.path.join(self.espelho_fragmentos, os.path.basename(caminho))
+            try:
+                with open(local, 'rb') as f:
+                    atual = self._sha_blob(f.read())
+            except FileNotFoundError:
+                atual = None
+            if atual != sha:
+                blob = self._api(SINCRONIZACAO, lambda: self.repo.get_git_blob(sha))
+                gravar_atomico(local, base64.b64decode(blob.content))
+                baixados += 1
+            else:
+                self.agendador.economizou('fragmento já no espelho')
+        
+        nomes = {os.path.basename(caminho) for caminho in remotos}
+        registros = []
+        for nome in sorted(os.listdir(self.espelho_fragmentos)):
+            if not nome.endswith(".jsonl"):
+                continue
+            if nome not in nomes:
+                os.remove(os.path.join(self.espelho_fragmentos, nome))
+                continue
+            with open(os.path.join(self.espelho_fragmentos, nome), encoding='utf-8') as f:
+                registros.extend(json.loads(linha) for linha in f if linha.strip())
+        
+        buffer = io.BytesIO()
+        pd.DataFrame(registros).to_excel(buffer, index=False, engine='openpyxl')
+        gravar_atomico(self.arquivo_path, buffer.getvalue())
+        self.remoto_alterado = True
+        return True, f"✅ Dados sincronizados do GitHub ({baixados} de {len(remotos)} fragmentos baixados)"
+    
     def sincronizar_para_local(self):
         """Sincroniza arquivo do GitHub para pasta local"""
         if not self.authenticated:
             return False, "Não autenticado"
         
+        # Só vira True depois que bytes do GitHub foram gravados no arquivo local
+        self.remoto_alterado = False
+        if self.formato == 'fragmentos':
+            try:
+                return self._sincronizar_fragmentos()
+            except Exception as e:
+                return False, f"Erro na sincronização: {str(e)}"
+        
         try:
-            content_bytes, error = self.obter_arquivo_excel()
-            if error and "não encontrado" not in error:
-                return False, error
+            # Com o arquivo local presente, um 304 significa que não há nada a baixar
+            sha_conhecido = self._remoto['sha']
+            status, content_bytes = self._buscar_conteudo(condicional=os.path.exists(self.arquivo_path))
+            if status == 304:
+                return True, "✅ Dados locais já estão iguais aos do GitHub"
+            if status == 200 and sha_conhecido and self._remoto['sha'] == sha_conhecido and os.path.exists(self.arquivo_path):
+                # O próprio envio deste processo (o commit não devolve o ETag do GET):
+                # nada muda localmente, e o ETag guardado agora vale para as próximas
+                self.agendador.economizou('download igual ao último envio')
+                return True, "✅ Dados locais já estão iguais aos do GitHub"
             
             if content_bytes:
-                os.makedirs("data", exist_ok=True)
-                with open(self.arquivo_path, 'wb') as f:
-                    f.write(content_bytes)
+                # Troca atômica: leitores nunca veem o arquivo pela metade
+                gravar_atomico(self.arquivo_path, content_bytes)
+                self.remoto_alterado = True
                 return True, "✅ Dados sincronizados do GitHub"
             else:
                 return True, "ℹ️ Usando dados locais (arquivo ainda não existe no GitHub)"
@@ -103,8 +693,10 @@ class GitHubManager:
             return None
         
         try:
-            commits = self.repo.get_commits(path=self.arquivo_path)
-            if commits.totalCount > 0:
+            # Só a primeira página (uma requisição); totalCount faria outra
+            caminho = self.pasta_fragmentos if self.formato == 'fragmentos' else self.arquivo_path
+            commits = self._api(STATUS, lambda: self.repo.get_commits(path=caminho).get_page(0))
+            if commits:
                 last_commit = commits[0]
                 return {
                     'data': last_commit.commit.committer.date,
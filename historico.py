@@ -0,0 +1,198 @@
+import os
+import json
+import gzip
+import time
+from datetime import date, datetime
+import pandas as pd
+from controle_concorrencia import gravar_atomico
+from esquema import valor_para_texto
+
+
+def _instante(momento):
+    """Converte datetime/date/Timestamp/texto/número em segundos desde a época"""
+    if momento is None:
+        return None
+    if isinstance(momento, (int, float)):
+        return float(momento)
+    if isinstance(momento, date) and not isinstance(momento, datetime):
+        # Uma data sozinha significa o fim daquele dia
+        momento = datetime(momento.year, momento.month, momento.day, 23, 59, 59, 999999)
+    if isinstance(momento, str):
+        momento = pd.Timestamp(momento).to_pydatetime()
+    return momento.timestamp()
+
+
+def _linha_texto(linha):
+    return {col: valor_para_texto(valor) for col, valor in linha.items()}
+
+
+class HistoricoAlteracoes:
+    """Histórico local de alterações por linha, com checkpoints completos periódicos
+
+    Cada escrita acrescenta ao arquivo de deltas só o que mudou (a linha
+    incluída, os campos alterados ou a linha excluída). De tempos em tempos o
+    estado inteiro é gravado como checkpoint compactado, para que reconstruir
+    um momento passado leia apenas um checkpoint e os deltas seguintes.
+
+    Um novo checkpoint só é gravado quando os deltas acumulados desde o último
+    passam do tamanho desse checkpoint, então o espaço usado cresce com o
+    volume de alterações, e não com o tamanho da tabela vezes o número de
+    edições. As escritas devem ser feitas com a TravaArquivo segura.
+    """
+
+    def __init__(self, pasta, coluna_id='id', limite_minimo=256 * 1024):
+        self.pasta = pasta
+        self.coluna_id = coluna_id
+        self.limite_minimo = limite_minimo
+        self.arquivo_deltas = os.path.join(pasta, "deltas.jsonl")
+        self.arquivo_checkpoints = os.path.join(pasta, "checkpoints.jsonl")
+
+    # --- leitura -------------------------------------------------------------
+
+    def _ler_jsonl(self, caminho, offset=0):
+        """Entradas completas do arquivo JSONL a partir de `offset`"""
+        try:
+            with open(caminho, 'rb') as f:
+                f.seek(offset)
+                conteudo = f.read()
+        except FileNotFoundError:
+            return []
+        # Uma linha sem '\n' final é uma escrita em andamento (ou interrompida)
+        conteudo = conteudo[:conteudo.rfind(b"\n") + 1]
+        entradas = []
+        for linha in conteudo.splitlines():
+            try:
+                entradas.append(json.loads(linha))
+            except ValueError:
+                continue
+        return entradas
+
+    def checkpoints(self):
+        """Metadados dos checkpoints gravados, do mais antigo ao mais recente"""
+        return self._ler_jsonl(self.arquivo_checkpoints)
+
+    def tem_checkpoint(self):
+        return bool(self.checkpoints())
+
+    def _carregar_checkpoint(self, checkpoint):
+        with gzip.open(os.path.join(self.pasta, checkpoint['arquivo']), 'rt', encoding='utf-8') as f:
+            registros = json.load(f)
+        # Linhas antigas sem id recebem uma chave provisória (como no journal)
+        return {registro.get(self.coluna_id) or object(): registro for registro in registros}
+
+    def _aplicar(self, registros, delta):
+        operacao = delta['op']
+        if operacao == 'adicionar':
+            registros[delta['id']] = dict(delta['linha'])
+        elif operacao == 'atualizar' and delta['id'] in registros:
+            for col, (_, depois) in delta['campos'].items():
+                registros[delta['id']][col] = depois
+        elif operacao == 'excluir':
+            registros.pop(delta['id'], None)
+
+    def estado_em(self, momento=None):
+        """Tabela como estava em `momento` (padrão: agora), ou None se for anterior ao histórico
+
+        Parte do checkpoint mais recente até `momento` e aplica os deltas
+        seguintes; não acessa a rede nem o armazenamento principal.
+        """
+        limite = _instante(momento)
+        anteriores = [c for c in self.checkpoints() if limite is None or c['ts'] <= limite]
+        if not anteriores:
+            return None
+
+        checkpoint = anteriores[-1]
+        registros = self._carregar_checkpoint(checkpoint)
+        for delta in self._ler_jsonl(self.arquivo_deltas, checkpoint['offset']):
+            if limite is not None and delta['ts'] > limite:
+                break
+            self._aplicar(registros, delta)
+        return pd.DataFrame(list(registros.values()), columns=checkpoint['colunas'])
+
+    def auditoria(self, id_curso):
+        """Alterações de um curso, da mais antiga à mais recente"""
+        eventos = []
+        for delta in self._ler_jsonl(self.arquivo_deltas):
+            if delta.get('id') != id_curso:
+                continue
+            evento = {
+                'data': datetime.fromtimestamp(delta['ts']),
+                'operacao': delta['op'],
+                'mensagem': delta.get('mensagem', ''),
+            }
+            if delta['op'] == 'atualizar':
+                evento['campos'] = delta['campos']
+            else:
+                evento['linha'] = delta['linha']
+            eventos.append(evento)
+        return eventos
+
+    # --- escrita (com a TravaArquivo segura) ----------------------------------
+
+    def _tamanho_deltas(self):
+        try:
+            return os.path.getsize(self.arquivo_deltas)
+        except OSError:
+            return 0
+
+    def _anexar(self, deltas):
+        if not deltas:
+            return
+        os.makedirs(self.pasta, exist_ok=True)
+        dados = "".join(json.dumps(delta, ensure_ascii=False) + "\n" for delta in deltas)
+        with open(self.arquivo_deltas, 'ab') as f:
+            f.write(dados.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+        checkpoints = self.checkpoints()
+        if checkpoints:
+            ultimo = checkpoints[-1]
+            if self._tamanho_deltas() - ultimo['offset'] > max(self.limite_minimo, ultimo['tamanho']):
+                self.registrar_tabela(self.estado_em(), "checkpoint periódico")
+
+    def registrar_adicoes(self, linhas, mensagem=""):
+        agora = time.time()
+        self._anexar([
+            {'ts': agora, 'op': 'adicionar', 'id': linha[self.coluna_id],
+             'linha': _linha_texto(linha), 'mensagem': mensagem}
+            for linha in linhas
+        ])
+
+    def registrar_atualizacao(self, id_curso, anterior, linha, mensagem=""):
+        """Guarda só os campos que mudaram, como {coluna: [antes, depois]}"""
+        anterior, linha = _linha_texto(anterior), _linha_texto(linha)
+        campos = {
+            col: [anterior.get(col, ""), valor]
+            for col, valor in linha.items()
+            if col != self.coluna_id and str(anterior.get(col, "")).strip() != str(valor).strip()
+        }
+        if campos:
+            self._anexar([{'ts': time.time(), 'op': 'atualizar', 'id': id_curso,
+                           'campos': campos, 'mensagem': mensagem}])
+
+    def registrar_exclusao(self, id_curso, anterior, mensagem=""):
+        self._anexar([{'ts': time.time(), 'op': 'excluir', 'id': id_curso,
+                       'linha': _linha_texto(anterior), 'mensagem': mensagem}])
+
+    def registrar_tabela(self, df, mensagem=""):
+        """Grava um checkpoint com a tabela inteira (após sincronização, restauração etc.)"""
+        os.makedirs(self.pasta, exist_ok=True)
+        agora = time.time()
+        registros = [_linha_texto(linha) for linha in df.to_dict('records')]
+        dados = gzip.compress(json.dumps(registros, ensure_ascii=False).encode('utf-8'))
+        arquivo = f"checkpoint_{time.time_ns()}.json.gz"
+        gravar_atomico(os.path.join(self.pasta, arquivo), dados)
+
+        checkpoint = {
+            'ts': agora,
+            'arquivo': arquivo,
+            'offset': self._tamanho_deltas(),
+            'tamanho': len(dados),
+            'colunas': list(df.columns),
+            'mensagem': mensagem,
+        }
+        with open(self.arquivo_checkpoints, 'ab') as f:
+            f.write((json.dumps(checkpoint, ensure_ascii=False) + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,171 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+_TOKEN = re.compile(r"\w+")
+# campo:"valor com espaços" | campo:valor | "termo com espaços" | termo
+_TERMO = re.compile(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)')
+# Separa o campo do token nas chaves do índice ("" = qualquer campo)
+_SEP = "\x1f"
+
+
+def normalizar_texto(texto):
+    """Minúsculas e sem acentos ("Concluído" -> "concluido")"""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def _vazio(valor):
+    try:
+        return valor is None or bool(valor != valor)  # None, NaN ou NaT
+    except TypeError:  # pd.NA
+        return True
+
+
+def tokenizar(valor):
+    if _vazio(valor):
+        return []
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    elif hasattr(valor, 'strftime'):
+        valor = valor.strftime('%d/%m/%Y')
+    return _TOKEN.findall(normalizar_texto(valor))
+
+
+class IndiceInvertido:
+    """Índice invertido token -> ids de curso, geral e por campo
+
+    Os termos da consulta são combinados com E e cada um casa por prefixo
+    ("conclu" encontra "Concluído"). Termos no formato campo:valor ficam
+    restritos a uma coluna, ex.: `estado:concluido sigad:12345`.
+    """
+
+    apelidos = {
+        'curso': 'Curso',
+        'turma': 'Turma',
+        'vagas': 'Vagas',
+        'autorizados': 'Autorizados pelas escalantes',
+        'prioridade': 'Prioridade',
+        'recebimento': 'Recebimento do SIGAD com as vagas',
+        'sigad': 'Numero do SIGAD',
+        'estado': 'Estado',
+        'conclusao': 'DATA DA CONCLUSÃO',
+        'chefia': 'Numero do SIGAD  encaminhando pra chefia',
+        'prazo': 'Prazo dado pela chefia',
+        'siat': 'Fim da indicação da SIAT',
+        'notas': 'Notas',
+    }
+
+    def __init__(self, colunas):
+        self.colunas = colunas
+        self._postings = {}
+        self._ids = set()
+        self._ordenadas = None
+
+    def _chaves(self, linha):
+        chaves = set()
+        for col in self.colunas:
+            for token in tokenizar(linha.get(col)):
+                chaves.add(_SEP + token)
+                chaves.add(col + _SEP + token)
+        return chaves
+
+    def construir(self, df, coluna_id='id'):
+        """Monta o índice coluna a coluna, tokenizando cada valor distinto uma única vez"""
+        self._postings = {}
+        self._ordenadas = None
+        ids = df[coluna_id].tolist()
+        self._ids = set(ids)
+        for col in self.colunas:
+            if col not in df.columns:
+                continue
+            grupos = {}
+            for valor, id_curso in zip(df[col].tolist(), ids):
+                if _vazio(valor):
+                    continue
+                grupos.setdefault(valor, []).append(id_curso)
+            for valor, ids_valor in grupos.items():
+                for token in set(tokenizar(valor)):
+                    self._postings.setdefault(col + _SEP + token, set()).update(ids_valor)
+                    self._postings.setdefault(_SEP + token, set()).update(ids_valor)
+        return self
+
+    def adicionar(self, id_curso, linha):
+        self._ids.add(id_curso)
+        for chave in self._chaves(linha):
+            ids = self._postings.get(chave)
+            if ids is None:
+                self._postings[chave] = {id_curso}
+                self._ordenadas = None
+            else:
+                ids.add(id_curso)
+
+    def remover(self, id_curso, linha):
+        """Remove o curso; `linha` são os dados indexados anteriormente"""
+        self._ids.discard(id_curso)
+        for chave in self._chaves(linha):
+            ids = self._postings.get(chave)
+            if ids is not None:
+                ids.discard(id_curso)
+                if not ids:
+                    del self._postings[chave]
+                    self._ordenadas = None
+
+    def atualizar(self, id_curso, linha_anterior, linha):
+        self.remover(id_curso, linha_anterior)
+        self.adicionar(id_curso, linha)
+
+    def _postings_com_prefixo(self, prefixo):
+        """Conjuntos de ids de todas as chaves que começam com `prefixo`"""
+        if self._ordenadas is None:
+            self._ordenadas = sorted(self._postings)
+
+        conjuntos = []
+        i = bisect_left(self._ordenadas, prefixo)
+        while i < len(self._ordenadas) and self._ordenadas[i].startswith(prefixo):
+            conjuntos.append(self._postings[self._ordenadas[i]])
+            i += 1
+        return conjuntos
+
+    def _campo(self, nome):
+        nome = normalizar_texto(nome)
+        if nome in self.apelidos:
+            return self.apelidos[nome]
+        for col in self.colunas:
+            if normalizar_texto(col) == nome:
+                return col
+        return None
+
+    def buscar(self, consulta):
+        """Retorna o conjunto de ids que satisfazem todos os termos da consulta"""
+        # Pares (campo, token); campo "" significa qualquer coluna
+        restricoes = []
+        for encontrado in _TERMO.finditer(consulta):
+            campo_aspas, valor_aspas, campo, valor, frase, termo = encontrado.groups()
+            campo = campo_aspas or campo
+            valor = valor_aspas if campo_aspas else valor
+            coluna = self._campo(campo) if campo else None
+            if campo and coluna is None:
+                # Campo desconhecido: tratar "x:y" como texto comum
+                valor, coluna = encontrado.group(0), ""
+            elif not campo:
+                valor, coluna = frase if frase is not None else termo, ""
+            restricoes.extend((coluna, token) for token in tokenizar(valor))
+
+        if not restricoes:
+            return set(self._ids)
+
+        # Começar pelo termo mais seletivo mantém as interseções pequenas
+        termos = sorted(
+            (self._postings_com_prefixo(coluna + _SEP + token) for coluna, token in restricoes),
+            key=lambda conjuntos: sum(len(ids) for ids in conjuntos)
+        )
+        resultado = set().union(*termos[0])
+        for conjuntos in termos[1:]:
+            if not resultado:
+                break
+            if len(conjuntos) == 1:
+                resultado &= conjuntos[0]
+            else:
+                resultado = {i for i in resultado if any(i in ids for ids in conjuntos)}
+        return resultado
@@ -1,11 +1,181 @@
 import pdfplumber
 import pandas as pd
 from datetime import datetime
+import os
 import re
+import json
+import time
+import atexit
+import hashlib
+import unicodedata
+import threading
+import multiprocessing
 from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from controle_concorrencia import gravar_atomico
+from esquema import COLUNAS
+
+# Muda sempre que os padrões ou a montagem dos cursos mudarem
+VERSAO_PADROES = 3
+
+# Varredor único: delimitadores de bloco e, com lookahead, as palavras-chave dos campos.
+# Toda palavra-chave começa com uma letra diferente, então no máximo uma casa em cada posição.
+_PADRAO_VARREDOR = (
+    r'(?P<delimitador>curso[\s]*[:\-]|\n\n+|={3,}|-{3,})'
+    r'|(?=(?:(?P<curso>curso)|(?P<turma>turma)|(?P<vagas>vagas)|(?P<sigad>sigad)'
+    r'|(?P<data>data)|(?P<inicio>in[íi]cio)))'
+)
+# Roda sobre texto.lower(): sem IGNORECASE o motor usa o primeiro par de letras para
+# pular as posições sem candidatos, o que é bem mais rápido
+_VARREDOR = re.compile(r'(?=cu|tu|va|si|da|in|\n\n|==|--)(?:' + _PADRAO_VARREDOR + ')')
+_VARREDOR_SEM_CAIXA = re.compile(_PADRAO_VARREDOR, re.IGNORECASE)
+# Letras em que IGNORECASE e lower() discordam (ou lower() muda o tamanho do texto)
+_CAIXA_ESPECIAL = re.compile('[İıſ]')
+
+# Padrões (campo, posição em `patterns`) que começam em cada palavra-chave. Os
+# alternativos de Curso, Turma, Vagas e SIGAD só casam onde o primeiro também casa,
+# então nunca decidem; os três de Data valem nessa ordem de prioridade.
+_CANDIDATOS = {
+    'curso': [('Curso', 0)],
+    'turma': [('Turma', 0)],
+    'vagas': [('Vagas', 0)],
+    'sigad': [('SIGAD', 0)],
+    'data': [('Data', 0), ('Data', 1)],
+    'inicio': [('Data', 2)],
+}
+
+_CHAVES_CAMPO = {
+    'Curso': 'Curso',
+    'Data': 'Data_Inicio',
+    'Turma': 'Turma',
+    'Vagas': 'Vagas',
+    'SIGAD': 'Numero_SIGAD',
+}
+
+
+# Cabeçalho de tabela (normalizado) -> coluna do DataManager, para os nomes que não
+# são o próprio nome da coluna. As chaves de `_CHAVES_CAMPO` valem para as colunas
+# que o caminho de texto também preenche.
+_SINONIMOS_CABECALHO = {
+    'nome do curso': 'Curso',
+    'turma ano': 'Turma',
+    'quantidade de vagas': 'Vagas',
+    'numero de vagas': 'Vagas',
+    'n de vagas': 'Vagas',
+    'no de vagas': 'Vagas',
+    'data': 'Recebimento do SIGAD com as vagas',
+    'data de inicio': 'Recebimento do SIGAD com as vagas',
+    'inicio': 'Recebimento do SIGAD com as vagas',
+    'recebimento': 'Recebimento do SIGAD com as vagas',
+    'sigad': 'Numero do SIGAD',
+    'n sigad': 'Numero do SIGAD',
+    'no sigad': 'Numero do SIGAD',
+    'processo sigad': 'Numero do SIGAD',
+    'autorizados': 'Autorizados pelas escalantes',
+    'situacao': 'Estado',
+    'observacoes': 'Notas',
+    'obs': 'Notas',
+}
+# Colunas com nome próprio no dicionário lido do PDF (ver `_preencher_campos_padrao`)
+_CAMPOS_DA_COLUNA = {
+    'Recebimento do SIGAD com as vagas': 'Data_Inicio',
+    'Numero do SIGAD': 'Numero_SIGAD',
+}
+
+
+def _normalizar_cabecalho(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return " ".join(re.sub(r'[^a-z0-9]+', ' ', texto.lower()).split())
+
+
+_COLUNAS_NORMALIZADAS = {_normalizar_cabecalho(coluna): coluna for coluna in COLUNAS}
+
+
+def _coluna_do_cabecalho(celula):
+    nome = _normalizar_cabecalho(celula)
+    return _COLUNAS_NORMALIZADAS.get(nome) or _SINONIMOS_CABECALHO.get(nome)
+
+
+def _cursos_da_tabela(grade):
+    """Cursos de uma tabela (lista de linhas de células), ou None se o cabeçalho não tem Curso
+    
+    A grade vira um DataFrame de uma vez; a limpeza das células é feita por coluna.
+    """
+    if len(grade) < 2:
+        return None
+    colunas = {}
+    for posicao, celula in enumerate(grade[0]):
+        coluna = _coluna_do_cabecalho(celula)
+        if coluna and coluna not in colunas.values():
+            colunas[posicao] = coluna
+    if 'Curso' not in colunas.values():
+        return None
+    
+    df = pd.DataFrame(grade[1:]).reindex(columns=list(colunas)).rename(columns=colunas)
+    df = df.fillna('').astype(str).apply(lambda coluna: coluna.str.split().str.join(' '))
+    # Tabelas que continuam de uma página para outra repetem o cabeçalho
+    df = df[(df['Curso'] != '') & (df['Curso'].map(_coluna_do_cabecalho) != 'Curso')]
+    if 'Vagas' in df:
+        df['Vagas'] = pd.to_numeric(df['Vagas'].str.extract(r'(\d+)', expand=False), errors='coerce')
+    df = df.rename(columns=_CAMPOS_DA_COLUNA)
+    
+    # Células vazias ficam de fora, para valerem os padrões de `_preencher_campos_padrao`
+    return [
+        {campo: int(valor) if campo == 'Vagas' else valor
+         for campo, valor in registro.items() if valor != '' and pd.notna(valor)}
+        for registro in df.to_dict('records')
+    ]
+
+
+def _ler_pagina(pagina, tabelas):
+    """(texto, cursos das tabelas) de uma página
+    
+    Tabelas com uma coluna de Curso no cabeçalho viram cursos direto das células e
+    saem do texto; o restante da página segue para os padrões de texto.
+    """
+    original, cursos = pagina, []
+    # Sem linhas nem retângulos o localizador de tabelas não acharia nada
+    if tabelas and (pagina.lines or pagina.rects):
+        for tabela in pagina.find_tables():
+            da_tabela = _cursos_da_tabela(tabela.extract())
+            if da_tabela is not None:
+                cursos.extend(da_tabela)
+                pagina = pagina.outside_bbox(tabela.bbox)
+    texto = pagina.extract_text()
+    # Solta os objetos de layout que o pdfplumber guarda em cada página já lida
+    original.close()
+    return texto, cursos
+
+
+def _extrair_intervalo(pdf_bytes, inicio, fim, tabelas):
+    """(texto, cursos das tabelas) das páginas [inicio, fim) do PDF; roda nos processos auxiliares"""
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        return [_ler_pagina(pagina, tabelas) for pagina in pdf.pages[inicio:fim]]
+
 
 class PDFExtractor:
-    def __init__(self):
+    # Pools de processos compartilhados por todas as instâncias, um por número de processos
+    _pools = {}
+    _guarda_pools = threading.Lock()
+    # Cursos já extraídos, por sha256 do PDF e VERSAO_PADROES; o mais usado fica no fim
+    _cache = OrderedDict()
+    _guarda_cache = threading.Lock()
+    
+    def __init__(self, processos=None, paginas_minimas_paralelo=None, itens_cache=None, pasta_cache=None,
+                 tabelas=None):
+        # PDFs com menos páginas que isso são lidos em série: o custo do pool não compensa
+        self.processos = processos or int(os.environ.get('PDF_PROCESSOS', min(4, os.cpu_count() or 1)))
+        self.paginas_minimas_paralelo = paginas_minimas_paralelo or int(
+            os.environ.get('PDF_PAGINAS_PARALELO', 24)
+        )
+        # Páginas com tabelas (um curso por linha) são lidas pelas células
+        self.tabelas = tabelas if tabelas is not None else os.environ.get('PDF_TABELAS', '1') != '0'
+        self.itens_cache = itens_cache or int(os.environ.get('PDF_CACHE_ITENS', 32))
+        # Sem pasta, o cache fica só na memória do processo
+        self.pasta_cache = pasta_cache or os.environ.get('PDF_CACHE_DIR') or None
         self.patterns = {
             'Curso': [
                 r'Curso[\s]*[:\-]?\s*([^\n]+)',
@@ -33,30 +203,23 @@ class PDFExtractor:
                 r'Processo SIGAD[\s]*[:\-]?\s*([^\n]+)'
             ]
         }
+        self.padroes_compilados = {
+            campo: [re.compile(padrao, re.IGNORECASE) for padrao in padroes]
+            for campo, padroes in self.patterns.items()
+        }
+        self._candidatos = {
+            chave: [(campo, prioridade, self.padroes_compilados[campo][prioridade])
+                    for campo, prioridade in candidatos]
+            for chave, candidatos in _CANDIDATOS.items()
+        }
     
     def extrair_cursos(self, pdf_file):
         try:
-            if isinstance(pdf_file, BytesIO):
-                pdf_bytes = pdf_file.read()
-            else:
-                pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
+            pdf_bytes = self._ler_bytes(pdf_file)
             
             cursos = []
-            
-            with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-                texto_completo = ""
-                for pagina in pdf.pages:
-                    texto = pagina.extract_text()
-                    if texto:
-                        texto_completo += texto + "\n"
-                
-                blocos = self._dividir_em_blocos(texto_completo)
-                
-                for bloco in blocos:
-                    curso = self._extrair_dados_bloco(bloco)
-                    if curso and curso.get('Curso'):
-                        curso = self._preencher_campos_padrao(curso)
-                        cursos.append(curso)
+            for _, _, novos in self._iterar_com_cache(pdf_bytes):
+                cursos.extend(self._completar(novos))
             
             return cursos
             
@@ -64,45 +227,223 @@ class PDFExtractor:
             print(f"Erro ao extrair PDF: {str(e)}")
             return []
     
-    def _dividir_em_blocos(self, texto):
-        delimitadores = [
-            r'Curso[\s]*[:\-]',
-            r'\n\n+',
-            r'={3,}',
-            r'-{3,}',
-        ]
+    def iterar_cursos(self, pdf_file):
+        """Gera (página, total de páginas, cursos concluídos) conforme o PDF é lido
         
-        blocos = [texto]
+        Cada página é analisada assim que é lida; só o texto depois do último
+        delimitador fica guardado para a próxima, já que o bloco pode continuar nela.
+        Os cursos somados são os mesmos de `extrair_cursos`. Um PDF que já está no
+        cache sai de uma vez, num único passo com todas as páginas.
+        """
+        try:
+            pdf_bytes = self._ler_bytes(pdf_file)
+            for numero, total, novos in self._iterar_com_cache(pdf_bytes):
+                yield numero, total, self._completar(novos)
+        except Exception as e:
+            print(f"Erro ao extrair PDF: {str(e)}")
+    
+    def _iterar_com_cache(self, pdf_bytes):
+        chave = self._chave_cache(pdf_bytes)
+        guardado = self._ler_cache(chave)
+        if guardado is not None:
+            paginas, cursos = guardado
+            if paginas:
+                yield paginas, paginas, cursos
+            return
         
-        for delim in delimitadores:
-            novos_blocos = []
-            for bloco in blocos:
-                partes = re.split(delim, bloco, flags=re.IGNORECASE)
-                novos_blocos.extend([p.strip() for p in partes if p.strip()])
-            blocos = novos_blocos
+        paginas, cursos = 0, []
+        for paginas, total, novos in self._cursos_por_pagina(self._iterar_textos(pdf_bytes)):
+            cursos.extend(novos)
+            yield paginas, total, novos
+        # Só chega aqui quem leu o PDF inteiro
+        self._guardar_cache(chave, paginas, cursos)
+    
+    def _chave_cache(self, pdf_bytes):
+        return f"{hashlib.sha256(pdf_bytes).hexdigest()}-v{VERSAO_PADROES}-t{int(self.tabelas)}"
+    
+    def _ler_cache(self, chave):
+        with PDFExtractor._guarda_cache:
+            guardado = PDFExtractor._cache.get(chave)
+            if guardado is not None:
+                PDFExtractor._cache.move_to_end(chave)
+                return guardado
         
-        return [b for b in blocos if len(b) > 20]
+        if not self.pasta_cache:
+            return None
+        try:
+            with open(os.path.join(self.pasta_cache, f"{chave}.json"), encoding='utf-8') as f:
+                dados = json.load(f)
+            guardado = (dados['paginas'], dados['cursos'])
+        except (OSError, ValueError, KeyError):
+            return None
+        self._guardar_na_memoria(chave, guardado)
+        return guardado
     
-    def _extrair_dados_bloco(self, bloco):
-        dados = {}
+    def _guardar_cache(self, chave, paginas, cursos):
+        self._guardar_na_memoria(chave, (paginas, cursos))
+        if self.pasta_cache:
+            try:
+                dados = json.dumps({'paginas': paginas, 'cursos': cursos}, ensure_ascii=False)
+                gravar_atomico(os.path.join(self.pasta_cache, f"{chave}.json"), dados.encode('utf-8'))
+            except OSError as e:
+                print(f"Erro ao gravar cache do PDF: {str(e)}")
+    
+    def _guardar_na_memoria(self, chave, guardado):
+        with PDFExtractor._guarda_cache:
+            PDFExtractor._cache[chave] = guardado
+            PDFExtractor._cache.move_to_end(chave)
+            while len(PDFExtractor._cache) > self.itens_cache:
+                PDFExtractor._cache.popitem(last=False)
+    
+    @classmethod
+    def limpar_cache(cls):
+        """Esvazia o cache em memória (o da pasta, se houver, continua valendo)"""
+        with cls._guarda_cache:
+            cls._cache.clear()
+    
+    def _completar(self, cursos):
+        # O cache guarda os campos lidos; os padrões (como a data de hoje) entram na saída
+        return [self._preencher_campos_padrao(curso) for curso in cursos]
+    
+    def _ler_bytes(self, pdf_file):
+        # O arquivo inteiro, mesmo que já tenha sido lido (UploadedFile é um BytesIO):
+        # read() no fim do fluxo daria b"" e nenhum curso
+        if hasattr(pdf_file, 'getvalue'):
+            return pdf_file.getvalue()
+        if hasattr(pdf_file, 'seek'):
+            pdf_file.seek(0)
+        return pdf_file.read()
+    
+    def _cursos_por_pagina(self, paginas):
+        pendente = ""
+        for numero, total, texto, da_tabela in paginas:
+            if texto:
+                pendente += texto + "\n"
+            resultados, corte = self._analisar_blocos(pendente, fechar_ultimo=numero == total)
+            pendente = pendente[corte:]
+            yield numero, total, [curso for curso in resultados if curso.get('Curso')] + da_tabela
+    
+    def _iterar_textos(self, pdf_bytes, tabelas=None):
+        """Gera (página, total de páginas, texto ou None, cursos das tabelas), em ordem
+        
+        Com `processos` > 1 e PDFs grandes, as páginas são divididas em intervalos
+        entre os processos do pool; cada um abre o PDF por conta própria.
+        """
+        tabelas = self.tabelas if tabelas is None else tabelas
+        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+            total = len(pdf.pages)
+            if self.processos <= 1 or total < self.paginas_minimas_paralelo:
+                for numero, pagina in enumerate(pdf.pages, 1):
+                    yield (numero, total) + _ler_pagina(pagina, tabelas)
+                return
+        
+        lidas, futuros = 0, []
+        try:
+            pool = self._pool()
+            # Intervalos menores que o necessário para ocupar os processos: o progresso
+            # avança com mais frequência
+            tamanho = -(-total // (self.processos * 2))
+            futuros = [
+                pool.submit(_extrair_intervalo, pdf_bytes, inicio, min(inicio + tamanho, total), tabelas)
+                for inicio in range(0, total, tamanho)
+            ]
+            for futuro in futuros:
+                for pagina in futuro.result():
+                    lidas += 1
+                    yield (lidas, total) + pagina
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Extração em paralelo indisponível ({e}); lendo as páginas em série")
+            self._descartar_pool()
+            for pagina in _extrair_intervalo(pdf_bytes, lidas, total, tabelas):
+                lidas += 1
+                yield (lidas, total) + pagina
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+    
+    def _pool(self, processos=None):
+        processos = processos or self.processos
+        with PDFExtractor._guarda_pools:
+            pool = PDFExtractor._pools.get(processos)
+            if pool is None:
+                # spawn: o fork de um processo com threads (Streamlit) pode travar
+                pool = ProcessPoolExecutor(
+                    max_workers=processos,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                PDFExtractor._pools[processos] = pool
+            return pool
+    
+    def _descartar_pool(self, processos=None):
+        with PDFExtractor._guarda_pools:
+            pool = PDFExtractor._pools.pop(processos or self.processos, None)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    @classmethod
+    def encerrar_pools(cls):
+        with cls._guarda_pools:
+            pools, cls._pools = list(cls._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _analisar_texto(self, texto):
+        """Divide o texto em blocos e extrai os campos de cada um numa única passada
+        
+        Os delimitadores fecham o bloco atual e os padrões das palavras-chave vistas
+        nele são conferidos no fechamento, sem passar do fim do bloco. Blocos sem
+        nenhuma palavra-chave são omitidos. É o único analisador de texto do módulo;
+        `teste_pdf_extractor.py` o compara com a implementação anterior.
+        """
+        return self._analisar_blocos(texto, fechar_ultimo=True)[0]
+    
+    def _analisar_blocos(self, texto, fechar_ultimo):
+        """Campos dos blocos e a posição do último delimitador
         
-        for campo, padroes in self.patterns.items():
-            for padrao in padroes:
-                match = re.search(padrao, bloco, re.IGNORECASE)
-                if match:
-                    valor = match.group(1).strip()
-                    if campo == 'Curso':
-                        dados['Curso'] = valor
-                    elif campo == 'Data':
-                        dados['Data_Inicio'] = valor
-                    elif campo == 'Turma':
-                        dados['Turma'] = valor
-                    elif campo == 'Vagas':
-                        dados['Vagas'] = int(valor)
-                    elif campo == 'SIGAD':
-                        dados['Numero_SIGAD'] = valor
-                    break
+        Sem `fechar_ultimo`, o bloco aberto a partir do último delimitador não é
+        analisado: com mais texto, até esse delimitador pode crescer.
+        """
+        resultados = []
+        inicio, chaves, corte = 0, [], 0
+        for encontrado in self._varrer(texto):
+            grupo = encontrado.lastgroup
+            if grupo == 'delimitador':
+                if chaves:
+                    self._fechar_bloco(texto, inicio, encontrado.start(), chaves, resultados)
+                    chaves = []
+                corte, inicio = encontrado.start(), encontrado.end()
+            else:
+                chaves.append((grupo, encontrado.start()))
+        if chaves and fechar_ultimo:
+            self._fechar_bloco(texto, inicio, len(texto), chaves, resultados)
+        return resultados, corte
+    
+    def _varrer(self, texto):
+        # As posições em texto.lower() são as mesmas de texto fora dos casos especiais
+        if _CAIXA_ESPECIAL.search(texto):
+            return _VARREDOR_SEM_CAIXA.finditer(texto)
+        return _VARREDOR.finditer(texto.lower())
+    
+    def _fechar_bloco(self, texto, inicio, fim, chaves, resultados):
+        parte = texto[inicio:fim].rstrip()
+        if len(parte.lstrip()) > 20:
+            resultados.append(self._campos(texto, chaves, inicio + len(parte)))
+    
+    def _campos(self, texto, chaves, fim):
+        """Para cada campo, o padrão de maior prioridade que casa, na primeira posição em que casa"""
+        valores, prioridades = {}, {}
+        for chave, posicao in chaves:
+            for campo, prioridade, padrao in self._candidatos[chave]:
+                if prioridades.get(campo, 3) > prioridade:
+                    casou = padrao.match(texto, posicao, fim)
+                    if casou:
+                        prioridades[campo] = prioridade
+                        valores[campo] = casou.group(1).strip()
         
+        dados = {}
+        for campo, nome in _CHAVES_CAMPO.items():
+            if campo in valores:
+                dados[nome] = int(valores[campo]) if campo == 'Vagas' else valores[campo]
         return dados
     
     def _preencher_campos_padrao(self, curso):
@@ -121,26 +462,151 @@ class PDFExtractor:
             'Fim da indicação da SIAT': '',
             'Notas': 'Importado via PDF'
         }
+        # Cursos lidos de tabelas podem trazer as demais colunas
+        curso_completo.update({coluna: valor for coluna, valor in curso.items() if coluna in curso_completo})
         
         return curso_completo
     
     def extrair_texto_bruto(self, pdf_file):
         try:
-            if isinstance(pdf_file, BytesIO):
-                pdf_bytes = pdf_file.read()
-            else:
-                pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
+            pdf_bytes = self._ler_bytes(pdf_file)
             
-            with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-                texto = ""
-                for pagina in pdf.pages:
-                    texto_pagina = pagina.extract_text()
-                    if texto_pagina:
-                        texto += texto_pagina + "\n--- PÁGINA ---\n"
-                return texto
+            partes = []
+            for _, _, texto, _ in self._iterar_textos(pdf_bytes, tabelas=False):
+                if texto:
+                    partes.append(texto + "\n--- PÁGINA ---\n")
+            return "".join(partes)
         except Exception as e:
             return f"Erro ao extrair texto: {str(e)}"
 
+def _extrair_arquivo(pdf_bytes, tabelas):
+    """(páginas, cursos lidos) de um PDF inteiro; roda nos processos auxiliares"""
+    paginas, cursos = 0, []
+    extrator = PDFExtractor(processos=1, tabelas=tabelas)
+    for paginas, _, novos in extrator._cursos_por_pagina(extrator._iterar_textos(pdf_bytes)):
+        cursos.extend(novos)
+    return paginas, cursos
+
+
+class ImportacaoLote:
+    """Extrai os cursos de vários PDFs em segundo plano, no máximo `processos` ao mesmo tempo
+    
+    `situacao()` traz o estado, as páginas, os cursos e o tempo de cada arquivo
+    enquanto o lote roda; `cursos()` junta os cursos de todos, com a coluna 'Arquivo'.
+    """
+    
+    def __init__(self, arquivos, extrator=None, processos=None):
+        """`arquivos`: lista de (nome, bytes do PDF ou caminho do arquivo)"""
+        self.extrator = extrator or PDFExtractor()
+        self.processos = processos or self.extrator.processos
+        self._conteudos = [conteudo for _, conteudo in arquivos]
+        self._situacao = [
+            {'Arquivo': nome, 'Estado': 'na fila', 'Páginas': None, 'Cursos': None, 'Segundos': None, 'Erro': ''}
+            for nome, _ in arquivos
+        ]
+        self._cursos = [[] for _ in arquivos]
+        self._guarda = threading.Lock()
+        self._thread = None
+        self.duracao = None
+    
+    @staticmethod
+    def arquivos_da_pasta(pasta, base):
+        """(nome, caminho) de cada PDF da pasta, em ordem de nome
+        
+        `pasta` é relativa a `base`; caminhos que saem de `base` (por "..", caminho
+        absoluto ou link simbólico) dão PermissionError, e PDFs que apontam para
+        fora dela são ignorados.
+        """
+        base = os.path.realpath(base)
+        pasta = os.path.realpath(os.path.join(base, pasta))
+        if os.path.commonpath([base, pasta]) != base:
+            raise PermissionError(f"A pasta precisa estar dentro de {base}")
+        
+        arquivos = []
+        for nome in sorted(os.listdir(pasta)):
+            caminho = os.path.realpath(os.path.join(pasta, nome))
+            if nome.lower().endswith('.pdf') and os.path.commonpath([base, caminho]) == base:
+                arquivos.append((nome, caminho))
+        return arquivos
+    
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._executar, daemon=True, name="importacao-lote")
+        self._thread.start()
+        return self
+    
+    def em_andamento(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def progresso(self):
+        """(arquivos terminados, total de arquivos)"""
+        with self._guarda:
+            terminados = sum(item['Estado'] in ('concluído', 'erro') for item in self._situacao)
+        return terminados, len(self._situacao)
+    
+    def situacao(self):
+        with self._guarda:
+            return [dict(item) for item in self._situacao]
+    
+    def cursos(self):
+        """Cursos de todos os arquivos já concluídos, na ordem dos arquivos"""
+        with self._guarda:
+            por_arquivo = list(zip(self._situacao, self._cursos))
+        return [
+            dict(curso, Arquivo=item['Arquivo'])
+            for item, cursos in por_arquivo
+            for curso in self.extrator._completar(cursos)
+        ]
+    
+    def _executar(self):
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.processos) as threads:
+            list(threads.map(self._processar, range(len(self._conteudos))))
+        self.duracao = time.perf_counter() - inicio
+    
+    def _processar(self, indice):
+        self._atualizar(indice, Estado='extraindo')
+        inicio = time.perf_counter()
+        try:
+            pdf_bytes = self._conteudos[indice]
+            if isinstance(pdf_bytes, str):
+                with open(pdf_bytes, 'rb') as f:
+                    pdf_bytes = f.read()
+            
+            chave = self.extrator._chave_cache(pdf_bytes)
+            guardado = self.extrator._ler_cache(chave)
+            if guardado is None:
+                guardado = self._extrair(pdf_bytes)
+                self.extrator._guardar_cache(chave, *guardado)
+            
+            paginas, cursos = guardado
+            with self._guarda:
+                self._cursos[indice] = cursos
+            self._atualizar(indice, Estado='concluído', Páginas=paginas, Cursos=len(cursos),
+                            Segundos=round(time.perf_counter() - inicio, 2))
+        except Exception as e:
+            self._atualizar(indice, Estado='erro', Erro=str(e), Segundos=round(time.perf_counter() - inicio, 2))
+        finally:
+            self._conteudos[indice] = None
+    
+    def _extrair(self, pdf_bytes):
+        if self.processos <= 1:
+            return _extrair_arquivo(pdf_bytes, self.extrator.tabelas)
+        try:
+            return self.extrator._pool(self.processos).submit(
+                _extrair_arquivo, pdf_bytes, self.extrator.tabelas
+            ).result()
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Extração em paralelo indisponível ({e}); lendo o arquivo neste processo")
+            self.extrator._descartar_pool(self.processos)
+            return _extrair_arquivo(pdf_bytes, self.extrator.tabelas)
+    
+    def _atualizar(self, indice, **campos):
+        with self._guarda:
+            self._situacao[indice].update(campos)
+
+
+atexit.register(PDFExtractor.encerrar_pools)
+
 if __name__ == "__main__":
     extractor = PDFExtractor()
     print("PDF Extractor pronto para uso!")
@@ -0,0 +1,467 @@
+"""Servidor local que imita a parte da API REST do GitHub usada pelo GitHubManager
+
+Serve para medir e testar a sincronização sem acessar o github.com:
+
+    python servidor_github_local.py --porta 8765 --latencia 0.05
+    GITHUB_API_URL=http://127.0.0.1:8765 GITHUB_TOKEN=qualquer streamlit run app.py
+
+Endpoints: /user, /repos/{dono}/{repo}, contents/{caminho} (GET com ETag e
+If-None-Match, PUT com SHA), commits?path= e a Git Data API (git/ref(s),
+git/commits, git/trees, git/blobs) do branch main. Permite injetar latência,
+limite de requisições (403 com cabeçalhos X-RateLimit-*) e conflitos: SHA
+desatualizado no PUT (409) e atualização de ref que não avança (422).
+"""
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class EstadoRepositorio:
+    """Arquivos, commits e contadores do repositório simulado (compartilhado entre threads)"""
+
+    def __init__(self, latencia=0.0, variacao=0.0, limite_requisicoes=None, janela=60.0,
+                 taxa_conflito=0.0, semente=None):
+        self.latencia = latencia
+        self.variacao = variacao
+        self.limite_requisicoes = limite_requisicoes
+        self.janela = janela
+        self.taxa_conflito = taxa_conflito
+        self.aleatorio = random.Random(semente)
+        self.trava = threading.Lock()
+        self.arquivos = {}  # caminho -> {'conteudo': bytes, 'sha': str}
+        self.commits = []   # mais recente primeiro
+        self.contagem = {}  # "VERBO recurso" -> requisições
+        self.inicio_janela = time.time()
+        self.usadas_na_janela = 0
+        # Limites secundários injetados: [verbo, recurso, status, Retry-After, vezes]
+        self.limites_injetados = []
+        self._geracao = 0
+        # Git Data API: objetos endereçados pelo conteúdo, como no git
+        self.blobs = {}          # sha -> bytes
+        self.arvores = {}        # sha -> {caminho: sha do blob}
+        self.commits_git = {}    # sha -> {'arvore', 'pais', 'mensagem', 'data'}
+        arvore_vazia = self.guardar_arvore({})
+        self.head = self.guardar_commit(arvore_vazia, [], "Commit inicial")
+
+    def _novo_sha(self, conteudo):
+        # Cada gravação gera um SHA novo, mesmo com o mesmo conteúdo
+        self._geracao += 1
+        return hashlib.sha1(b"blob %d\0" % self._geracao + conteudo).hexdigest()
+
+    def gravar(self, caminho, conteudo, mensagem, autor="local"):
+        with self.trava:
+            sha = self._novo_sha(conteudo)
+            self.arquivos[caminho] = {'conteudo': conteudo, 'sha': sha}
+            commit = {
+                'sha': hashlib.sha1(f"{sha}{time.time_ns()}".encode()).hexdigest(),
+                'caminho': caminho,
+                'mensagem': mensagem,
+                'autor': autor,
+                'data': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            }
+            self.commits.insert(0, commit)
+            return sha, commit
+
+    def guardar_blob(self, conteudo):
+        sha = hashlib.sha1(b"blob %d\0" % len(conteudo) + conteudo).hexdigest()
+        with self.trava:
+            self.blobs[sha] = conteudo
+        return sha
+
+    def guardar_arvore(self, entradas):
+        sha = hashlib.sha1(json.dumps(sorted(entradas.items())).encode()).hexdigest()
+        with self.trava:
+            self.arvores[sha] = dict(entradas)
+        return sha
+
+    def guardar_commit(self, arvore, pais, mensagem, autor="local"):
+        data = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        sha = hashlib.sha1(f"{arvore}{pais}{mensagem}{time.time_ns()}".encode()).hexdigest()
+        with self.trava:
+            self.commits_git[sha] = {'arvore': arvore, 'pais': list(pais), 'mensagem': mensagem,
+                                     'autor': autor, 'data': data}
+        return sha
+
+    def avancar_head(self, sha, forcar=False):
+        """Move o branch para `sha` se for um avanço (o pai é o head atual); registra o commit"""
+        with self.trava:
+            commit = self.commits_git.get(sha)
+            if commit is None or (not forcar and self.head not in commit['pais']):
+                return False
+            antes = self.arvores[self.commits_git[self.head]['arvore']]
+            depois = self.arvores[commit['arvore']]
+            alterados = sorted(c for c in set(antes) | set(depois) if antes.get(c) != depois.get(c))
+            self.head = sha
+            self.commits.insert(0, {'sha': sha, 'caminho': alterados, 'mensagem': commit['mensagem'],
+                                    'autor': commit['autor'], 'data': commit['data']})
+            return True
+
+    def contar(self, chave):
+        with self.trava:
+            self.contagem[chave] = self.contagem.get(chave, 0) + 1
+
+    def consumir_cota(self):
+        """(permitido, restantes, reinício) na janela atual do limite de requisições"""
+        with self.trava:
+            agora = time.time()
+            if agora - self.inicio_janela >= self.janela:
+                self.inicio_janela, self.usadas_na_janela = agora, 0
+            reinicio = self.inicio_janela + self.janela
+            if self.limite_requisicoes is None:
+                return True, 5000, reinicio
+            if self.usadas_na_janela >= self.limite_requisicoes:
+                return False, 0, reinicio
+            self.usadas_na_janela += 1
+            return True, self.limite_requisicoes - self.usadas_na_janela, reinicio
+
+    def injetar_limite(self, verbo, recurso, status=429, retry_after=1, vezes=1):
+        """As próximas `vezes` requisições `verbo recurso` recebem `status` com Retry-After"""
+        with self.trava:
+            self.limites_injetados.append([verbo, recurso, status, retry_after, vezes])
+
+    def limite_injetado(self, verbo, recurso):
+        """(status, Retry-After) injetado para esta requisição, ou None"""
+        with self.trava:
+            for injetado in self.limites_injetados:
+                if injetado[:2] == [verbo, recurso]:
+                    injetado[4] -= 1
+                    if not injetado[4]:
+                        self.limites_injetados.remove(injetado)
+                    return injetado[2], injetado[3]
+        return None
+
+    def sortear_conflito(self):
+        with self.trava:
+            return self.aleatorio.random() < self.taxa_conflito
+
+
+class ManipuladorGitHub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    estado = None  # definido em criar_servidor
+
+    def log_message(self, formato, *args):
+        pass
+
+    # --- resposta ---------------------------------------------------------------
+
+    def _url_base(self):
+        return f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address}"
+
+    def _responder(self, status, corpo=None, cabecalhos=None):
+        dados = b"" if corpo is None else json.dumps(corpo).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if dados:
+            self.wfile.write(dados)
+
+    def _ler_corpo(self):
+        return json.loads(self._corpo) if self._corpo else {}
+
+    # --- despacho ---------------------------------------------------------------
+
+    def do_GET(self):
+        self._despachar("GET")
+
+    def do_PUT(self):
+        self._despachar("PUT")
+
+    def do_POST(self):
+        self._despachar("POST")
+
+    def do_PATCH(self):
+        self._despachar("PATCH")
+
+    def _despachar(self, verbo):
+        estado = self.estado
+        # O corpo é lido sempre: respostas antecipadas (403) não podem deixá-lo na conexão
+        self._corpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if estado.latencia or estado.variacao:
+            time.sleep(max(0.0, estado.latencia + estado.aleatorio.uniform(-estado.variacao, estado.variacao)))
+
+        url = urllib.parse.urlsplit(self.path)
+        partes = [urllib.parse.unquote(p) for p in url.path.strip("/").split("/")]
+        consulta = dict(urllib.parse.parse_qsl(url.query))
+
+        if partes[:1] == ["user"]:
+            recurso = "user"
+        elif len(partes) > 3 and partes[0] == "repos":
+            recurso = partes[3]
+        elif len(partes) == 3 and partes[0] == "repos":
+            recurso = "repo"
+        else:
+            recurso = "?"
+        estado.contar(f"{verbo} {recurso}")
+
+        # Respostas 304 não consomem cota, como no GitHub; a checagem é feita depois
+        permitido, restantes, reinicio = estado.consumir_cota()
+        self._cota = {
+            "X-RateLimit-Limit": str(estado.limite_requisicoes or 5000),
+            "X-RateLimit-Remaining": str(restantes),
+            "X-RateLimit-Reset": str(int(reinicio) + 1),
+        }
+        if not permitido:
+            cabecalhos = dict(self._cota, **{"Retry-After": str(max(1, int(reinicio - time.time()) + 1))})
+            return self._responder(403, {"message": "API rate limit exceeded (servidor local)"}, cabecalhos)
+        injetado = estado.limite_injetado(verbo, recurso)
+        if injetado:
+            status, retry_after = injetado
+            return self._responder(status, {"message": "You have exceeded a secondary rate limit (servidor local)"},
+                                   dict(self._cota, **{"Retry-After": str(retry_after)}))
+
+        if recurso == "user" and verbo == "GET":
+            return self._responder(200, {"login": "usuario-local", "id": 1,
+                                         "url": f"{self._url_base()}/user"}, self._cota)
+        if recurso == "repo" and verbo == "GET":
+            return self._repositorio(partes[1], partes[2])
+        if recurso == "contents" and len(partes) > 4:
+            caminho = "/".join(partes[4:])
+            if verbo == "GET":
+                return self._obter_conteudo(partes[1], partes[2], caminho)
+            return self._gravar_conteudo(partes[1], partes[2], caminho)
+        if recurso == "commits" and verbo == "GET":
+            return self._listar_commits(partes[1], partes[2], consulta)
+        if recurso == "git" and len(partes) > 4:
+            return self._git(verbo, partes[1], partes[2], partes[4], partes[5:])
+        return self._responder(404, {"message": "Not Found"}, self._cota)
+
+    # --- endpoints --------------------------------------------------------------
+
+    def _url_repo(self, dono, repo):
+        return f"{self._url_base()}/repos/{dono}/{repo}"
+
+    def _repositorio(self, dono, repo):
+        self._responder(200, {
+            "id": 1,
+            "name": repo,
+            "full_name": f"{dono}/{repo}",
+            "owner": {"login": dono},
+            "url": self._url_repo(dono, repo),
+            "default_branch": "main",
+        }, self._cota)
+
+    def _json_conteudo(self, dono, repo, caminho, arquivo):
+        return {
+            "type": "file",
+            "encoding": "base64",
+            "name": caminho.rsplit("/", 1)[-1],
+            "path": caminho,
+            "sha": arquivo['sha'],
+            "size": len(arquivo['conteudo']),
+            "url": f"{self._url_repo(dono, repo)}/contents/{urllib.parse.quote(caminho)}",
+            "content": base64.b64encode(arquivo['conteudo']).decode('ascii'),
+        }
+
+    def _obter_conteudo(self, dono, repo, caminho):
+        with self.estado.trava:
+            arquivo = self.estado.arquivos.get(caminho)
+        if arquivo is None:
+            return self._responder(404, {"message": "Not Found"}, self._cota)
+        etag = f'"{arquivo["sha"]}"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.estado.trava:
+                self.estado.usadas_na_janela = max(0, self.estado.usadas_na_janela - 1)
+                self.estado.contagem["GET contents"] -= 1
+            self.estado.contar("GET contents (304)")
+            return self._responder(304, None, dict(self._cota, ETag=etag))
+        self._responder(200, self._json_conteudo(dono, repo, caminho, arquivo), dict(self._cota, ETag=etag))
+
+    def _gravar_conteudo(self, dono, repo, caminho):
+        corpo = self._ler_corpo()
+        conteudo = base64.b64decode(corpo.get("content", ""))
+
+        # Conflito injetado: outro cliente gravou o arquivo antes deste PUT
+        if self.estado.sortear_conflito() and caminho in self.estado.arquivos:
+            self.estado.gravar(caminho, self.estado.arquivos[caminho]['conteudo'],
+                               "Gravação concorrente (simulada)", "outro-cliente")
+
+        with self.estado.trava:
+            atual = self.estado.arquivos.get(caminho)
+        sha_enviado = corpo.get("sha")
+        if atual is not None and not sha_enviado:
+            return self._responder(422, {"message": "Invalid request.\n\n\"sha\" wasn't supplied."}, self._cota)
+        if atual is None and sha_enviado:
+            return self._responder(404, {"message": "Not Found"}, self._cota)
+        if atual is not None and sha_enviado != atual['sha']:
+            return self._responder(409, {"message": f"{caminho} does not match {sha_enviado}"}, self._cota)
+
+        sha, commit = self.estado.gravar(caminho, conteudo, corpo.get("message", ""))
+        arquivo = {'conteudo': conteudo, 'sha': sha}
+        conteudo_json = self._json_conteudo(dono, repo, caminho, arquivo)
+        del conteudo_json["content"]
+        self._responder(201 if atual is None else 200, {
+            "content": conteudo_json,
+            "commit": {
+                "sha": commit['sha'],
+                "message": commit['mensagem'],
+                "url": f"{self._url_repo(dono, repo)}/git/commits/{commit['sha']}",
+                "author": {"name": commit['autor'], "date": commit['data']},
+                "committer": {"name": commit['autor'], "date": commit['data']},
+            },
+        }, self._cota)
+
+    def _listar_commits(self, dono, repo, consulta):
+        caminho = consulta.get("path")
+
+        def afeta(commit):
+            # Commits da Git Data API guardam a lista de arquivos alterados; path= pode ser uma pasta
+            caminhos = commit['caminho'] if isinstance(commit['caminho'], list) else [commit['caminho']]
+            return any(c == caminho or c.startswith(caminho.rstrip("/") + "/") for c in caminhos)
+
+        with self.estado.trava:
+            commits = [c for c in self.estado.commits if caminho is None or afeta(c)]
+        por_pagina = int(consulta.get("per_page", 30))
+        pagina = int(consulta.get("page", 1))
+        trecho = commits[(pagina - 1) * por_pagina:pagina * por_pagina]
+        cabecalhos = dict(self._cota)
+        if pagina * por_pagina < len(commits):
+            ultima = (len(commits) + por_pagina - 1) // por_pagina
+            base = f"{self._url_repo(dono, repo)}/commits?" + urllib.parse.urlencode(
+                {k: v for k, v in consulta.items() if k != "page"})
+            cabecalhos["Link"] = f'<{base}&page={pagina + 1}>; rel="next", <{base}&page={ultima}>; rel="last"'
+        self._responder(200, [{
+            "sha": c['sha'],
+            "url": f"{self._url_repo(dono, repo)}/commits/{c['sha']}",
+            "commit": {
+                "message": c['mensagem'],
+                "author": {"name": c['autor'], "email": "", "date": c['data']},
+                "committer": {"name": c['autor'], "email": "", "date": c['data']},
+            },
+        } for c in trecho], cabecalhos)
+
+
+    # --- Git Data API ------------------------------------------------------------
+
+    def _json_commit_git(self, dono, repo, sha):
+        commit = self.estado.commits_git[sha]
+        pessoa = {"name": commit['autor'], "email": "", "date": commit['data']}
+        return {
+            "sha": sha,
+            "url": f"{self._url_repo(dono, repo)}/git/commits/{sha}",
+            "message": commit['mensagem'],
+            "author": pessoa,
+            "committer": pessoa,
+            "tree": {"sha": commit['arvore'], "url": f"{self._url_repo(dono, repo)}/git/trees/{commit['arvore']}"},
+            "parents": [{"sha": p, "url": f"{self._url_repo(dono, repo)}/git/commits/{p}"} for p in commit['pais']],
+        }
+
+    def _json_arvore(self, dono, repo, sha):
+        entradas = self.estado.arvores[sha]
+        return {
+            "sha": sha,
+            "url": f"{self._url_repo(dono, repo)}/git/trees/{sha}",
+            "truncated": False,
+            "tree": [{"path": caminho, "mode": "100644", "type": "blob", "sha": blob,
+                      "size": len(self.estado.blobs.get(blob, b"")),
+                      "url": f"{self._url_repo(dono, repo)}/git/blobs/{blob}"}
+                     for caminho, blob in sorted(entradas.items())],
+        }
+
+    def _json_ref(self, dono, repo):
+        return {
+            "ref": "refs/heads/main",
+            "url": f"{self._url_repo(dono, repo)}/git/refs/heads/main",
+            "object": {"type": "commit", "sha": self.estado.head,
+                       "url": f"{self._url_repo(dono, repo)}/git/commits/{self.estado.head}"},
+        }
+
+    def _git(self, verbo, dono, repo, tipo, resto):
+        estado = self.estado
+        if tipo in ("ref", "refs") and resto == ["heads", "main"]:
+            if verbo == "GET":
+                return self._responder(200, self._json_ref(dono, repo), self._cota)
+            if verbo == "PATCH":
+                corpo = self._ler_corpo()
+                # Conflito injetado: outro cliente avançou o branch antes deste PATCH
+                if estado.sortear_conflito():
+                    arvore = estado.commits_git[estado.head]['arvore']
+                    estado.avancar_head(estado.guardar_commit(arvore, [estado.head], "Gravação concorrente (simulada)",
+                                                              "outro-cliente"))
+                if not estado.avancar_head(corpo.get("sha"), bool(corpo.get("force"))):
+                    return self._responder(422, {"message": "Update is not a fast forward"}, self._cota)
+                return self._responder(200, self._json_ref(dono, repo), self._cota)
+
+        if tipo == "commits":
+            if verbo == "GET" and resto and resto[0] in estado.commits_git:
+                return self._responder(200, self._json_commit_git(dono, repo, resto[0]), self._cota)
+            if verbo == "POST":
+                corpo = self._ler_corpo()
+                if corpo.get("tree") not in estado.arvores:
+                    return self._responder(422, {"message": "Tree SHA does not exist"}, self._cota)
+                sha = estado.guardar_commit(corpo["tree"], corpo.get("parents", []), corpo.get("message", ""))
+                return self._responder(201, self._json_commit_git(dono, repo, sha), self._cota)
+
+        if tipo == "trees":
+            if verbo == "GET" and resto and resto[0] in estado.arvores:
+                return self._responder(200, self._json_arvore(dono, repo, resto[0]), self._cota)
+            if verbo == "POST":
+                corpo = self._ler_corpo()
+                entradas = dict(estado.arvores.get(corpo.get("base_tree"), {}))
+                for elemento in corpo.get("tree", []):
+                    if "content" in elemento:
+                        entradas[elemento["path"]] = estado.guardar_blob(elemento["content"].encode('utf-8'))
+                    elif elemento.get("sha") is None:
+                        entradas.pop(elemento["path"], None)
+                    else:
+                        entradas[elemento["path"]] = elemento["sha"]
+                sha = estado.guardar_arvore(entradas)
+                return self._responder(201, self._json_arvore(dono, repo, sha), self._cota)
+
+        if tipo == "blobs" and verbo == "GET" and resto and resto[0] in estado.blobs:
+            conteudo = estado.blobs[resto[0]]
+            return self._responder(200, {
+                "sha": resto[0],
+                "size": len(conteudo),
+                "encoding": "base64",
+                "url": f"{self._url_repo(dono, repo)}/git/blobs/{resto[0]}",
+                "content": base64.b64encode(conteudo).decode('ascii'),
+            }, self._cota)
+
+        return self._responder(404, {"message": "Not Found"}, self._cota)
+
+
+def criar_servidor(porta=0, host="127.0.0.1", **opcoes):
+    """Cria o servidor (porta 0 = livre); retorna (servidor, estado, url_base)"""
+    estado = EstadoRepositorio(**opcoes)
+    manipulador = type("Manipulador", (ManipuladorGitHub,), {"estado": estado})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor, estado, f"http://{host}:{servidor.server_address[1]}"
+
+
+def iniciar_em_segundo_plano(**opcoes):
+    """Sobe o servidor numa thread; retorna (servidor, estado, url_base)"""
+    servidor, estado, url = criar_servidor(**opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, estado, url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API do GitHub simulada para testes locais")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por requisição")
+    parser.add_argument("--variacao", type=float, default=0.0, help="variação aleatória da latência")
+    parser.add_argument("--limite", type=int, default=None, help="requisições permitidas por janela")
+    parser.add_argument("--janela", type=float, default=60.0, help="duração da janela do limite (s)")
+    parser.add_argument("--conflitos", type=float, default=0.0, help="probabilidade de conflito por PUT")
+    args = parser.parse_args()
+
+    servidor, _, url = criar_servidor(
+        porta=args.porta, latencia=args.latencia, variacao=args.variacao,
+        limite_requisicoes=args.limite, janela=args.janela, taxa_conflito=args.conflitos
+    )
+    print(f"API do GitHub simulada em {url} (Ctrl+C para parar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,98 @@
+"""Confere os motores de armazenamento e a carga inicial do DataManager
+
+    python teste_armazenamento.py
+
+Roda cada verificação numa pasta temporária e termina com código 1 se alguma falhar.
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import traceback
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+from servidor_github_local import iniciar_em_segundo_plano
+
+CURSO = {
+    'Curso': 'Curso de Teste',
+    'Turma': 'A',
+    'Recebimento do SIGAD com as vagas': '15/01/2026',
+    'Prazo dado pela chefia': '20/02/2026',
+    'Fim da indicação da SIAT': '05/12/2026',
+}
+DATAS = ['Recebimento do SIGAD com as vagas', 'Prazo dado pela chefia', 'Fim da indicação da SIAT']
+
+
+def sqlite_grava_iso_e_devolve_dd_mm_aaaa():
+    dm = DataManager(motor='sqlite')
+    assert dm.adicionar_curso(CURSO)[0]
+
+    with sqlite3.connect('data/cursos.db') as conn:
+        gravado = conn.execute('SELECT "Prazo dado pela chefia" FROM cursos').fetchone()[0]
+    assert gravado == '2026-02-20', gravado
+
+    lido = dm.storage.carregar()
+    pagina, _ = dm.storage.carregar_pagina(0, 10)
+    id_curso = lido['id'].iloc[0]
+    for col in DATAS:
+        assert lido[col].iloc[0] == CURSO[col], (col, lido[col].iloc[0])
+        assert pagina[col].iloc[0] == CURSO[col], (col, pagina[col].iloc[0])
+        assert dm.storage.obter(id_curso)[col] == CURSO[col]
+
+    dm.storage.exportar_xlsx('exportado.xlsx')
+    planilha = pd.read_excel('exportado.xlsx', dtype=str)
+    for col in DATAS:
+        assert planilha[col].iloc[0] == CURSO[col], (col, planilha[col].iloc[0])
+
+
+def motor_novo_com_github_vazio_importa_excel_local():
+    # Excel local com 5 cursos, GitHub (servidor local) ainda sem o arquivo
+    dm = DataManager(motor='xlsx')
+    for i in range(5):
+        assert dm.adicionar_curso(dict(CURSO, Curso=f"Curso {i}"))[0]
+
+    _, _, url = iniciar_em_segundo_plano()
+    variaveis = {'GITHUB_API_URL': url, 'GITHUB_TOKEN': 'token-local', 'GITHUB_REPO': 'local/cursos'}
+    anteriores = {nome: os.environ.get(nome) for nome in variaveis}
+    os.environ.update(variaveis)
+    try:
+        dm = DataManager(usar_github=True, motor='sqlite')
+        assert dm.github_manager.authenticated
+        assert len(dm.carregar_dados()) == 5, dm.ultima_mensagem
+
+        assert dm.adicionar_curso(dict(CURSO, Curso="Curso 5"))[0]
+        dm.github_manager.fila.esvaziar(timeout=30)
+        assert len(pd.read_excel('data/cursos.xlsx')) == 6
+    finally:
+        for nome, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(nome, None)
+            else:
+                os.environ[nome] = valor
+
+
+def main():
+    falhas = 0
+    for verificacao in [sqlite_grava_iso_e_devolve_dd_mm_aaaa, motor_novo_com_github_vazio_importa_excel_local]:
+        anterior = os.getcwd()
+        with tempfile.TemporaryDirectory() as pasta:
+            os.chdir(pasta)
+            os.makedirs('data')
+            try:
+                verificacao()
+                print(f"OK      {verificacao.__name__}")
+            except Exception:
+                falhas += 1
+                print(f"FALHOU  {verificacao.__name__}")
+                traceback.print_exc()
+            finally:
+                os.chdir(anterior)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Confere o GitHubManager contra o servidor_github_local.py
+
+    python teste_github_manager.py
+
+Cada verificação sobe um servidor novo e roda numa pasta temporária; termina com
+código 1 se alguma falhar.
+"""
+import os
+import sys
+import time
+import tempfile
+import traceback
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_github_local import iniciar_em_segundo_plano
+
+
+def gerenciador():
+    """(GitHubManager apontado para um servidor local novo, estado do servidor)"""
+    _, estado, url = iniciar_em_segundo_plano()
+    os.environ.update(GITHUB_API_URL=url, GITHUB_TOKEN="token-local", GITHUB_REPO="local/cursos",
+                      GITHUB_FORMATO="xlsx")
+    from github_manager import GitHubManager
+    # SHA/ETag guardados por repositório valem para o servidor anterior
+    GitHubManager._remotos.clear()
+    gh = GitHubManager()
+    assert gh.authenticated
+    return gh, estado
+
+
+def limite_429_no_download_passa_pelo_agendador():
+    gh, estado = gerenciador()
+    assert gh.commit_excel(b"planilha", "inicial")[0]
+    estado.injetar_limite("GET", "contents", status=429, retry_after=1)
+
+    inicio = time.monotonic()
+    sucesso, mensagem = gh.sincronizar_para_local()
+    assert sucesso, mensagem
+    assert time.monotonic() - inicio >= 1, "não esperou o Retry-After"
+    assert gh.metricas_api()['limites_atingidos'] == 1
+    with open(gh.arquivo_path, 'rb') as f:
+        assert f.read() == b"planilha"
+
+
+def sincronizar_apos_o_proprio_commit_nao_altera_os_dados():
+    gh, estado = gerenciador()
+    with open(gh.arquivo_path, 'wb') as f:
+        f.write(b"v1")
+    assert gh.commit_excel(b"v1", "envio")[0]
+
+    # Primeira sincronização baixa o arquivo (sem ETag), mas é o mesmo SHA do envio
+    assert gh.sincronizar_para_local()[0]
+    assert not gh.remoto_alterado
+    # A seguinte já é condicional
+    assert gh.sincronizar_para_local()[0]
+    assert not gh.remoto_alterado
+    assert gh.metricas_api()['economizadas'].get('download evitado (304)') == 1
+
+    # Alteração feita por fora é baixada
+    estado.gravar(gh.arquivo_path, b"v2", "outra instância")
+    assert gh.sincronizar_para_local()[0]
+    assert gh.remoto_alterado
+    with open(gh.arquivo_path, 'rb') as f:
+        assert f.read() == b"v2"
+
+
+def main():
+    falhas = 0
+    for verificacao in [limite_429_no_download_passa_pelo_agendador,
+                        sincronizar_apos_o_proprio_commit_nao_altera_os_dados]:
+        anterior = os.getcwd()
+        with tempfile.TemporaryDirectory() as pasta:
+            os.chdir(pasta)
+            os.makedirs('data')
+            try:
+                verificacao()
+                print(f"OK      {verificacao.__name__}")
+            except Exception:
+                falhas += 1
+                print(f"FALHOU  {verificacao.__name__}")
+                traceback.print_exc()
+            finally:
+                os.chdir(anterior)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
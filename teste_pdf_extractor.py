@@ -0,0 +1,159 @@
+"""Confere o varredor do PDFExtractor contra a implementação antiga e mede a diferença
+
+    python teste_pdf_extractor.py --documentos 2000 --cursos 3000
+
+Gera textos sintéticos (com variações de rótulos, maiúsculas, separadores e blocos
+curtos), compara cursos extraídos pelo varredor de passada única com os da divisão
+em quatro passadas + 15 buscas por bloco e mostra o tempo de cada um num documento
+grande. Também confere que a leitura página a página (texto cortado em pontos
+aleatórios) dá os mesmos cursos que o texto inteiro.
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_extractor import PDFExtractor
+
+
+def dividir_antigo(texto):
+    blocos = [texto]
+    for delim in [r'Curso[\s]*[:\-]', r'\n\n+', r'={3,}', r'-{3,}']:
+        novos_blocos = []
+        for bloco in blocos:
+            partes = re.split(delim, bloco, flags=re.IGNORECASE)
+            novos_blocos.extend([p.strip() for p in partes if p.strip()])
+        blocos = novos_blocos
+    return [b for b in blocos if len(b) > 20]
+
+
+def extrair_antigo(patterns, bloco):
+    nomes = {'Curso': 'Curso', 'Data': 'Data_Inicio', 'Turma': 'Turma',
+             'Vagas': 'Vagas', 'SIGAD': 'Numero_SIGAD'}
+    dados = {}
+    for campo, padroes in patterns.items():
+        for padrao in padroes:
+            match = re.search(padrao, bloco, re.IGNORECASE)
+            if match:
+                valor = match.group(1).strip()
+                dados[nomes[campo]] = int(valor) if campo == 'Vagas' else valor
+                break
+    return dados
+
+
+def analisar_antigo(extrator, texto):
+    return [extrair_antigo(extrator.patterns, bloco) for bloco in dividir_antigo(texto)]
+
+
+def com_curso(dados):
+    # O que extrair_cursos aproveita: blocos sem o campo Curso são descartados
+    return [d for d in dados if d.get('Curso')]
+
+
+def em_paginas(extrator, aleatorio, texto):
+    """Corta o texto em "páginas" aleatórias e junta os cursos que iterar_cursos geraria"""
+    cortes = sorted(aleatorio.sample(range(len(texto) + 1), min(len(texto) + 1, aleatorio.randint(0, 6))))
+    pedacos = [texto[a:b] for a, b in zip([0] + cortes, cortes + [len(texto)])]
+    paginas = [(numero, len(pedacos), pedaco, []) for numero, pedaco in enumerate(pedacos, 1)]
+    cursos = [c for _, _, novos in extrator._cursos_por_pagina(paginas) for c in novos]
+    inteiro = "".join(pedaco + "\n" for pedaco in pedacos if pedaco)
+    esperado = com_curso(extrator._analisar_texto(inteiro))
+    return cursos, esperado
+
+
+ROTULOS = {
+    'curso': ['Curso: ', 'CURSO - ', 'curso ', 'Nome do Curso: ', 'Curso\n:', 'Curso de '],
+    'data': ['Data: ', 'DATA ', 'Data de Início: ', 'Data de Inicio - ', 'Início: ',
+             'inicio ', 'Data prevista ', 'Data de início '],
+    'turma': ['Turma: ', 'TURMA/ANO: ', 'Turma - ', 'turma', 'Turma:'],
+    'vagas': ['Vagas: ', 'Quantidade de Vagas: ', 'Número de Vagas - ', 'VAGAS ', 'Vagas: ~'],
+    'sigad': ['SIGAD: ', 'Número do SIGAD: ', 'Processo SIGAD ', 'sigad-', 'SIGAD'],
+}
+# Letras em que IGNORECASE e lower() discordam: forçam o caminho sem texto.lower()
+ROTULOS_ESPECIAIS = {'curso': ['CURſO: '], 'data': ['İnício: ', 'Data de ınício: ']}
+SEPARADORES = ['\n\n', '\n\n\n', '\n=====\n', '\n-----\n', '\n', ' ---- ', '\n\n  \n']
+PALAVRAS = ("objetivo capacitar militares servidores na gestão de processos logísticos planejamento "
+            "orçamento aquisições contratos normas procedimentos avaliação frequência mínima "
+            "carga horária presencial módulos prática conteúdo programático").split()
+
+
+def gerar_texto(aleatorio, cursos, descricao=0, especiais=False):
+    """Texto com `cursos` blocos; `descricao` linhas de texto corrido em cada um"""
+    rotulos = {campo: opcoes + (ROTULOS_ESPECIAIS.get(campo, []) if especiais else [])
+               for campo, opcoes in ROTULOS.items()}
+    partes = []
+    for i in range(cursos):
+        linhas = [aleatorio.choice(rotulos['curso']) + f"Formação {i} em Gestão {aleatorio.randint(1, 99)}"]
+        if aleatorio.random() < 0.9:
+            data = f"{aleatorio.randint(1, 31)}/{aleatorio.randint(1, 12)}/{aleatorio.choice(['2026', '26'])}"
+            linhas.append(aleatorio.choice(rotulos['data']) + data)
+        if aleatorio.random() < 0.8:
+            linhas.append(aleatorio.choice(rotulos['turma']) + aleatorio.choice(['A', 'Turma B - 2026', '', '  ']))
+        if aleatorio.random() < 0.8:
+            linhas.append(aleatorio.choice(rotulos['vagas']) + str(aleatorio.randint(0, 300)))
+        if aleatorio.random() < 0.7:
+            linhas.append(aleatorio.choice(rotulos['sigad']) + f"{aleatorio.randint(1000, 99999)}/2026")
+        if aleatorio.random() < 0.2:
+            linhas.append(aleatorio.choice(["Observação curta", "Local: auditório ---- sala 2",
+                                             "Sigadata prevista 01/02/2026", "curta"]))
+        for _ in range(descricao):
+            linhas.append(" ".join(aleatorio.choice(PALAVRAS) for _ in range(12)))
+        aleatorio.shuffle(linhas[1:])
+        partes.append("\n".join(linhas))
+    texto = ""
+    for parte in partes:
+        texto += parte + aleatorio.choice(SEPARADORES)
+    return texto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documentos", type=int, default=1000, help="textos curtos comparados")
+    parser.add_argument("--cursos", type=int, default=2000, help="cursos no documento do benchmark")
+    parser.add_argument("--descricao", type=int, default=4,
+                        help="linhas de texto corrido por curso no documento do benchmark")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    extrator = PDFExtractor()
+    aleatorio = random.Random(args.semente)
+
+    divergencias = 0
+    for _ in range(args.documentos):
+        texto = gerar_texto(aleatorio, aleatorio.randint(1, 8), aleatorio.choice([0, 0, 1, 3]),
+                             especiais=aleatorio.random() < 0.1)
+        if com_curso(extrator._analisar_texto(texto)) != com_curso(analisar_antigo(extrator, texto)):
+            divergencias += 1
+            if divergencias == 1:
+                print("Primeira divergência:\n" + repr(texto))
+        cursos, esperado = em_paginas(extrator, aleatorio, texto)
+        if cursos != esperado:
+            divergencias += 1
+    print(f"{args.documentos} documentos comparados | divergências: {divergencias}")
+
+    texto = gerar_texto(aleatorio, args.cursos, args.descricao)
+    print(f"\nDocumento com {args.cursos} cursos e {args.descricao} linhas de descrição cada"
+          f" ({len(texto) / 1024:.0f} KB):")
+    tempos = {}
+    for nome, analisar in [("antigo (4 divisões + buscas)", lambda: analisar_antigo(extrator, texto)),
+                           ("varredor de passada única", lambda: extrator._analisar_texto(texto))]:
+        melhor = float("inf")
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            analisar()
+            melhor = min(melhor, time.perf_counter() - inicio)
+        tempos[nome] = melhor
+        print(f"  {nome:<30} {melhor * 1000:8.1f} ms")
+    antigo, novo = tempos.values()
+    print(f"  aceleração {antigo / novo:.1f}x")
+
+    sys.exit(1 if divergencias else 0)
+
+
+if __name__ == "__main__":
+    main()